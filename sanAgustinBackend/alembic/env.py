@@ -0,0 +1,60 @@
+from logging.config import fileConfig
+
+from alembic import context
+
+from config import settings
+from core.database import create_engine_from_settings
+from models.database import Base
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+def get_url() -> str:
+    """DATABASE_URL de settings, salvo que se indique otra con `-x url=...`"""
+    return context.get_x_argument(as_dictionary=True).get("url", settings.DATABASE_URL)
+
+def run_migrations_offline() -> None:
+    """Genera el SQL sin conectarse a la base (`alembic upgrade head --sql`)"""
+    url = get_url()
+    context.configure(
+        url=url,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        render_as_batch=url.startswith("sqlite"),
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+def run_migrations_online() -> None:
+    # bootstrap_db.py pasa su propia conexión para validar y migrar en la misma
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _run(connection)
+        return
+
+    engine = create_engine_from_settings(get_url())
+    try:
+        with engine.connect() as connection:
+            _run(connection)
+    finally:
+        engine.dispose()
+
+def _run(connection) -> None:
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # SQLite no soporta la mayoría de ALTER TABLE: se recrea la tabla por lotes
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
@@ -0,0 +1,263 @@
+"""esquema inicial
+
+Tablas de models.database y models.auth_models más los triggers de capacidad
+de reservas (models.database.restricciones).
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 07:18:02.805908
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from models.database import restricciones
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('areas_comunes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('nombre', sa.String(), nullable=True),
+    sa.Column('descripcion', sa.String(), nullable=True),
+    sa.Column('ubicacion', sa.String(), nullable=True),
+    sa.Column('capacidad', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_areas_comunes_id'), 'areas_comunes', ['id'], unique=False)
+    op.create_index(op.f('ix_areas_comunes_nombre'), 'areas_comunes', ['nombre'], unique=False)
+
+    op.create_table('lugares_visita',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('numero', sa.String(), nullable=True),
+    sa.Column('descripcion', sa.String(), nullable=True),
+    sa.Column('capacidad', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('numero')
+    )
+    op.create_index(op.f('ix_lugares_visita_id'), 'lugares_visita', ['id'], unique=False)
+
+    op.create_table('usuarios',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('nombre', sa.String(), nullable=False),
+    sa.Column('apellido', sa.String(), nullable=False),
+    sa.Column('provider', sa.String(), nullable=False),
+    sa.Column('provider_id', sa.String(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=True),
+    sa.Column('is_admin', sa.Boolean(), nullable=True),
+    sa.Column('token_version', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_usuarios_email'), 'usuarios', ['email'], unique=True)
+    op.create_index(op.f('ix_usuarios_id'), 'usuarios', ['id'], unique=False)
+
+    op.create_table('versiones_recurso',
+    sa.Column('recurso', sa.String(), nullable=False),
+    sa.Column('recurso_id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('recurso', 'recurso_id')
+    )
+    op.create_table('contactos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('usuario_id', sa.Integer(), nullable=True),
+    sa.Column('telefono', sa.String(), nullable=True),
+    sa.Column('direccion', sa.String(), nullable=True),
+    sa.Column('departamento', sa.String(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('usuario_id')
+    )
+    op.create_index(op.f('ix_contactos_id'), 'contactos', ['id'], unique=False)
+
+    op.create_table('departamentos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('numero', sa.String(), nullable=True),
+    sa.Column('usuario_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['usuario_id'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_departamentos_id'), 'departamentos', ['id'], unique=False)
+    op.create_index(op.f('ix_departamentos_numero'), 'departamentos', ['numero'], unique=True)
+
+    op.create_table('registros_pendientes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('nombre', sa.String(), nullable=False),
+    sa.Column('apellido', sa.String(), nullable=False),
+    sa.Column('provider', sa.String(), nullable=False),
+    sa.Column('provider_id', sa.String(), nullable=False),
+    sa.Column('telefono', sa.String(), nullable=True),
+    sa.Column('direccion', sa.String(), nullable=True),
+    sa.Column('departamento', sa.String(), nullable=True),
+    sa.Column('notas_adicionales', sa.Text(), nullable=True),
+    sa.Column('is_approved', sa.Boolean(), nullable=True),
+    sa.Column('approved_by', sa.Integer(), nullable=True),
+    sa.Column('approved_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['approved_by'], ['usuarios.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_registros_pendientes_email'), 'registros_pendientes', ['email'], unique=True)
+    op.create_index(op.f('ix_registros_pendientes_id'), 'registros_pendientes', ['id'], unique=False)
+
+    op.create_table('adeudos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('departamento_id', sa.Integer(), nullable=True),
+    sa.Column('monto_centavos', sa.Integer(), nullable=False),
+    sa.Column('descripcion', sa.String(), nullable=True),
+    sa.Column('fecha_vencimiento', sa.DateTime(), nullable=True),
+    sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+    sa.Column('pagado', sa.Boolean(), nullable=True),
+    sa.ForeignKeyConstraint(['departamento_id'], ['departamentos.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_adeudos_id'), 'adeudos', ['id'], unique=False)
+
+    op.create_table('estacionamientos',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('numero', sa.String(), nullable=True),
+    sa.Column('placa', sa.String(), nullable=True),
+    sa.Column('modelo_auto', sa.String(), nullable=True),
+    sa.Column('color_auto', sa.String(), nullable=True),
+    sa.Column('es_visita', sa.Boolean(), nullable=True),
+    sa.Column('departamento_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['departamento_id'], ['departamentos.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('numero')
+    )
+    op.create_index(op.f('ix_estacionamientos_id'), 'estacionamientos', ['id'], unique=False)
+
+    op.create_table('reservas_area_comun',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('area_comun_id', sa.Integer(), nullable=True),
+    sa.Column('departamento_id', sa.Integer(), nullable=True),
+    sa.Column('periodo_inicio', sa.DateTime(), nullable=True),
+    sa.Column('periodo_fin', sa.DateTime(), nullable=True),
+    sa.Column('estado', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['area_comun_id'], ['areas_comunes.id'], ),
+    sa.ForeignKeyConstraint(['departamento_id'], ['departamentos.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_reservas_area_comun_estado_periodo_fin', 'reservas_area_comun', ['estado', 'periodo_fin'], unique=False)
+    op.create_index(op.f('ix_reservas_area_comun_id'), 'reservas_area_comun', ['id'], unique=False)
+
+    op.create_table('reservas_area_comun_archivo',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('area_comun_id', sa.Integer(), nullable=True),
+    sa.Column('departamento_id', sa.Integer(), nullable=True),
+    sa.Column('periodo_inicio', sa.DateTime(), nullable=True),
+    sa.Column('periodo_fin', sa.DateTime(), nullable=True),
+    sa.Column('estado', sa.String(), nullable=True),
+    sa.Column('archivado_en', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['area_comun_id'], ['areas_comunes.id'], ),
+    sa.ForeignKeyConstraint(['departamento_id'], ['departamentos.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_reservas_area_comun_archivo_departamento_id'), 'reservas_area_comun_archivo', ['departamento_id'], unique=False)
+
+    op.create_table('reservas_visita',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('lugar_visita_id', sa.Integer(), nullable=True),
+    sa.Column('departamento_id', sa.Integer(), nullable=True),
+    sa.Column('placa_visita', sa.String(), nullable=True),
+    sa.Column('periodo_inicio', sa.DateTime(), nullable=True),
+    sa.Column('periodo_fin', sa.DateTime(), nullable=True),
+    sa.Column('estado', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['departamento_id'], ['departamentos.id'], ),
+    sa.ForeignKeyConstraint(['lugar_visita_id'], ['lugares_visita.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_reservas_visita_estado_periodo_fin', 'reservas_visita', ['estado', 'periodo_fin'], unique=False)
+    op.create_index(op.f('ix_reservas_visita_id'), 'reservas_visita', ['id'], unique=False)
+
+    op.create_table('reservas_visita_archivo',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('lugar_visita_id', sa.Integer(), nullable=True),
+    sa.Column('departamento_id', sa.Integer(), nullable=True),
+    sa.Column('placa_visita', sa.String(), nullable=True),
+    sa.Column('periodo_inicio', sa.DateTime(), nullable=True),
+    sa.Column('periodo_fin', sa.DateTime(), nullable=True),
+    sa.Column('estado', sa.String(), nullable=True),
+    sa.Column('archivado_en', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['departamento_id'], ['departamentos.id'], ),
+    sa.ForeignKeyConstraint(['lugar_visita_id'], ['lugares_visita.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_reservas_visita_archivo_departamento_id'), 'reservas_visita_archivo', ['departamento_id'], unique=False)
+
+    op.create_table('saldos_departamento',
+    sa.Column('departamento_id', sa.Integer(), nullable=False),
+    sa.Column('saldo_centavos', sa.Integer(), nullable=False),
+    sa.Column('adeudos_pendientes', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['departamento_id'], ['departamentos.id'], ),
+    sa.PrimaryKeyConstraint('departamento_id')
+    )
+
+    for sentencia in restricciones.ddl(op.get_context().dialect.name):
+        op.execute(sentencia)
+
+
+def downgrade() -> None:
+    op.drop_table('saldos_departamento')
+
+    op.drop_index(op.f('ix_reservas_visita_archivo_departamento_id'), table_name='reservas_visita_archivo')
+    op.drop_table('reservas_visita_archivo')
+
+    op.drop_index(op.f('ix_reservas_visita_id'), table_name='reservas_visita')
+    op.drop_index('ix_reservas_visita_estado_periodo_fin', table_name='reservas_visita')
+    op.drop_table('reservas_visita')
+
+    op.drop_index(op.f('ix_reservas_area_comun_archivo_departamento_id'), table_name='reservas_area_comun_archivo')
+    op.drop_table('reservas_area_comun_archivo')
+
+    op.drop_index(op.f('ix_reservas_area_comun_id'), table_name='reservas_area_comun')
+    op.drop_index('ix_reservas_area_comun_estado_periodo_fin', table_name='reservas_area_comun')
+    op.drop_table('reservas_area_comun')
+
+    op.drop_index(op.f('ix_estacionamientos_id'), table_name='estacionamientos')
+    op.drop_table('estacionamientos')
+
+    op.drop_index(op.f('ix_adeudos_id'), table_name='adeudos')
+    op.drop_table('adeudos')
+
+    op.drop_index(op.f('ix_registros_pendientes_id'), table_name='registros_pendientes')
+    op.drop_index(op.f('ix_registros_pendientes_email'), table_name='registros_pendientes')
+    op.drop_table('registros_pendientes')
+
+    op.drop_index(op.f('ix_departamentos_numero'), table_name='departamentos')
+    op.drop_index(op.f('ix_departamentos_id'), table_name='departamentos')
+    op.drop_table('departamentos')
+
+    op.drop_index(op.f('ix_contactos_id'), table_name='contactos')
+    op.drop_table('contactos')
+
+    op.drop_table('versiones_recurso')
+
+    op.drop_index(op.f('ix_usuarios_id'), table_name='usuarios')
+    op.drop_index(op.f('ix_usuarios_email'), table_name='usuarios')
+    op.drop_table('usuarios')
+
+    op.drop_index(op.f('ix_lugares_visita_id'), table_name='lugares_visita')
+    op.drop_table('lugares_visita')
+
+    op.drop_index(op.f('ix_areas_comunes_nombre'), table_name='areas_comunes')
+    op.drop_index(op.f('ix_areas_comunes_id'), table_name='areas_comunes')
+    op.drop_table('areas_comunes')
+
+    # Los triggers se eliminan con sus tablas; en PostgreSQL quedan las funciones
+    if op.get_context().dialect.name == "postgresql":
+        for tabla, _, _ in restricciones.RESERVAS_CON_CAPACIDAD:
+            op.execute(f"DROP FUNCTION IF EXISTS fn_{tabla.name}_capacidad()")
@@ -0,0 +1,79 @@
+"""llave propia en las tablas de archivo
+
+Las tablas de archivo usaban como llave el id de la tabla viva; SQLite reutiliza
+ids borrados (las tablas vivas no usan AUTOINCREMENT), así que archivar una
+reserva nueva con el id de una ya archivada violaba la llave. Ahora cada fila
+tiene archivo_id y el id original queda en reserva_id.
+
+Las tablas se recrean copiando las filas. El downgrade falla si el archivo ya
+tiene dos reservas con el mismo reserva_id.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 15:40:11.204518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: Union[str, None] = '0001'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (tabla de archivo, columna del recurso, tabla del recurso, columnas extra)
+ARCHIVOS = [
+    ('reservas_area_comun_archivo', 'area_comun_id', 'areas_comunes', []),
+    ('reservas_visita_archivo', 'lugar_visita_id', 'lugares_visita', ['placa_visita']),
+]
+
+
+def _columnas(recurso: str, extra: list) -> list:
+    return [recurso, 'departamento_id', *extra, 'periodo_inicio', 'periodo_fin', 'estado', 'archivado_en']
+
+
+def _recrear(tabla: str, recurso: str, tabla_recurso: str, extra: list, llave_propia: bool) -> None:
+    nueva = f'{tabla}_nueva'
+    if llave_propia:
+        llave = [
+            sa.Column('archivo_id', sa.Integer(), nullable=False),
+            sa.Column('reserva_id', sa.Integer(), nullable=False),
+        ]
+        origen, destino = 'id', 'reserva_id'
+    else:
+        llave = [sa.Column('id', sa.Integer(), autoincrement=False, nullable=False)]
+        origen, destino = 'reserva_id', 'id'
+    op.create_table(nueva,
+    *llave,
+    sa.Column(recurso, sa.Integer(), nullable=True),
+    sa.Column('departamento_id', sa.Integer(), nullable=True),
+    *[sa.Column(nombre, sa.String(), nullable=True) for nombre in extra],
+    sa.Column('periodo_inicio', sa.DateTime(), nullable=True),
+    sa.Column('periodo_fin', sa.DateTime(), nullable=True),
+    sa.Column('estado', sa.String(), nullable=True),
+    sa.Column('archivado_en', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint([recurso], [f'{tabla_recurso}.id'], ),
+    sa.ForeignKeyConstraint(['departamento_id'], ['departamentos.id'], ),
+    sa.PrimaryKeyConstraint('archivo_id' if llave_propia else 'id')
+    )
+    columnas = ', '.join(_columnas(recurso, extra))
+    orden = 'archivado_en, id' if llave_propia else 'archivo_id'
+    op.execute(f'INSERT INTO {nueva} ({destino}, {columnas}) SELECT {origen}, {columnas} FROM {tabla} ORDER BY {orden}')
+    op.drop_index(op.f(f'ix_{tabla}_departamento_id'), table_name=tabla)
+    op.drop_table(tabla)
+    op.rename_table(nueva, tabla)
+    op.create_index(op.f(f'ix_{tabla}_departamento_id'), tabla, ['departamento_id'], unique=False)
+
+
+def upgrade() -> None:
+    for tabla, recurso, tabla_recurso, extra in ARCHIVOS:
+        _recrear(tabla, recurso, tabla_recurso, extra, llave_propia=True)
+
+
+def downgrade() -> None:
+    for tabla, recurso, tabla_recurso, extra in ARCHIVOS:
+        _recrear(tabla, recurso, tabla_recurso, extra, llave_propia=False)
@@ -1,20 +1,30 @@
-from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
 from fastapi.responses import RedirectResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional
 import httpx
 
 from models.auth_models import Usuario, RegistroPendiente
-from models.auth_schemas import Token, User, RegistroPendiente as RegistroPendienteSchema
+from models.auth_schemas import Token, User, RegistroPendiente as RegistroPendienteSchema, RegistroPendienteCreate
+from services.async_auth_service import AsyncAuthService
 from services.auth_service import AuthService
-from core.oauth_config import oauth, GOOGLE_REDIRECT_URI, FACEBOOK_REDIRECT_URI
-from core.database import get_db
+from core.oauth_config import oauth, google_metadata, GOOGLE_REDIRECT_URI, FACEBOOK_REDIRECT_URI
+from core.database import get_db, get_async_db
+from networking.http_client import get_http_client
 
 # Dependency para obtener el usuario actual
-from core.auth import get_current_user
+from core.auth import get_current_user, verify_token_version
 
 # Dependency para verificar si es admin
-def get_current_admin_user(current_user: Usuario = Depends(get_current_user)):
+def get_current_admin_user(
+    authorization: Optional[str] = Header(None),
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    # El usuario puede venir de la caché de este proceso: la revocación se vuelve a verificar
+    verify_token_version(authorization, db, current_user.id)
     if not current_user.is_admin:
         raise HTTPException(status_code=403, detail="Acceso denegado. Se requieren permisos de administrador")
     return current_user
@@ -24,15 +34,18 @@ router = APIRouter(prefix="/auth", tags=["authentication"])
 @router.get("/google/login")
 async def google_login(request: Request):
     """Inicia el flujo de login con Google"""
+    # Respaldo del refresco periódico: si la copia caducó, se descarga antes de que el callback la necesite
+    await run_in_threadpool(google_metadata.refresh_if_stale)
     redirect_uri = request.url_for('google_callback')
     return await oauth.google.authorize_redirect(request, redirect_uri)
 
 @router.get("/google/callback")
-async def google_callback(request: Request, db: Session = Depends(get_db)):
+async def google_callback(request: Request, db: AsyncSession = Depends(get_async_db)):
     """Callback de Google OAuth"""
     try:
+        # authorize_access_token ya verifica el ID token (con su nonce) contra el JWKS en caché
         token = await oauth.google.authorize_access_token(request)
-        user_info = await oauth.google.parse_id_token(token)
+        user_info = token.get('userinfo') or {}
         
         # Extraer información del usuario
         email = user_info.get('email')
@@ -40,8 +53,8 @@ async def google_callback(request: Request, db: Session = Depends(get_db)):
         apellido = user_info.get('family_name', '')
         provider_id = user_info.get('sub')
         
-        auth_service = AuthService(db)
-        result = auth_service.authenticate_oauth_user({
+        auth_service = AsyncAuthService(db)
+        result = await auth_service.authenticate_oauth_user({
             'email': email,
             'nombre': nombre,
             'apellido': apellido,
@@ -69,18 +82,21 @@ async def facebook_login(request: Request):
     return await oauth.facebook.authorize_redirect(request, redirect_uri)
 
 @router.get("/facebook/callback")
-async def facebook_callback(request: Request, db: Session = Depends(get_db)):
+async def facebook_callback(
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    http_client: httpx.AsyncClient = Depends(get_http_client)
+):
     """Callback de Facebook OAuth"""
     try:
         token = await oauth.facebook.authorize_access_token(request)
         
         # Obtener información del usuario de Facebook
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(
-                'https://graph.facebook.com/me',
-                params={'fields': 'id,name,email', 'access_token': token['access_token']}
-            )
-            user_info = resp.json()
+        resp = await http_client.get(
+            'https://graph.facebook.com/me',
+            params={'fields': 'id,name,email', 'access_token': token['access_token']}
+        )
+        user_info = resp.json()
         
         # Extraer información del usuario
         email = user_info.get('email')
@@ -89,8 +105,8 @@ async def facebook_callback(request: Request, db: Session = Depends(get_db)):
         apellido = full_name[1] if len(full_name) > 1 else ''
         provider_id = user_info.get('id')
         
-        auth_service = AuthService(db)
-        result = auth_service.authenticate_oauth_user({
+        auth_service = AsyncAuthService(db)
+        result = await auth_service.authenticate_oauth_user({
             'email': email,
             'nombre': nombre,
             'apellido': apellido,
@@ -114,18 +130,18 @@ async def facebook_callback(request: Request, db: Session = Depends(get_db)):
 @router.post("/register", response_model=RegistroPendienteSchema)
 async def register_user(
     registration_data: dict,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Registra un nuevo usuario pendiente de aprobación"""
-    auth_service = AuthService(db)
+    auth_service = AsyncAuthService(db)
     
     # Verificar que no exista ya un usuario con ese email
-    existing_user = auth_service.get_user_by_email(registration_data['email'])
+    existing_user = await auth_service.get_user_by_email(registration_data['email'])
     if existing_user:
         raise HTTPException(status_code=400, detail="El email ya está registrado")
     
     # Verificar que no exista ya un registro pendiente
-    existing_pending = auth_service.get_pending_registration(registration_data['email'])
+    existing_pending = await auth_service.get_pending_registration(registration_data['email'])
     if existing_pending:
         raise HTTPException(status_code=400, detail="Ya existe un registro pendiente para este email")
     
@@ -142,27 +158,40 @@ async def register_user(
         'notas_adicionales': registration_data.get('notas_adicionales')
     }
     
-    pending_reg = auth_service.create_pending_registration(reg_data)
+    pending_reg = await auth_service.create_pending_registration(RegistroPendienteCreate(**reg_data))
     return pending_reg
 
 @router.get("/pending-registrations", response_model=List[RegistroPendienteSchema])
 async def get_pending_registrations(
     current_admin: Usuario = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Obtiene todos los registros pendientes de aprobación (solo admin)"""
-    auth_service = AuthService(db)
-    return auth_service.get_all_pending_registrations()
+    auth_service = AsyncAuthService(db)
+    return await auth_service.get_all_pending_registrations()
 
 @router.post("/approve-registration/{reg_id}", response_model=User)
 async def approve_registration(
     reg_id: int,
     current_admin: Usuario = Depends(get_current_admin_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Aprueba un registro pendiente y crea el usuario (solo admin)"""
+    auth_service = AsyncAuthService(db)
+    return await auth_service.approve_registration(reg_id, current_admin.id)
+
+@router.post("/users/{usuario_id}/revoke-tokens", response_model=User)
+def revoke_user_tokens(
+    usuario_id: int,
+    current_admin: Usuario = Depends(get_current_admin_user),
+    db: Session = Depends(get_db)
+):
+    """Revoca todos los tokens emitidos a un usuario (solo admin)"""
     auth_service = AuthService(db)
-    return auth_service.approve_registration(reg_id, current_admin.id)
+    user = auth_service.get_user_by_id(usuario_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="Usuario no encontrado")
+    return auth_service.revoke_tokens(user)
 
 @router.get("/me", response_model=User)
 async def get_current_user_info(current_user: Usuario = Depends(get_current_user)):
@@ -1,30 +1,6 @@
-from sqlalchemy import create_engine, Column, Integer, String, Boolean, ForeignKey
-from sqlalchemy.orm import sessionmaker, declarative_base
-from datetime import datetime
-
-# Crear engine y sesión
-SQLALCHEMY_DATABASE_URL = "sqlite:///./comunidad.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
-
-# Modelos SQLAlchemy
-class Usuario(Base):
-    __tablename__ = "usuarios"
-    id = Column(Integer, primary_key=True, index=True)
-    email = Column(String, unique=True, index=True, nullable=False)
-    nombre = Column(String, nullable=False)
-    apellido = Column(String, nullable=False)
-    provider = Column(String, nullable=False)
-    provider_id = Column(String, nullable=False)
-    is_active = Column(Boolean, default=True)
-    is_admin = Column(Boolean, default=False)
-
-class Departamento(Base):
-    __tablename__ = "departamentos"
-    id = Column(Integer, primary_key=True, index=True)
-    numero = Column(String, index=True, unique=True)
-    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=True)
+"""Crea los usuarios de prueba y asocia el residente al departamento 01 (después de poblar_simple.py)"""
+from core.database import SessionLocal
+from models.database import Usuario, Departamento
 
 def asociar_usuario():
     db = SessionLocal()
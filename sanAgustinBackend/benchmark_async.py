@@ -0,0 +1,80 @@
+"""Compara el acceso síncrono y asíncrono a la base desde handlers `async def`.
+
+Mide, para la misma consulta de AuthService (usuario por email):
+- sync: AuthService llamado directo dentro del event loop (lo que hacían las rutas de auth)
+- threadpool: AuthService en el threadpool de Starlette (lo que hacen las rutas `def`)
+- async: AsyncAuthService sobre aiosqlite/asyncpg
+
+Además del throughput reporta el retraso máximo del event loop, que es lo que
+bloquea a las demás peticiones mientras corre una consulta síncrona.
+
+Uso: python benchmark_async.py --peticiones 2000 --concurrencia 50 --email admin@sanagustin.com
+"""
+import argparse
+import asyncio
+import time
+from starlette.concurrency import run_in_threadpool
+
+from core.database import SessionLocal, AsyncSessionLocal, async_engine
+from services.auth_service import AuthService
+from services.async_auth_service import AsyncAuthService
+
+async def _monitor_loop(intervalo: float, detener: asyncio.Event, retrasos: list) -> None:
+    """Registra cuánto tarda el loop en despertar respecto a lo esperado"""
+    while not detener.is_set():
+        inicio = time.perf_counter()
+        await asyncio.sleep(intervalo)
+        retrasos.append(time.perf_counter() - inicio - intervalo)
+
+def _consulta_sync(email: str) -> None:
+    db = SessionLocal()
+    try:
+        AuthService(db).get_user_by_email(email)
+    finally:
+        db.close()
+
+async def _peticion_sync(email: str) -> None:
+    _consulta_sync(email)
+
+async def _peticion_threadpool(email: str) -> None:
+    await run_in_threadpool(_consulta_sync, email)
+
+async def _peticion_async(email: str) -> None:
+    async with AsyncSessionLocal() as db:
+        await AsyncAuthService(db).get_user_by_email(email)
+
+async def medir(nombre: str, peticion, total: int, concurrencia: int, email: str) -> None:
+    semaforo = asyncio.Semaphore(concurrencia)
+    retrasos: list = []
+    detener = asyncio.Event()
+    monitor = asyncio.create_task(_monitor_loop(0.001, detener, retrasos))
+
+    async def una():
+        async with semaforo:
+            await peticion(email)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(una() for _ in range(total)))
+    duracion = time.perf_counter() - inicio
+    detener.set()
+    await monitor
+
+    retraso_max = max(retrasos) * 1000 if retrasos else 0.0
+    print(f"{nombre:<11} {total / duracion:>10.1f} req/s   {duracion:>7.3f} s   retraso máx. del loop {retraso_max:>8.2f} ms")
+
+async def main(total: int, concurrencia: int, email: str) -> None:
+    print(f"{total} peticiones, concurrencia {concurrencia}")
+    # Calentamiento de ambos pools de conexiones
+    await _peticion_threadpool(email)
+    await _peticion_async(email)
+    for nombre, peticion in (("sync", _peticion_sync), ("threadpool", _peticion_threadpool), ("async", _peticion_async)):
+        await medir(nombre, peticion, total, concurrencia, email)
+    await async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--peticiones", type=int, default=2000)
+    parser.add_argument("--concurrencia", type=int, default=50)
+    parser.add_argument("--email", default="admin@sanagustin.com")
+    args = parser.parse_args()
+    asyncio.run(main(args.peticiones, args.concurrencia, args.email))
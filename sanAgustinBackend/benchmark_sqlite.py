@@ -0,0 +1,92 @@
+"""Compara el throughput mixto lectura/escritura de SQLite con y sin el perfil de producción.
+
+Para cada modo crea una base nueva en un directorio temporal y lanza hilos
+que, según --escrituras, leen departamentos o actualizan un lugar de visita
+con BaseRepository.update (un commit por escritura, como las rutas).
+Reporta operaciones por segundo, latencia p95 de lecturas y escrituras y
+cuántas operaciones fallaron por base bloqueada.
+
+Uso: python benchmark_sqlite.py --workers 8 --operaciones 4000 --escrituras 0.2
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from core.database import create_engine_from_settings, optimize_sqlite
+from models.database import Base
+from models.database.departamento import Departamento
+from models.database.lugar_visita import LugarVisita
+from repositories.base_repository import BaseRepository
+
+FILAS = 200
+
+def _poblar(Session) -> None:
+    with Session() as db:
+        db.add_all(Departamento(numero=f"D-{i}") for i in range(FILAS))
+        db.add_all(LugarVisita(numero=f"V-{i}", descripcion="", capacidad=1) for i in range(FILAS))
+        db.commit()
+
+def _p95(latencias: List[float]) -> float:
+    latencias.sort()
+    return latencias[int(len(latencias) * 0.95) - 1] * 1000 if latencias else 0.0
+
+def medir(perfil: bool, workers: int, total: int, escrituras: float) -> None:
+    with tempfile.TemporaryDirectory() as directorio:
+        url = f"sqlite:///{os.path.join(directorio, 'benchmark.db')}"
+        engine = create_engine_from_settings(url, perfil_sqlite=perfil, pool_size=workers)
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine, autoflush=False)
+        _poblar(Session)
+        repo = BaseRepository(LugarVisita)
+        lectura = select(Departamento.id, Departamento.numero).limit(10)
+
+        def una(_) -> Tuple[str, float, bool]:
+            escribe = random.random() < escrituras
+            inicio = time.perf_counter()
+            try:
+                with Session() as db:
+                    if escribe:
+                        lugar = repo.get(db, random.randint(1, FILAS))
+                        repo.update(db, db_obj=lugar, obj_in={"descripcion": str(inicio)})
+                    else:
+                        db.execute(lectura).all()
+                ok = True
+            except OperationalError:
+                ok = False
+            return ("escritura" if escribe else "lectura"), time.perf_counter() - inicio, ok
+
+        inicio = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as ejecutor:
+            resultados = list(ejecutor.map(una, range(total)))
+        duracion = time.perf_counter() - inicio
+
+        optimize_sqlite(engine)
+        engine.dispose()
+
+    lecturas = [t for tipo, t, ok in resultados if tipo == "lectura" and ok]
+    escritas = [t for tipo, t, ok in resultados if tipo == "escritura" and ok]
+    fallidas = sum(1 for _, _, ok in resultados if not ok)
+    nombre = "perfil" if perfil else "default"
+    print(f"{nombre:<8} {total / duracion:>10.1f} {_p95(lecturas):>12.2f} {_p95(escritas):>14.2f} {fallidas:>9}")
+
+def main(workers: int, total: int, escrituras: float) -> None:
+    print(f"{total} operaciones, {workers} workers, {escrituras:.0%} escrituras")
+    print(f"{'modo':<8} {'ops/s':>10} {'p95 lect ms':>12} {'p95 escr ms':>14} {'fallidas':>9}")
+    for perfil in (False, True):
+        medir(perfil, workers, total, escrituras)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--operaciones", type=int, default=4000)
+    parser.add_argument("--escrituras", type=float, default=0.2)
+    args = parser.parse_args()
+    main(args.workers, args.operaciones, args.escrituras)
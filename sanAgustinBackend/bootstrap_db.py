@@ -0,0 +1,83 @@
+"""Crea o actualiza el esquema de la base con las migraciones de Alembic.
+
+- Base nueva o ya versionada: equivale a `alembic upgrade head`.
+- Base creada antes de las migraciones (con create_all, sin alembic_version):
+  si tiene todas las tablas y columnas de la revisión inicial (no las de los
+  modelos actuales) se marca en esa revisión y se aplican las siguientes; si le falta algo se listan las
+  diferencias (ver migrar_montos_centavos.py y migrar_token_version.py).
+
+Uso: python bootstrap_db.py [--url sqlite:///./comunidad.db]
+"""
+import argparse
+import os
+import sys
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from sqlalchemy import MetaData, create_engine, inspect
+
+from config import settings
+from core.database import create_engine_from_settings
+from models.database import restricciones
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+# Revisión que corresponde al esquema que creaba create_all
+REVISION_INICIAL = "0001"
+
+def _esquema_inicial() -> MetaData:
+    """Esquema de la revisión inicial, aplicada a una base SQLite en memoria"""
+    engine = create_engine("sqlite://")
+    config = Config(ALEMBIC_INI)
+    try:
+        with engine.begin() as connection:
+            config.attributes["connection"] = connection
+            command.upgrade(config, REVISION_INICIAL)
+            metadata = MetaData()
+            metadata.reflect(connection)
+    finally:
+        engine.dispose()
+    metadata.remove(metadata.tables["alembic_version"])
+    return metadata
+
+def _faltantes(connection) -> list:
+    """Tablas y columnas de la revisión inicial que no existen en la base"""
+    diferencias = compare_metadata(MigrationContext.configure(connection), _esquema_inicial())
+    return [d for d in diferencias if isinstance(d, tuple) and d[0] in ("add_table", "add_column")]
+
+def _describir(diferencia: tuple) -> str:
+    if diferencia[0] == "add_table":
+        return f"tabla {diferencia[1].name}"
+    return f"columna {diferencia[2]}.{diferencia[3].name}"
+
+def bootstrap(url: str) -> bool:
+    engine = create_engine_from_settings(url)
+    config = Config(ALEMBIC_INI)
+    config.set_main_option("sqlalchemy.url", url)
+    try:
+        with engine.begin() as connection:
+            config.attributes["connection"] = connection
+            tablas = set(inspect(connection).get_table_names())
+            if tablas and "alembic_version" not in tablas:
+                faltantes = _faltantes(connection)
+                if faltantes:
+                    print("La base existe pero no coincide con la revisión inicial; falta:")
+                    for diferencia in faltantes:
+                        print(f"  {_describir(diferencia)}")
+                    return False
+                print(f"Base existente sin migraciones: se marca en la revisión {REVISION_INICIAL}")
+                command.stamp(config, REVISION_INICIAL)
+                # create_all solo instalaba los triggers en tablas nuevas
+                restricciones.install(connection)
+            command.upgrade(config, "head")
+    finally:
+        engine.dispose()
+    print("Esquema actualizado")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default=settings.DATABASE_URL)
+    args = parser.parse_args()
+    sys.exit(0 if bootstrap(args.url) else 1)
@@ -0,0 +1,27 @@
+from typing import Optional
+from fastapi import Request, Response
+
+def make_etag(*partes) -> str:
+    """ETag débil a partir de las versiones del recurso: equivalente, no idéntico byte a byte"""
+    return 'W/"' + "-".join(str(parte) for parte in partes) + '"'
+
+def _opaco(etag: str) -> str:
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Comparación débil de If-None-Match (lista separada por comas o `*`)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return _opaco(etag) in {_opaco(candidato) for candidato in if_none_match.split(",")}
+
+def not_modified(request: Request, response: Response, etag: str, privado: bool = False) -> Optional[Response]:
+    """Regresa un 304 si el cliente ya tiene esta versión; si no, agrega el ETag a la respuesta"""
+    cache_control = "private, no-cache" if privado else "no-cache"
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": cache_control})
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = cache_control
+    return None
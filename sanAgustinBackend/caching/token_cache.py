@@ -0,0 +1,34 @@
+from typing import Dict, Iterable, Optional, Set
+from caching.ttl_cache import TTLCache
+
+class TokenCache(TTLCache):
+    """Usuarios por token ya verificado; se invalidan por usuario cuando cambia su registro"""
+
+    def __init__(self, maxsize: int = 4096, ttl_segundos: float = 60.0):
+        super().__init__(maxsize, ttl_segundos)
+        self._tokens_por_usuario: Dict[int, Set[bytes]] = {}
+
+    def set(self, clave: bytes, usuario, ttl_segundos: Optional[float] = None) -> None:
+        # El índice por usuario se actualiza bajo el mismo lock que las entradas
+        with self._lock:
+            super().set(clave, usuario, ttl_segundos)
+            self._tokens_por_usuario.setdefault(usuario.id, set()).add(clave)
+
+    def invalidate_usuarios(self, usuario_ids: Iterable[int]) -> None:
+        with self._lock:
+            for usuario_id in usuario_ids:
+                for clave in self._tokens_por_usuario.pop(usuario_id, set()):
+                    self.invalidate(clave)
+
+    def clear(self) -> None:
+        with self._lock:
+            super().clear()
+            self._tokens_por_usuario.clear()
+
+    def _descartada(self, clave: bytes, usuario) -> None:
+        # Expiración, desalojo LRU o invalidación: el índice no crece más que la caché
+        tokens = self._tokens_por_usuario.get(usuario.id)
+        if tokens is not None:
+            tokens.discard(clave)
+            if not tokens:
+                del self._tokens_por_usuario[usuario.id]
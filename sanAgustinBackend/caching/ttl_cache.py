@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+class TTLCache:
+    """Caché LRU en memoria con expiración por entrada y contadores de aciertos.
+
+    Las subclases pueden mantener índices auxiliares bajo el mismo `_lock`
+    (reentrante) y limpiarlos en `_descartada`, que se llama con el lock tomado
+    cada vez que una entrada sale de la caché.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl_segundos: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl_segundos = ttl_segundos
+        self._entradas: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidaciones = 0
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def __contains__(self, clave: Hashable) -> bool:
+        entrada = self._entradas.get(clave)
+        return entrada is not None and entrada[0] > time.monotonic()
+
+    def get(self, clave: Hashable, default: Optional[Any] = None) -> Optional[Any]:
+        with self._lock:
+            entrada = self._entradas.get(clave)
+            if entrada is None or entrada[0] <= time.monotonic():
+                if entrada is not None:
+                    del self._entradas[clave]
+                    self._descartada(clave, entrada[1])
+                self.misses += 1
+                return default
+            self._entradas.move_to_end(clave)
+            self.hits += 1
+            return entrada[1]
+
+    def set(self, clave: Hashable, valor: Any, ttl_segundos: Optional[float] = None) -> None:
+        """`ttl_segundos` permite una expiración menor a la de la caché para esta entrada"""
+        ttl = self.ttl_segundos if ttl_segundos is None else min(ttl_segundos, self.ttl_segundos)
+        with self._lock:
+            anterior = self._entradas.pop(clave, None)
+            if anterior is not None:
+                self._descartada(clave, anterior[1])
+            self._entradas[clave] = (time.monotonic() + ttl, valor)
+            while len(self._entradas) > self.maxsize:
+                clave_lru, (_, valor_lru) = self._entradas.popitem(last=False)
+                self._descartada(clave_lru, valor_lru)
+
+    def invalidate(self, clave: Hashable) -> bool:
+        with self._lock:
+            entrada = self._entradas.pop(clave, None)
+            if entrada is None:
+                return False
+            self._descartada(clave, entrada[1])
+            self.invalidaciones += 1
+            return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entradas.clear()
+
+    def _descartada(self, clave: Hashable, valor: Any) -> None:
+        """Gancho para las subclases: `clave` salió de la caché (se llama con el lock tomado)"""
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            consultas = self.hits + self.misses
+            return {
+                "entradas": len(self._entradas),
+                "maxsize": self.maxsize,
+                "ttl_segundos": self.ttl_segundos,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidaciones": self.invalidaciones,
+                "hit_ratio": round(self.hits / consultas, 4) if consultas else 0.0
+            }
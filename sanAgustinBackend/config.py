@@ -4,6 +4,25 @@ from typing import List
 class Settings:
     # Configuración de la base de datos
     DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite:///./comunidad.db")
+    # Réplica de lectura para las rutas GET; vacío: en SQLite se abre el mismo archivo en solo lectura
+    DATABASE_READ_URL: str = os.getenv("DATABASE_READ_URL", "")
+    # Pool de conexiones (SQLite en archivo y PostgreSQL)
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", "5"))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+    # Solo PostgreSQL: reciclar conexiones viejas y validarlas antes de usarlas
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "True").lower() == "true"
+    DB_CONNECT_TIMEOUT: int = int(os.getenv("DB_CONNECT_TIMEOUT", "10"))
+    # Solo SQLite: segundos que espera una escritura cuando la base está bloqueada
+    DB_SQLITE_BUSY_TIMEOUT: float = float(os.getenv("DB_SQLITE_BUSY_TIMEOUT", "30"))
+    DB_ECHO: bool = os.getenv("DB_ECHO", "False").lower() == "true"
+    # Perfil de producción para SQLite (opcional): WAL, synchronous=NORMAL, mmap y caché
+    SQLITE_PERFIL_PRODUCCION: bool = os.getenv("SQLITE_PERFIL_PRODUCCION", "False").lower() == "true"
+    SQLITE_MMAP_BYTES: int = int(os.getenv("SQLITE_MMAP_BYTES", str(256 * 1024 * 1024)))
+    SQLITE_CACHE_KIB: int = int(os.getenv("SQLITE_CACHE_KIB", str(64 * 1024)))
+    # Cada cuánto se ejecuta PRAGMA optimize (0 lo desactiva)
+    SQLITE_OPTIMIZE_SEGUNDOS: int = int(os.getenv("SQLITE_OPTIMIZE_SEGUNDOS", "3600"))
     
     # Configuración del servidor
     HOST: str = os.getenv("HOST", "0.0.0.0")
@@ -18,6 +37,32 @@ class Settings:
         "http://127.0.0.1:5173"
     ]
     
+    # Tareas de mantenimiento (0 desactiva el barrido de reservas terminadas)
+    BARRIDO_RESERVAS_SEGUNDOS: int = int(os.getenv("BARRIDO_RESERVAS_SEGUNDOS", "300"))
+    # Reservas terminadas con más de estos días se mueven al archivo (0 desactiva el archivo)
+    ARCHIVO_RESERVAS_DIAS: int = int(os.getenv("ARCHIVO_RESERVAS_DIAS", "365"))
+    ARCHIVO_RESERVAS_LOTE: int = int(os.getenv("ARCHIVO_RESERVAS_LOTE", "500"))
+    
+    # Caché del panel de residente
+    PANEL_CACHE_TTL_SEGUNDOS: float = float(os.getenv("PANEL_CACHE_TTL_SEGUNDOS", "60"))
+    PANEL_CACHE_MAX: int = int(os.getenv("PANEL_CACHE_MAX", "1024"))
+    # Caché de tokens verificados en get_current_user/get_current_principal; nunca dura más que el `exp` del token.
+    # Revocar (token_version) invalida la caché solo en el worker que hizo el cambio: en los demás, las rutas
+    # de residentes pueden seguir aceptando el token hasta AUTH_CACHE_TTL_SEGUNDOS. Las rutas de administración
+    # vuelven a consultar token_version en cada petición (verify_token_version).
+    AUTH_CACHE_TTL_SEGUNDOS: float = float(os.getenv("AUTH_CACHE_TTL_SEGUNDOS", "60"))
+    AUTH_CACHE_MAX: int = int(os.getenv("AUTH_CACHE_MAX", "4096"))
+    
+    # Cliente HTTP compartido para los proveedores OAuth
+    HTTP_MAX_CONEXIONES: int = int(os.getenv("HTTP_MAX_CONEXIONES", "20"))
+    HTTP_MAX_KEEPALIVE: int = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+    HTTP_KEEPALIVE_SEGUNDOS: float = float(os.getenv("HTTP_KEEPALIVE_SEGUNDOS", "30"))
+    HTTP_TIMEOUT_SEGUNDOS: float = float(os.getenv("HTTP_TIMEOUT_SEGUNDOS", "10"))
+    HTTP_CONNECT_TIMEOUT_SEGUNDOS: float = float(os.getenv("HTTP_CONNECT_TIMEOUT_SEGUNDOS", "5"))
+    # Descubrimiento OpenID y JWKS de Google: se refrescan en segundo plano antes de caducar
+    OIDC_CACHE_TTL_SEGUNDOS: float = float(os.getenv("OIDC_CACHE_TTL_SEGUNDOS", "3600"))
+    OIDC_REFRESCO_SEGUNDOS: int = int(os.getenv("OIDC_REFRESCO_SEGUNDOS", "1800"))
+    
     # Configuración de logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     
@@ -1,22 +1,170 @@
+import hashlib
+import time
+from typing import Any, Dict, Optional, Set
 from fastapi import Depends, HTTPException, Header
+from sqlalchemy import event, inspect
 from sqlalchemy.orm import Session
+from config import settings
+from caching.token_cache import TokenCache
 from services.auth_service import AuthService
 from core.database import get_db
-from typing import Optional
+from models.auth_models import Usuario
+from models.auth_schemas import User, Principal
+from models.database.departamento import Departamento
+
+token_cache = TokenCache(settings.AUTH_CACHE_MAX, settings.AUTH_CACHE_TTL_SEGUNDOS)
+principal_cache = TokenCache(settings.AUTH_CACHE_MAX, settings.AUTH_CACHE_TTL_SEGUNDOS)
+
+# Cambios del usuario que dejan desactualizados los claims de sus tokens
+CAMPOS_CLAIMS = ("email", "is_admin", "is_active")
+
+def _bearer(authorization: Optional[str]) -> str:
+    if not authorization or not authorization.startswith("Bearer "):
+        raise HTTPException(status_code=401, detail="Token de autorización requerido")
+    return authorization.replace("Bearer ", "")
+
+def _clave(token: str) -> bytes:
+    # La caché no guarda el token en claro
+    return hashlib.sha256(token.encode()).digest()
+
+def _cachear(cache: TokenCache, clave: bytes, valor, payload: Dict[str, Any]) -> None:
+    # La entrada expira junto con el token
+    vigencia = payload["exp"] - time.time() if "exp" in payload else None
+    if vigencia is None or vigencia > 0:
+        cache.set(clave, valor, vigencia)
+
+def _token_revocado() -> HTTPException:
+    return HTTPException(
+        status_code=401,
+        detail="Token revocado, inicie sesión nuevamente",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
 
 def get_current_user(
     authorization: Optional[str] = Header(None),
     db: Session = Depends(get_db)
-):
+) -> User:
     """Dependency para obtener el usuario actual"""
-    if not authorization or not authorization.startswith("Bearer "):
-        raise HTTPException(status_code=401, detail="Token de autorización requerido")
-    
-    token = authorization.replace("Bearer ", "")
+    token = _bearer(authorization)
+    clave = _clave(token)
+    usuario = token_cache.get(clave)
+    if usuario is not None:
+        return usuario
+
     auth_service = AuthService(db)
     payload = auth_service.verify_token(token)
     email = payload.get("sub")
-    user = auth_service.get_user_by_email(email)
+    # El departamento viaja en la misma consulta y queda en la copia cacheada
+    user = auth_service.get_user_with_departamento(email)
     if user is None:
         raise HTTPException(status_code=404, detail="Usuario no encontrado")
-    return user
+    if "ver" in payload and payload["ver"] != (user.token_version or 0):
+        raise _token_revocado()
+
+    # Copia ligera del usuario: no depende de la sesión
+    usuario = User.model_validate(user)
+    _cachear(token_cache, clave, usuario, payload)
+    return usuario
+
+def get_current_principal(
+    authorization: Optional[str] = Header(None),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """Dependency ligera para rutas de lectura: confía en los claims del token.
+
+    Solo consulta la versión del token la primera vez que lo ve (para poder
+    revocarlo); después se sirve de la caché sin tocar la base de datos.
+    """
+    token = _bearer(authorization)
+    clave = _clave(token)
+    principal = principal_cache.get(clave)
+    if principal is not None:
+        return principal
+
+    auth_service = AuthService(db)
+    payload = auth_service.verify_token(token)
+    if "uid" in payload:
+        if auth_service.get_token_version(payload["uid"]) != payload.get("ver", 0):
+            raise _token_revocado()
+        principal = Principal(
+            id=payload["uid"],
+            email=payload["sub"],
+            is_admin=payload.get("adm", False),
+            departamento_id=payload.get("dep")
+        )
+    else:
+        # Token emitido antes de los claims: se completa desde la base
+        user = auth_service.get_user_with_departamento(payload.get("sub"))
+        if user is None:
+            raise HTTPException(status_code=404, detail="Usuario no encontrado")
+        principal = Principal(
+            id=user.id,
+            email=user.email,
+            is_admin=bool(user.is_admin),
+            departamento_id=user.departamento_id
+        )
+
+    _cachear(principal_cache, clave, principal, payload)
+    return principal
+
+def verify_token_version(authorization: Optional[str], db: Session, usuario_id: int) -> None:
+    """Compara la versión del token con la de la base aunque el usuario venga de la caché.
+
+    Invalidar token_cache/principal_cache solo alcanza al proceso que hizo el
+    cambio; las rutas de administración pagan esta consulta por llave primaria
+    para que una revocación hecha en otro worker aplique de inmediato.
+    """
+    auth_service = AuthService(db)
+    payload = auth_service.verify_token(_bearer(authorization))
+    if "ver" in payload and auth_service.get_token_version(usuario_id) != payload["ver"]:
+        _invalidar_usuarios([usuario_id])
+        raise _token_revocado()
+
+def _revocar(usuario: Optional[Usuario]) -> None:
+    if usuario is not None:
+        usuario.token_version = (usuario.token_version or 0) + 1
+
+@event.listens_for(Session, "before_flush")
+def _revocar_claims_desactualizados(session: Session, flush_context, instances) -> None:
+    """Incrementa token_version cuando cambia algo que viaja en los claims del token"""
+    with session.no_autoflush:
+        for obj in session.dirty:
+            if isinstance(obj, Usuario):
+                estado = inspect(obj)
+                if any(estado.attrs[campo].history.has_changes() for campo in CAMPOS_CLAIMS):
+                    _revocar(obj)
+        for obj in (*session.new, *session.dirty, *session.deleted):
+            if isinstance(obj, Departamento):
+                # El claim `dep` del usuario anterior y del nuevo queda desactualizado
+                historial = inspect(obj).attrs.usuario_id.history
+                usuario_ids = {*historial.added, *historial.deleted}
+                if obj in session.deleted:
+                    usuario_ids.add(obj.usuario_id)
+                for usuario_id in usuario_ids - {None}:
+                    _revocar(session.get(Usuario, usuario_id))
+
+def _usuarios_afectados(session: Session) -> Set[int]:
+    return {
+        obj.id for obj in (*session.dirty, *session.deleted)
+        if isinstance(obj, Usuario) and obj.id is not None
+    }
+
+def _invalidar_usuarios(usuario_ids) -> None:
+    token_cache.invalidate_usuarios(usuario_ids)
+    principal_cache.invalidate_usuarios(usuario_ids)
+
+@event.listens_for(Session, "after_flush")
+def _invalidar_tokens_after_flush(session: Session, flush_context) -> None:
+    usuario_ids = _usuarios_afectados(session)
+    if usuario_ids:
+        _invalidar_usuarios(usuario_ids)
+        session.info.setdefault("tokens_usuarios", set()).update(usuario_ids)
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_tokens_after_commit(session: Session) -> None:
+    # Un request concurrente pudo volver a cachear la versión previa al commit
+    _invalidar_usuarios(session.info.pop("tokens_usuarios", ()))
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_tokens_after_rollback(session: Session) -> None:
+    session.info.pop("tokens_usuarios", None)
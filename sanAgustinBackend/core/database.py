@@ -1,14 +1,137 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from models.database import Base
+from typing import Any, AsyncIterator, Dict, List, Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, sessionmaker
+from config import settings
 
-# Configuración de la base de datos
-SQLALCHEMY_DATABASE_URL = "sqlite:///./comunidad.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+# Drivers asíncronos por dialecto
+DRIVERS_ASYNC = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+def async_url(url: str) -> str:
+    """URL equivalente con el driver asíncrono (sqlite+aiosqlite, postgresql+asyncpg)"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    return url.set(drivername=f"{backend}+{DRIVERS_ASYNC[backend]}").render_as_string(hide_password=False)
+
+def engine_options(url: str, asincrono: bool = False, pool_size: Optional[int] = None) -> Dict[str, Any]:
+    """Opciones de pool y de conexión para el backend de `url`, tomadas de settings"""
+    url = make_url(url)
+    backend = url.get_backend_name()
+    opciones: Dict[str, Any] = {"echo": settings.DB_ECHO}
+    pool = {
+        "pool_size": settings.DB_POOL_SIZE if pool_size is None else pool_size,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+    if backend == "sqlite":
+        connect_args: Dict[str, Any] = {"timeout": settings.DB_SQLITE_BUSY_TIMEOUT}
+        if not asincrono:
+            connect_args["check_same_thread"] = False
+        opciones["connect_args"] = connect_args
+        # En memoria SQLAlchemy usa una conexión por hilo; el pool solo aplica a archivos
+        if url.database not in (None, "", ":memory:"):
+            opciones.update(pool)
+        return opciones
+
+    opciones.update(pool)
+    opciones["pool_recycle"] = settings.DB_POOL_RECYCLE
+    opciones["pool_pre_ping"] = settings.DB_POOL_PRE_PING
+    if backend == "postgresql":
+        # psycopg2 y asyncpg nombran distinto el timeout de conexión
+        opciones["connect_args"] = {"timeout": settings.DB_CONNECT_TIMEOUT} if asincrono else {"connect_timeout": settings.DB_CONNECT_TIMEOUT}
+    return opciones
+
+def sqlite_pragmas(solo_lectura: bool = False) -> List[str]:
+    """PRAGMAs del perfil de producción de SQLite, en el orden en que se aplican"""
+    # Los lectores no se bloquean mientras otra conexión escribe; una conexión de
+    # solo lectura no puede cambiar el journal, solo se asegura de no escribir
+    pragmas = [
+        "PRAGMA query_only=1" if solo_lectura else "PRAGMA journal_mode=WAL",
+        # Con WAL, NORMAL solo sincroniza en los checkpoints y sigue siendo consistente
+        "PRAGMA synchronous=NORMAL",
+        f"PRAGMA busy_timeout={int(settings.DB_SQLITE_BUSY_TIMEOUT * 1000)}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_BYTES}",
+        # Negativo: tamaño en KiB en lugar de páginas
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_KIB}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+    return pragmas
+
+def usa_perfil_sqlite(url: str, perfil_sqlite: Optional[bool] = None) -> bool:
+    """El perfil solo aplica a SQLite en archivo y si está activado"""
+    url = make_url(url)
+    activo = settings.SQLITE_PERFIL_PRODUCCION if perfil_sqlite is None else perfil_sqlite
+    return activo and url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+def aplicar_perfil_sqlite(engine: Engine) -> None:
+    """Aplica los PRAGMAs del perfil a cada conexión nueva del engine"""
+    pragmas = sqlite_pragmas(solo_lectura=engine.url.query.get("mode") == "ro")
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+def create_engine_from_settings(url: Optional[str] = None, perfil_sqlite: Optional[bool] = None, **kwargs) -> Engine:
+    url = url or settings.DATABASE_URL
+    engine = create_engine(url, **engine_options(url, **kwargs))
+    if usa_perfil_sqlite(url, perfil_sqlite):
+        aplicar_perfil_sqlite(engine)
+    return engine
+
+def create_async_engine_from_settings(url: Optional[str] = None, perfil_sqlite: Optional[bool] = None, **kwargs) -> AsyncEngine:
+    url = url or settings.DATABASE_URL
+    engine = create_async_engine(async_url(url), **engine_options(url, asincrono=True, **kwargs))
+    if usa_perfil_sqlite(url, perfil_sqlite):
+        aplicar_perfil_sqlite(engine.sync_engine)
+    return engine
+
+def read_url(url: str) -> Optional[str]:
+    """URL de lectura: DATABASE_READ_URL o, en SQLite en archivo, el mismo archivo con mode=ro"""
+    if settings.DATABASE_READ_URL:
+        return settings.DATABASE_READ_URL
+    url = make_url(url)
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:"):
+        return None
+    return url.set(
+        database=f"file:{url.database}",
+        query={**url.query, "mode": "ro", "uri": "true"}
+    ).render_as_string(hide_password=False)
+
+class RoutingSession(Session):
+    """Sesión que lee de la réplica (`lectura`) y escribe en la primaria.
+
+    En cuanto la sesión escribe (flush o INSERT/UPDATE/DELETE explícito) todo lo
+    que sigue va a la primaria, para que las lecturas vean lo recién escrito.
+    """
+
+    def __init__(self, *args, primaria: Engine, lectura: Engine, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.primaria = primaria
+        self.lectura = lectura
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if self._flushing or getattr(clause, "is_dml", False) or getattr(clause, "_for_update_arg", None) is not None:
+            self.info["usa_primaria"] = True
+        return self.primaria if self.info.get("usa_primaria") else self.lectura
+
+def optimize_sqlite(engine: Engine) -> None:
+    """PRAGMA optimize: actualiza las estadísticas del planificador que lo necesiten"""
+    if engine.dialect.name == "sqlite":
+        with engine.connect() as connection:
+            connection.exec_driver_sql("PRAGMA optimize")
+
+# Configuración de la base de datos (DATABASE_URL)
+engine = create_engine_from_settings()
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-# Crear todas las tablas
-Base.metadata.create_all(bind=engine)
+# El esquema lo crean las migraciones (python bootstrap_db.py); importar no toca la base
 
 def get_db():
     db = SessionLocal()
@@ -16,3 +139,25 @@ def get_db():
         yield db
     finally:
         db.close()
+
+# Lecturas: réplica o SQLite en solo lectura; sin ninguna de las dos, la misma primaria
+_url_lectura = read_url(settings.DATABASE_URL)
+read_engine = create_engine_from_settings(_url_lectura) if _url_lectura else engine
+ReadSessionLocal = sessionmaker(class_=RoutingSession, autoflush=False, primaria=engine, lectura=read_engine)
+
+def get_read_db():
+    """Sesión para rutas de solo lectura (catálogos, panel, listados de reservas)"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+# Sesión asíncrona para los handlers `async def`; los scripts siguen con SessionLocal
+async_engine = create_async_engine_from_settings()
+# Sin expire_on_commit: en async no se permite la recarga perezosa de atributos
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -3,6 +3,9 @@ from starlette.config import Config
 from fastapi import Request
 import os
 from dotenv import load_dotenv
+from config import settings
+from networking.http_client import shared_transport, default_timeout
+from networking.oidc_metadata import OIDCMetadataCache
 
 load_dotenv()
 
@@ -11,16 +14,23 @@ config = Config('.env')
 oauth = OAuth()
 
 # Configuración Google OAuth
+GOOGLE_METADATA_URL = 'https://accounts.google.com/.well-known/openid-configuration'
 oauth.register(
     name='google',
     client_id=os.getenv('GOOGLE_CLIENT_ID', 'your_google_client_id'),
     client_secret=os.getenv('GOOGLE_CLIENT_SECRET', 'your_google_client_secret'),
-    server_metadata_url='https://accounts.google.com/.well-known/openid_configuration',
+    server_metadata_url=GOOGLE_METADATA_URL,
     client_kwargs={
-        'scope': 'openid email profile'
+        'scope': 'openid email profile',
+        # Pool compartido de la app en lugar de una conexión nueva por login
+        'transport': shared_transport,
+        'timeout': default_timeout()
     }
 )
 
+# Descubrimiento y JWKS de Google precargados: el callback no consulta a Google para verificar el ID token
+google_metadata = OIDCMetadataCache(oauth.google, GOOGLE_METADATA_URL, settings.OIDC_CACHE_TTL_SEGUNDOS)
+
 # Configuración Facebook OAuth
 oauth.register(
     name='facebook',
@@ -30,7 +40,9 @@ oauth.register(
     access_token_url='https://graph.facebook.com/oauth/access_token',
     authorize_url='https://www.facebook.com/dialog/oauth',
     client_kwargs={
-        'scope': 'email public_profile'
+        'scope': 'email public_profile',
+        'transport': shared_transport,
+        'timeout': default_timeout()
     }
 )
 
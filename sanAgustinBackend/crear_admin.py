@@ -1,13 +1,7 @@
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+from core.database import SessionLocal
 from models.auth_models import Usuario
 from datetime import datetime, timezone
 
-# Crear engine y sesión
-SQLALCHEMY_DATABASE_URL = "sqlite:///./comunidad.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
 def crear_admin():
     db = SessionLocal()
     
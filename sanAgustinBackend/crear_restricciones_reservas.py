@@ -0,0 +1,15 @@
+from core.database import create_engine_from_settings
+from models.database import restricciones
+
+# Engine de DATABASE_URL, con las mismas opciones que la aplicación
+engine = create_engine_from_settings()
+
+# Instalar los triggers de capacidad en una base creada antes de que existieran
+def crear_restricciones():
+    print("Instalando restricciones de traslape de reservas...")
+    with engine.begin() as connection:
+        restricciones.install(connection)
+    print("Restricciones instaladas exitosamente!")
+
+if __name__ == "__main__":
+    crear_restricciones()
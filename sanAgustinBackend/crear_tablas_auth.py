@@ -1,16 +1,8 @@
-from sqlalchemy import create_engine
-from models.auth_models import Base as AuthBase
-from main import Base
+"""Crea o actualiza el esquema completo (incluidas las tablas de autenticación) con las migraciones"""
+import sys
 
-# Crear engine
-SQLALCHEMY_DATABASE_URL = "sqlite:///./comunidad.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-
-# Crear todas las tablas
-def crear_tablas():
-    print("Creando tablas de autenticación...")
-    AuthBase.metadata.create_all(bind=engine)
-    print("Tablas de autenticación creadas exitosamente!")
+from bootstrap_db import bootstrap
+from config import settings
 
 if __name__ == "__main__":
-    crear_tablas()
+    sys.exit(0 if bootstrap(settings.DATABASE_URL) else 1)
@@ -1,6 +1,14 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from config import settings
+from core.database import SessionLocal, async_engine, engine, optimize_sqlite, usa_perfil_sqlite
+from scheduling.periodic import PeriodicTask
+from networking.http_client import start_http_client, stop_http_client
+from services.mantenimiento_service import MantenimientoService
+from core.oauth_config import google_metadata
+
 # Importar rutas de autenticación
 from api.auth_routes import router as auth_router
 
@@ -11,12 +19,44 @@ from services.endpoints.area_comun_endpoints import router as area_comun_router
 from services.endpoints.lugar_visita_endpoints import router as lugar_visita_router
 from services.endpoints.reserva_area_comun_endpoints import router as reserva_area_comun_router
 from services.endpoints.reserva_visita_endpoints import router as reserva_visita_router
+from services.endpoints.mantenimiento_endpoints import router as mantenimiento_router
+
+def barrer_reservas():
+    """Marca como completadas las reservas terminadas y archiva las antiguas, con su propia sesión"""
+    db = SessionLocal()
+    try:
+        service = MantenimientoService()
+        service.expire_reservas(db)
+        if settings.ARCHIVO_RESERVAS_DIAS > 0:
+            service.archive_reservas(db, settings.ARCHIVO_RESERVAS_DIAS, settings.ARCHIVO_RESERVAS_LOTE)
+    finally:
+        db.close()
+
+barrido_reservas = PeriodicTask("barrido-reservas", settings.BARRIDO_RESERVAS_SEGUNDOS, barrer_reservas)
+# La primera ejecución al arrancar es la precarga; después refresca antes de que caduque
+refresco_oidc = PeriodicTask("refresco-oidc-google", settings.OIDC_REFRESCO_SEGUNDOS, google_metadata.refresh)
+optimizacion_sqlite = PeriodicTask("optimize-sqlite", settings.SQLITE_OPTIMIZE_SEGUNDOS, lambda: optimize_sqlite(engine))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    start_http_client()
+    barrido_reservas.start()
+    refresco_oidc.start()
+    if usa_perfil_sqlite(settings.DATABASE_URL):
+        optimizacion_sqlite.start()
+    yield
+    optimizacion_sqlite.stop(timeout=5)
+    refresco_oidc.stop(timeout=5)
+    barrido_reservas.stop(timeout=5)
+    await stop_http_client()
+    await async_engine.dispose()
 
 # Creación de la aplicación FastAPI
 app = FastAPI(
     title="San Agustín API",
     description="API para la gestión de servicios de la privada San Agustín",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configuración de CORS
@@ -38,6 +78,7 @@ app.include_router(area_comun_router)
 app.include_router(lugar_visita_router)
 app.include_router(reserva_area_comun_router)
 app.include_router(reserva_visita_router)
+app.include_router(mantenimiento_router)
 
 # Configurar OAuth
 from core.oauth_config import oauth
@@ -0,0 +1,36 @@
+from sqlalchemy import inspect, text
+from core.database import create_engine_from_settings
+from models.database import Base
+from models.database.adeudo import to_centavos
+from models.database.saldo_departamento import SaldoDepartamento
+
+# Engine de DATABASE_URL, con las mismas opciones que la aplicación
+engine = create_engine_from_settings()
+
+# Convertir los montos de pesos (Float) a centavos (Integer)
+def migrar_montos():
+    print("Migrando montos de adeudos a centavos...")
+    with engine.begin() as connection:
+        columnas = {columna["name"] for columna in inspect(connection).get_columns("adeudos")}
+        if "monto_centavos" not in columnas:
+            connection.exec_driver_sql("ALTER TABLE adeudos ADD COLUMN monto_centavos INTEGER NOT NULL DEFAULT 0")
+            # Mismo redondeo que la aplicación (Decimal, ROUND_HALF_UP): ROUND de SQL varía según el motor
+            montos = [
+                {"id": adeudo_id, "monto_centavos": to_centavos(monto or 0)}
+                for adeudo_id, monto in connection.exec_driver_sql("SELECT id, monto FROM adeudos")
+            ]
+            if montos:
+                connection.execute(text("UPDATE adeudos SET monto_centavos = :monto_centavos WHERE id = :id"), montos)
+        if "monto" in columnas:
+            connection.exec_driver_sql("ALTER TABLE adeudos DROP COLUMN monto")
+        
+        # Los saldos se vuelven a crear en centavos y se recalculan desde los adeudos
+        if inspect(connection).has_table(SaldoDepartamento.__tablename__):
+            columnas_saldo = {columna["name"] for columna in inspect(connection).get_columns(SaldoDepartamento.__tablename__)}
+            if "saldo_centavos" not in columnas_saldo:
+                SaldoDepartamento.__table__.drop(connection)
+        Base.metadata.create_all(connection, tables=[SaldoDepartamento.__table__])
+    print("Montos migrados exitosamente!")
+
+if __name__ == "__main__":
+    migrar_montos()
@@ -0,0 +1,17 @@
+from sqlalchemy import inspect
+from core.database import create_engine_from_settings
+
+# Engine de DATABASE_URL, con las mismas opciones que la aplicación
+engine = create_engine_from_settings()
+
+# Agregar la versión de token a los usuarios existentes
+def migrar_token_version():
+    print("Agregando token_version a usuarios...")
+    with engine.begin() as connection:
+        columnas = {columna["name"] for columna in inspect(connection).get_columns("usuarios")}
+        if "token_version" not in columnas:
+            connection.exec_driver_sql("ALTER TABLE usuarios ADD COLUMN token_version INTEGER NOT NULL DEFAULT 0")
+    print("token_version agregado exitosamente!")
+
+if __name__ == "__main__":
+    migrar_token_version()
@@ -1,60 +1,5 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text
-from sqlalchemy.orm import relationship
-from sqlalchemy.orm import declarative_base
-from datetime import datetime, timezone
+# Los modelos de usuarios comparten la metadata de models.database; se reexportan aquí
+from models.database.base import Base
+from models.database.usuario import Usuario, RegistroPendiente, Contacto
 
-Base = declarative_base()
-
-class Usuario(Base):
-    __tablename__ = "usuarios"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    email = Column(String, unique=True, index=True, nullable=False)
-    nombre = Column(String, nullable=False)
-    apellido = Column(String, nullable=False)
-    provider = Column(String, nullable=False)  # 'google', 'facebook'
-    provider_id = Column(String, nullable=False)  # ID del usuario en el proveedor
-    is_active = Column(Boolean, default=True)
-    is_admin = Column(Boolean, default=False)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
-    
-    # Relación con Contacto
-    contacto = relationship("Contacto", back_populates="usuario", uselist=False)
-    # Relación con Departamento
-    departamento = relationship("Departamento", back_populates="usuario", uselist=False)
-
-class RegistroPendiente(Base):
-    __tablename__ = "registros_pendientes"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    email = Column(String, unique=True, index=True, nullable=False)
-    nombre = Column(String, nullable=False)
-    apellido = Column(String, nullable=False)
-    provider = Column(String, nullable=False)  # 'google', 'facebook'
-    provider_id = Column(String, nullable=False)
-    telefono = Column(String)
-    direccion = Column(String)
-    departamento = Column(String)
-    notas_adicionales = Column(Text)
-    is_approved = Column(Boolean, default=False)
-    approved_by = Column(Integer, ForeignKey("usuarios.id"), nullable=True)
-    approved_at = Column(DateTime, nullable=True)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
-    
-    # Relación con el administrador que aprueba
-    aprobador = relationship("Usuario")
-
-class Contacto(Base):
-    __tablename__ = "contactos"
-    
-    id = Column(Integer, primary_key=True, index=True)
-    usuario_id = Column(Integer, ForeignKey("usuarios.id"), unique=True)
-    telefono = Column(String)
-    direccion = Column(String)
-    departamento = Column(String)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
-    updated_at = Column(DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
-    
-    # Relación con Usuario
-    usuario = relationship("Usuario", back_populates="contacto")
+__all__ = ['Base', 'Usuario', 'RegistroPendiente', 'Contacto']
@@ -24,11 +24,19 @@ class User(UserBase):
     is_active: bool
     is_admin: bool
     created_at: datetime
+    departamento_id: Optional[int] = None
     
     model_config = {
         "from_attributes": True
     }
 
+class Principal(BaseModel):
+    """Identidad tomada de los claims del token, sin consultar la base de datos"""
+    id: int
+    email: str
+    is_admin: bool
+    departamento_id: Optional[int] = None
+
 class RegistroPendienteBase(BaseModel):
     email: EmailStr
     nombre: str
@@ -1,4 +1,5 @@
 from .base import Base
+from .usuario import Usuario, RegistroPendiente, Contacto
 from .departamento import Departamento
 from .area_comun import AreaComun
 from .lugar_visita import LugarVisita
@@ -6,14 +7,25 @@ from .estacionamiento import Estacionamiento
 from .reserva_area_comun import ReservaAreaComun
 from .reserva_visita import ReservaVisita
 from .adeudo import Adeudo
+from .reserva_archivo import ReservaAreaComunArchivo, ReservaVisitaArchivo
+from .saldo_departamento import SaldoDepartamento
+from .version_recurso import VersionRecurso
+from . import restricciones  # Registra los triggers de capacidad de reservas
 
 __all__ = [
     'Base',
+    'Usuario',
+    'RegistroPendiente',
+    'Contacto',
     'Departamento',
     'AreaComun', 
     'LugarVisita',
     'Estacionamiento',
     'ReservaAreaComun',
     'ReservaVisita',
-    'Adeudo'
+    'Adeudo',
+    'ReservaAreaComunArchivo',
+    'ReservaVisitaArchivo',
+    'SaldoDepartamento',
+    'VersionRecurso'
 ]
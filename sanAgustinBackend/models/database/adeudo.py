@@ -1,14 +1,20 @@
-from sqlalchemy import Column, Integer, String, DateTime, Float, Boolean, ForeignKey
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey
+from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .base import Base
 
+def to_centavos(monto) -> int:
+    """Convierte pesos a centavos redondeando al centavo más cercano"""
+    return int((Decimal(str(monto)) * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
 class Adeudo(Base):
     __tablename__ = "adeudos"
     
     id = Column(Integer, primary_key=True, index=True)
     departamento_id = Column(Integer, ForeignKey("departamentos.id"))
-    monto = Column(Float)
+    monto_centavos = Column(Integer, nullable=False, default=0)  # Enteros para sumar sin errores de redondeo
     descripcion = Column(String)
     fecha_vencimiento = Column(DateTime)
     fecha_creacion = Column(DateTime, default=datetime.utcnow)
@@ -16,3 +22,17 @@ class Adeudo(Base):
     
     # Relaciones
     departamento = relationship("Departamento", back_populates="adeudos")
+    
+    @hybrid_property
+    def monto(self) -> float:
+        """Monto en pesos, como lo exponen las respuestas"""
+        return self.monto_centavos / 100 if self.monto_centavos is not None else None
+    
+    @monto.inplace.setter
+    def _monto_setter(self, valor) -> None:
+        self.monto_centavos = to_centavos(valor) if valor is not None else None
+    
+    @monto.inplace.expression
+    @classmethod
+    def _monto_expression(cls):
+        return cls.monto_centavos / 100.0
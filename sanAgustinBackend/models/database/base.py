@@ -1,3 +1,8 @@
 from sqlalchemy.orm import declarative_base
+from sqlalchemy.dialects import postgresql, sqlite
 
 Base = declarative_base()
+
+def dialect_insert(connection):
+    """`insert` del dialecto con soporte de ON CONFLICT, o None si el dialecto no lo tiene"""
+    return {"sqlite": sqlite.insert, "postgresql": postgresql.insert}.get(connection.dialect.name)
@@ -0,0 +1,39 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy.orm import relationship
+from .base import Base
+
+# Reservas completadas o canceladas que ya solo interesan para consulta histórica.
+# Cada fila tiene su propia llave (archivo_id); el id que tenía en la tabla viva se
+# guarda en reserva_id, sin unicidad, porque SQLite puede reutilizar ids borrados.
+# El atributo `id` sigue siendo el de la reserva; las relaciones son de solo lectura.
+
+class ReservaAreaComunArchivo(Base):
+    __tablename__ = "reservas_area_comun_archivo"
+    
+    archivo_id = Column(Integer, primary_key=True)
+    id = Column("reserva_id", Integer, nullable=False)
+    area_comun_id = Column(Integer, ForeignKey("areas_comunes.id"))
+    departamento_id = Column(Integer, ForeignKey("departamentos.id"), index=True)
+    periodo_inicio = Column(DateTime)
+    periodo_fin = Column(DateTime)
+    estado = Column(String)
+    archivado_en = Column(DateTime)
+    
+    # Relaciones
+    area_comun = relationship("AreaComun", viewonly=True)
+
+class ReservaVisitaArchivo(Base):
+    __tablename__ = "reservas_visita_archivo"
+    
+    archivo_id = Column(Integer, primary_key=True)
+    id = Column("reserva_id", Integer, nullable=False)
+    lugar_visita_id = Column(Integer, ForeignKey("lugares_visita.id"))
+    departamento_id = Column(Integer, ForeignKey("departamentos.id"), index=True)
+    placa_visita = Column(String, nullable=True)
+    periodo_inicio = Column(DateTime)
+    periodo_fin = Column(DateTime)
+    estado = Column(String)
+    archivado_en = Column(DateTime)
+    
+    # Relaciones
+    lugar_visita = relationship("LugarVisita", viewonly=True)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from .base import Base
 
@@ -13,6 +13,11 @@ class ReservaVisita(Base):
     periodo_fin = Column(DateTime)
     estado = Column(String, default="activa")  # activa, cancelada, completada
     
+    # El barrido de reservas terminadas filtra por estado y fin del periodo
+    __table_args__ = (
+        Index("ix_reservas_visita_estado_periodo_fin", "estado", "periodo_fin"),
+    )
+    
     # Relaciones
     lugar_visita = relationship("LugarVisita", back_populates="reservas")
     departamento = relationship("Departamento", back_populates="reservas_visita")
@@ -0,0 +1,114 @@
+from sqlalchemy import DDL, event
+from sqlalchemy.exc import IntegrityError
+from .reserva_area_comun import ReservaAreaComun
+from .reserva_visita import ReservaVisita
+
+# Mensaje con el que los triggers rechazan una reserva que excede la capacidad
+MENSAJE_TRASLAPE = "reserva_traslapada"
+
+# (tabla de reservas, columna del recurso, tabla del recurso)
+RESERVAS_CON_CAPACIDAD = [
+    (ReservaAreaComun.__table__, "area_comun_id", "areas_comunes"),
+    (ReservaVisita.__table__, "lugar_visita_id", "lugares_visita"),
+]
+
+
+def _peak_sql(tabla: str, recurso: str) -> str:
+    """Pico de reservas activas del recurso dentro de [NEW.periodo_inicio, NEW.periodo_fin).
+
+    El pico solo puede ocurrir al inicio de la nueva reserva o al inicio de
+    alguna reserva existente dentro de la ventana.
+    """
+    return f"""
+        SELECT MAX(ocupacion) FROM (
+            SELECT (
+                SELECT COUNT(*) FROM {tabla} r
+                WHERE r.{recurso} = NEW.{recurso} AND r.estado = 'activa' AND r.id <> COALESCE(NEW.id, -1)
+                  AND r.periodo_inicio <= p.t AND r.periodo_fin > p.t
+            ) AS ocupacion
+            FROM (
+                SELECT NEW.periodo_inicio AS t
+                UNION
+                SELECT r2.periodo_inicio FROM {tabla} r2
+                WHERE r2.{recurso} = NEW.{recurso} AND r2.estado = 'activa' AND r2.id <> COALESCE(NEW.id, -1)
+                  AND r2.periodo_inicio > NEW.periodo_inicio AND r2.periodo_inicio < NEW.periodo_fin
+            ) p
+        ) ocupaciones
+    """
+
+
+def _capacidad_sql(tabla_recurso: str, recurso: str) -> str:
+    return f"COALESCE((SELECT capacidad FROM {tabla_recurso} WHERE id = NEW.{recurso}), 1)"
+
+
+def sqlite_ddl(tabla: str, recurso: str, tabla_recurso: str) -> list:
+    """Triggers de SQLite; las escrituras ya están serializadas por el lock de la base"""
+    condicion = f"""COALESCE(NEW.estado, 'activa') = 'activa'
+        AND ({_peak_sql(tabla, recurso)}) >= {_capacidad_sql(tabla_recurso, recurso)}"""
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{tabla}_capacidad_insert
+        BEFORE INSERT ON {tabla}
+        WHEN {condicion}
+        BEGIN SELECT RAISE(ABORT, '{MENSAJE_TRASLAPE}'); END""",
+        f"""CREATE TRIGGER IF NOT EXISTS trg_{tabla}_capacidad_update
+        BEFORE UPDATE OF periodo_inicio, periodo_fin, estado, {recurso} ON {tabla}
+        WHEN {condicion}
+        BEGIN SELECT RAISE(ABORT, '{MENSAJE_TRASLAPE}'); END""",
+    ]
+
+
+def postgresql_ddl(tabla: str, recurso: str, tabla_recurso: str) -> list:
+    """Trigger de PostgreSQL con un advisory lock por recurso.
+
+    Solo se serializan las reservas del mismo recurso; las de recursos
+    distintos siguen en paralelo. Una restricción EXCLUDE no sirve aquí
+    porque no contempla capacidad mayor a 1.
+    """
+    return [
+        f"""CREATE OR REPLACE FUNCTION fn_{tabla}_capacidad() RETURNS trigger AS $$
+        BEGIN
+            IF COALESCE(NEW.estado, 'activa') <> 'activa' THEN
+                RETURN NEW;
+            END IF;
+            PERFORM pg_advisory_xact_lock(hashtext('{tabla}'), NEW.{recurso});
+            IF ({_peak_sql(tabla, recurso)}) >= {_capacidad_sql(tabla_recurso, recurso)} THEN
+                RAISE EXCEPTION '{MENSAJE_TRASLAPE}' USING ERRCODE = 'exclusion_violation';
+            END IF;
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql""",
+        f"DROP TRIGGER IF EXISTS trg_{tabla}_capacidad ON {tabla}",
+        f"""CREATE TRIGGER trg_{tabla}_capacidad
+        BEFORE INSERT OR UPDATE OF periodo_inicio, periodo_fin, estado, {recurso} ON {tabla}
+        FOR EACH ROW EXECUTE FUNCTION fn_{tabla}_capacidad()""",
+    ]
+
+
+def ddl(dialecto: str) -> list:
+    """Sentencias que instalan los triggers de todas las tablas en el dialecto indicado"""
+    generadores = {"sqlite": sqlite_ddl, "postgresql": postgresql_ddl}
+    generador = generadores.get(dialecto)
+    if generador is None:
+        return []
+    return [
+        sentencia
+        for tabla, recurso, tabla_recurso in RESERVAS_CON_CAPACIDAD
+        for sentencia in generador(tabla.name, recurso, tabla_recurso)
+    ]
+
+
+def install(connection) -> None:
+    """Instala los triggers en una base existente (son idempotentes)"""
+    for sentencia in ddl(connection.dialect.name):
+        connection.exec_driver_sql(sentencia)
+
+
+def is_overlap_violation(error: IntegrityError) -> bool:
+    return MENSAJE_TRASLAPE in str(error.orig)
+
+
+for _tabla, _recurso, _tabla_recurso in RESERVAS_CON_CAPACIDAD:
+    for _sentencia in sqlite_ddl(_tabla.name, _recurso, _tabla_recurso):
+        event.listen(_tabla, "after_create", DDL(_sentencia).execute_if(dialect="sqlite"))
+    for _sentencia in postgresql_ddl(_tabla.name, _recurso, _tabla_recurso):
+        event.listen(_tabla, "after_create", DDL(_sentencia).execute_if(dialect="postgresql"))
@@ -0,0 +1,131 @@
+from collections import defaultdict
+from itertools import chain
+from typing import Dict, List, Tuple
+from sqlalchemy import Column, Integer, ForeignKey, event, inspect, insert, update, select, delete, func
+from sqlalchemy.ext.hybrid import hybrid_property
+from sqlalchemy.orm import Session
+from .base import Base, dialect_insert
+from .adeudo import Adeudo, to_centavos
+
+class SaldoDepartamento(Base):
+    """Saldo pendiente desnormalizado por departamento; se mantiene en la misma transacción que los adeudos"""
+    __tablename__ = "saldos_departamento"
+    
+    departamento_id = Column(Integer, ForeignKey("departamentos.id"), primary_key=True)
+    saldo_centavos = Column(Integer, nullable=False, default=0)
+    adeudos_pendientes = Column(Integer, nullable=False, default=0)
+    
+    @hybrid_property
+    def saldo_pendiente(self) -> float:
+        """Saldo en pesos"""
+        return (self.saldo_centavos or 0) / 100
+    
+    @saldo_pendiente.inplace.setter
+    def _saldo_pendiente_setter(self, valor) -> None:
+        self.saldo_centavos = to_centavos(valor)
+    
+    @saldo_pendiente.inplace.expression
+    @classmethod
+    def _saldo_pendiente_expression(cls):
+        return cls.saldo_centavos / 100.0
+
+saldos = SaldoDepartamento.__table__
+
+def _valor(obj: Adeudo, atributo: str, previo: bool):
+    """Valor actual del atributo o, si `previo`, el que tenía antes de este flush"""
+    historial = inspect(obj).attrs[atributo].history
+    if previo and historial.deleted:
+        return historial.deleted[0]
+    return getattr(obj, atributo)
+
+def _aporte(obj: Adeudo, previo: bool) -> Tuple[int, int, int]:
+    """(departamento_id, centavos, cantidad) con que el adeudo contribuye al saldo"""
+    if _valor(obj, "pagado", previo):
+        return _valor(obj, "departamento_id", previo), 0, 0
+    return _valor(obj, "departamento_id", previo), _valor(obj, "monto_centavos", previo) or 0, 1
+
+def previous_contributions(session: Session) -> List[Tuple[int, int, int]]:
+    """Aportes al saldo que tenían, antes del flush, los adeudos modificados o eliminados"""
+    return [
+        _aporte(obj, previo=True)
+        for obj in chain(session.dirty, session.deleted)
+        if isinstance(obj, Adeudo) and obj not in session.new
+    ]
+
+def saldo_deltas(session: Session, previos: List[Tuple[int, int, int]]) -> Dict[int, List[int]]:
+    """Cambios netos de saldo por departamento: aportes actuales menos los previos"""
+    deltas: Dict[int, List[int]] = defaultdict(lambda: [0, 0])
+    for departamento_id, centavos, cantidad in previos:
+        deltas[departamento_id][0] -= centavos
+        deltas[departamento_id][1] -= cantidad
+    for obj in chain(session.new, session.dirty):
+        if isinstance(obj, Adeudo) and obj not in session.deleted:
+            departamento_id, centavos, cantidad = _aporte(obj, previo=False)
+            deltas[departamento_id][0] += centavos
+            deltas[departamento_id][1] += cantidad
+    return {
+        departamento_id: delta for departamento_id, delta in deltas.items()
+        if departamento_id is not None and (delta[0] or delta[1])
+    }
+
+def apply_deltas(connection, deltas: Dict[int, List[int]]) -> None:
+    """Suma los cambios al saldo de cada departamento con un upsert"""
+    upsert = dialect_insert(connection)
+    for departamento_id, (centavos, cantidad) in deltas.items():
+        if upsert is not None:
+            sentencia = upsert(saldos).values(
+                departamento_id=departamento_id, saldo_centavos=centavos, adeudos_pendientes=cantidad
+            )
+            connection.execute(sentencia.on_conflict_do_update(
+                index_elements=[saldos.c.departamento_id],
+                set_={
+                    "saldo_centavos": saldos.c.saldo_centavos + sentencia.excluded.saldo_centavos,
+                    "adeudos_pendientes": saldos.c.adeudos_pendientes + sentencia.excluded.adeudos_pendientes
+                }
+            ))
+            continue
+        resultado = connection.execute(update(saldos).where(saldos.c.departamento_id == departamento_id).values(
+            saldo_centavos=saldos.c.saldo_centavos + centavos,
+            adeudos_pendientes=saldos.c.adeudos_pendientes + cantidad
+        ))
+        if resultado.rowcount == 0:
+            connection.execute(insert(saldos).values(
+                departamento_id=departamento_id, saldo_centavos=centavos, adeudos_pendientes=cantidad
+            ))
+
+def rebuild(connection) -> int:
+    """Recalcula todos los saldos desde los adeudos (reparación de desajustes)"""
+    connection.execute(delete(saldos))
+    resultado = connection.execute(insert(saldos).from_select(
+        ["departamento_id", "saldo_centavos", "adeudos_pendientes"],
+        select(
+            Adeudo.departamento_id,
+            func.coalesce(func.sum(Adeudo.monto_centavos), 0),
+            func.count(Adeudo.id)
+        ).where(Adeudo.pagado == False, Adeudo.departamento_id.isnot(None)).group_by(Adeudo.departamento_id)
+    ))
+    return resultado.rowcount
+
+def _conservar_valor_previo(target, value, oldvalue, initiator):
+    return value
+
+# Con active_history se carga el valor anterior aunque la instancia esté expirada
+for _atributo in (Adeudo.monto_centavos, Adeudo.pagado, Adeudo.departamento_id):
+    event.listen(_atributo, "set", _conservar_valor_previo, active_history=True)
+
+@event.listens_for(Session, "before_flush")
+def _registrar_saldos_previos(session: Session, flush_context, instances) -> None:
+    # Antes del flush las filas eliminadas todavía se pueden leer
+    session.info["saldo_previos"] = previous_contributions(session)
+
+@event.listens_for(Session, "after_flush")
+def _actualizar_saldos(session: Session, flush_context) -> None:
+    deltas = saldo_deltas(session, session.info.pop("saldo_previos", []))
+    if deltas:
+        apply_deltas(session.connection(), deltas)
+
+@event.listens_for(Base.metadata, "after_create")
+def _poblar_saldos(target, connection, tables=(), **kw) -> None:
+    # Una base existente ya puede tener adeudos cuando se crea la tabla de saldos
+    if saldos in tables:
+        rebuild(connection)
@@ -0,0 +1,106 @@
+from itertools import chain
+from typing import Iterable, Optional, Set, Tuple
+from sqlalchemy import Column, Integer, String, event, inspect, update, insert
+from sqlalchemy.orm import Session
+from .base import Base, dialect_insert
+from .departamento import Departamento
+from .estacionamiento import Estacionamiento
+from .adeudo import Adeudo
+from .area_comun import AreaComun
+from .lugar_visita import LugarVisita
+from .reserva_area_comun import ReservaAreaComun
+from .reserva_visita import ReservaVisita
+
+# Recursos versionados; los catálogos usan recurso_id 0
+PANEL = "departamento"
+RESERVAS_AREA_COMUN = "reservas_area_comun"
+RESERVAS_VISITA = "reservas_visita"
+AREAS_COMUNES = "areas_comunes"
+LUGARES_VISITA = "lugares_visita"
+
+class VersionRecurso(Base):
+    """Contador que aumenta cada vez que cambian los datos de un recurso (para ETag)"""
+    __tablename__ = "versiones_recurso"
+    
+    recurso = Column(String, primary_key=True)
+    recurso_id = Column(Integer, primary_key=True, default=0)
+    version = Column(Integer, nullable=False, default=0)
+
+versiones = VersionRecurso.__table__
+
+# Recurso que cambia con cada tabla; los catálogos tienen una sola versión, el resto una por departamento
+RECURSOS_POR_MODELO = {
+    Departamento: PANEL,
+    Adeudo: PANEL,
+    Estacionamiento: PANEL,
+    ReservaAreaComun: RESERVAS_AREA_COMUN,
+    ReservaVisita: RESERVAS_VISITA,
+    AreaComun: AREAS_COMUNES,
+    LugarVisita: LUGARES_VISITA,
+}
+CATALOGOS = {AreaComun, LugarVisita}
+
+def resources_for_rows(modelo, departamento_ids: Iterable[Optional[int]]) -> Set[Tuple[str, int]]:
+    """Recursos afectados por filas de `modelo` escritas fuera del ORM (INSERT/UPDATE masivos)"""
+    recurso = RECURSOS_POR_MODELO.get(modelo)
+    if recurso is None:
+        return set()
+    if modelo in CATALOGOS:
+        return {(recurso, 0)}
+    return {(recurso, departamento_id) for departamento_id in departamento_ids if departamento_id is not None}
+
+def _departamentos(obj) -> Set[Optional[int]]:
+    """departamento_id actual y, si cambió en este flush, el anterior"""
+    if isinstance(obj, Departamento):
+        return {obj.id}
+    return {obj.departamento_id, *inspect(obj).attrs.departamento_id.history.deleted}
+
+def changed_resources(session: Session) -> Set[Tuple[str, int]]:
+    """Recursos afectados por los objetos del flush"""
+    recursos: Set[Tuple[str, int]] = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        modelo = type(obj)
+        if modelo in RECURSOS_POR_MODELO:
+            recursos |= resources_for_rows(modelo, () if modelo in CATALOGOS else _departamentos(obj))
+    return recursos
+
+def mark_rows_changed(session: Session, modelo, departamento_ids: Iterable[Optional[int]] = ()) -> None:
+    """Registra filas escritas fuera del ORM; sus versiones aumentan en el commit de la misma transacción"""
+    recursos = resources_for_rows(modelo, departamento_ids)
+    if recursos:
+        session.info.setdefault("versiones_pendientes", set()).update(recursos)
+
+def bump(connection, recursos: Iterable[Tuple[str, int]]) -> None:
+    """Aumenta en uno la versión de cada recurso (la crea si no existe)"""
+    upsert = dialect_insert(connection)
+    for recurso, recurso_id in sorted(recursos):
+        if upsert is not None:
+            sentencia = upsert(versiones).values(recurso=recurso, recurso_id=recurso_id, version=1)
+            connection.execute(sentencia.on_conflict_do_update(
+                index_elements=[versiones.c.recurso, versiones.c.recurso_id],
+                set_={"version": versiones.c.version + 1}
+            ))
+            continue
+        resultado = connection.execute(update(versiones).where(
+            versiones.c.recurso == recurso, versiones.c.recurso_id == recurso_id
+        ).values(version=versiones.c.version + 1))
+        if resultado.rowcount == 0:
+            connection.execute(insert(versiones).values(recurso=recurso, recurso_id=recurso_id, version=1))
+
+@event.listens_for(Session, "after_flush")
+def _registrar_cambios(session: Session, flush_context) -> None:
+    recursos = changed_resources(session)
+    if recursos:
+        session.info.setdefault("versiones_pendientes", set()).update(recursos)
+
+@event.listens_for(Session, "before_commit")
+def _aumentar_versiones(session: Session) -> None:
+    # before_commit corre antes del último flush; se adelanta para juntar todos los cambios.
+    # Se aplica dentro de la transacción de los datos: nunca hay versión nueva con datos viejos
+    session.flush()
+    if session.info.get("versiones_pendientes"):
+        bump(session.connection(), session.info.pop("versiones_pendientes"))
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_cambios(session: Session) -> None:
+    session.info.pop("versiones_pendientes", None)
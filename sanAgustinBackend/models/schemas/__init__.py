@@ -2,10 +2,14 @@ from .departamento import DepartamentoResponse
 from .estacionamiento import EstacionamientoResponse, EstacionamientoUpdate
 from .area_comun import AreaComunResponse
 from .lugar_visita import LugarVisitaResponse
-from .reserva_area_comun import ReservaAreaComunCreate, ReservaAreaComunResponse
-from .reserva_visita import ReservaVisitaCreate, ReservaVisitaResponse
+from .reserva_area_comun import (
+    ReservaAreaComunCreate, ReservaAreaComunResponse, IntervaloOcupado, CalendarioAreaComunResponse, HuecoAreaComun,
+    ReservaAreaComunRecurrenteCreate, ReservaAreaComunRecurrenteResponse
+)
+from .reserva_visita import ReservaVisitaCreate, ReservaVisitaResponse, HuecoLugarVisita
 from .adeudo import AdeudoResponse
 from .panel_residente import PanelResidenteResponse
+from .mantenimiento import BarridoReservasResponse, ArchivoReservasResponse, EstadoBarridoResponse, EstadoCacheResponse
 
 __all__ = [
     'DepartamentoResponse',
@@ -15,8 +19,18 @@ __all__ = [
     'LugarVisitaResponse',
     'ReservaAreaComunCreate',
     'ReservaAreaComunResponse',
+    'IntervaloOcupado',
+    'CalendarioAreaComunResponse',
+    'HuecoAreaComun',
+    'ReservaAreaComunRecurrenteCreate',
+    'ReservaAreaComunRecurrenteResponse',
     'ReservaVisitaCreate',
     'ReservaVisitaResponse',
+    'HuecoLugarVisita',
     'AdeudoResponse',
-    'PanelResidenteResponse'
+    'PanelResidenteResponse',
+    'BarridoReservasResponse',
+    'ArchivoReservasResponse',
+    'EstadoBarridoResponse',
+    'EstadoCacheResponse'
 ]
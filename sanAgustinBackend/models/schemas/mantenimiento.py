@@ -0,0 +1,35 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional
+
+class BarridoReservasResponse(BaseModel):
+    ejecutado_en: datetime
+    duracion_ms: float
+    reservas_area_comun: int
+    reservas_visita: int
+
+class ArchivoReservasResponse(BaseModel):
+    ejecutado_en: datetime
+    antes_de: datetime
+    duracion_ms: float
+    reservas_area_comun: int
+    reservas_visita: int
+
+class EstadoBarridoResponse(BaseModel):
+    ejecuciones: int
+    total_reservas_area_comun: int
+    total_reservas_visita: int
+    total_archivadas_area_comun: int = 0
+    total_archivadas_visita: int = 0
+    ultimo: Optional[BarridoReservasResponse] = None
+    ultimo_archivo: Optional[ArchivoReservasResponse] = None
+    ultimo_error: Optional[str] = None
+
+class EstadoCacheResponse(BaseModel):
+    entradas: int
+    maxsize: int
+    ttl_segundos: float
+    hits: int
+    misses: int
+    invalidaciones: int
+    hit_ratio: float
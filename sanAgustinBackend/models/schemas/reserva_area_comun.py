@@ -1,12 +1,20 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, List, Literal
 
 class ReservaAreaComunCreate(BaseModel):
     area_comun_id: int
     periodo_inicio: datetime
     periodo_fin: datetime
 
+class ReservaAreaComunRecurrenteCreate(BaseModel):
+    area_comun_id: int
+    periodo_inicio: datetime
+    periodo_fin: datetime
+    frecuencia: Literal["diaria", "semanal"] = "semanal"
+    repeticiones: int = Field(..., ge=1, le=52)
+    omitir_conflictos: bool = True
+
 class ReservaAreaComunResponse(BaseModel):
     id: int
     area_comun_id: int
@@ -19,3 +27,22 @@ class ReservaAreaComunResponse(BaseModel):
     model_config = {
         "from_attributes": True
     }
+
+class IntervaloOcupado(BaseModel):
+    inicio: datetime
+    fin: datetime
+
+class CalendarioAreaComunResponse(BaseModel):
+    area_comun_id: int
+    nombre: str
+    ocupado: List[IntervaloOcupado]
+
+class HuecoAreaComun(BaseModel):
+    area_comun_id: int
+    nombre: str
+    inicio: datetime
+    fin: datetime
+
+class ReservaAreaComunRecurrenteResponse(BaseModel):
+    creadas: List[ReservaAreaComunResponse]
+    conflictos: List[IntervaloOcupado]
@@ -4,7 +4,7 @@ from typing import Optional
 from .lugar_visita import LugarVisitaResponse
 
 class ReservaVisitaCreate(BaseModel):
-    lugar_visita_id: int
+    lugar_visita_id: Optional[int] = None  # None asigna automáticamente un lugar libre
     placa_visita: Optional[str] = None
     periodo_inicio: datetime
     periodo_fin: datetime
@@ -22,3 +22,9 @@ class ReservaVisitaResponse(BaseModel):
     model_config = {
         "from_attributes": True
     }
+
+class HuecoLugarVisita(BaseModel):
+    lugar_visita_id: int
+    numero: str
+    inicio: datetime
+    fin: datetime
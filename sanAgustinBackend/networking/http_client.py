@@ -0,0 +1,69 @@
+from typing import Optional
+import httpx
+
+from config import settings
+
+def default_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=settings.HTTP_MAX_CONEXIONES,
+        max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE,
+        keepalive_expiry=settings.HTTP_KEEPALIVE_SEGUNDOS
+    )
+
+def default_timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.HTTP_TIMEOUT_SEGUNDOS, connect=settings.HTTP_CONNECT_TIMEOUT_SEGUNDOS)
+
+class SharedTransport(httpx.AsyncBaseTransport):
+    """Pool de conexiones que vive con la app y se comparte entre clientes.
+
+    authlib crea y cierra un cliente por cada llamada al proveedor; al recibir
+    este transporte, su `aclose` no cierra el pool y las conexiones (y el TLS)
+    se reutilizan entre logins. El pool se cierra solo con `close_pool`.
+    """
+
+    def __init__(self):
+        self._transport: Optional[httpx.AsyncBaseTransport] = None
+
+    def open(self, transport: Optional[httpx.AsyncBaseTransport] = None) -> None:
+        """`transport` permite usar un proveedor falso (httpx.MockTransport) en los tests"""
+        self._transport = transport or httpx.AsyncHTTPTransport(limits=default_limits(), retries=1)
+
+    @property
+    def abierto(self) -> bool:
+        return self._transport is not None
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self._transport is None:
+            # Fuera del lifespan (scripts, TestClient sin `with`) se abre al primer uso
+            self.open()
+        return await self._transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        # Los clientes que lo usan no lo cierran
+        pass
+
+    async def close_pool(self) -> None:
+        if self._transport is not None:
+            transport, self._transport = self._transport, None
+            await transport.aclose()
+
+shared_transport = SharedTransport()
+_http_client: Optional[httpx.AsyncClient] = None
+
+def get_http_client() -> httpx.AsyncClient:
+    """Cliente HTTP de la app para llamadas a los proveedores (dependency de FastAPI)"""
+    global _http_client
+    if _http_client is None:
+        _http_client = httpx.AsyncClient(transport=shared_transport, timeout=default_timeout())
+    return _http_client
+
+def start_http_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    shared_transport.open(transport)
+    return get_http_client()
+
+async def stop_http_client() -> None:
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+    await shared_transport.close_pool()
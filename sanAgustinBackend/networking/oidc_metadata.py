@@ -0,0 +1,77 @@
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+import httpx
+
+from networking.http_client import default_timeout
+
+logger = logging.getLogger(__name__)
+
+class OIDCMetadataCache:
+    """Documento de descubrimiento y JWKS de un proveedor OpenID, precargados y refrescados en segundo plano.
+
+    Escribe en `server_metadata` de la app de authlib con las mismas claves que
+    authlib usa como caché (`_loaded_at` y `jwks`), así el callback verifica el
+    ID token sin ir a la red. Si un refresco falla se conserva la última copia buena.
+    """
+
+    def __init__(self, app, metadata_url: str, ttl_segundos: float = 3600.0, transport: Optional[httpx.BaseTransport] = None):
+        self.app = app
+        self.metadata_url = metadata_url
+        self.ttl_segundos = ttl_segundos
+        self._transport = transport
+        self._lock = threading.Lock()
+        self.cargado_en: Optional[float] = None
+        self.refrescos = 0
+        self.fallos = 0
+        self.ultimo_error: Optional[str] = None
+
+    @property
+    def vigente(self) -> bool:
+        return self.cargado_en is not None and time.time() - self.cargado_en < self.ttl_segundos
+
+    def fetch(self) -> Dict[str, Any]:
+        """Descarga el documento de descubrimiento y su JWKS"""
+        with httpx.Client(transport=self._transport, timeout=default_timeout()) as client:
+            resp = client.get(self.metadata_url)
+            resp.raise_for_status()
+            metadata = resp.json()
+            jwks_uri = metadata.get("jwks_uri")
+            if not jwks_uri:
+                raise ValueError('Falta "jwks_uri" en el documento de descubrimiento')
+            resp = client.get(jwks_uri)
+            resp.raise_for_status()
+            metadata["jwks"] = resp.json()
+        return metadata
+
+    def refresh(self) -> bool:
+        """Refresca la copia en caché; regresa False (y conserva la anterior) si falla"""
+        with self._lock:
+            try:
+                metadata = self.fetch()
+            except (httpx.HTTPError, ValueError) as error:
+                self.fallos += 1
+                self.ultimo_error = str(error)
+                logger.warning("No se pudo refrescar %s, se usa la última copia: %s", self.metadata_url, error)
+                return False
+            metadata["_loaded_at"] = time.time()
+            # update y no reemplazo: authlib nunca ve el diccionario vacío a medio refrescar
+            self.app.server_metadata.update(metadata)
+            self.cargado_en = metadata["_loaded_at"]
+            self.refrescos += 1
+            self.ultimo_error = None
+            return True
+
+    def refresh_if_stale(self) -> bool:
+        return self.vigente or self.refresh()
+
+    def estado(self) -> Dict[str, Any]:
+        return {
+            "metadata_url": self.metadata_url,
+            "vigente": self.vigente,
+            "cargado_en": self.cargado_en,
+            "refrescos": self.refrescos,
+            "fallos": self.fallos,
+            "ultimo_error": self.ultimo_error,
+        }
@@ -1,70 +1,15 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, ForeignKey, Float, Boolean
-from sqlalchemy.orm import sessionmaker, relationship, declarative_base
-from datetime import datetime, timedelta
-
-# Crear engine y sesión
-SQLALCHEMY_DATABASE_URL = "sqlite:///./comunidad.db"
-engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-Base = declarative_base()
-
-# Modelos SQLAlchemy
-class Usuario(Base):
-    __tablename__ = "usuarios"
-    id = Column(Integer, primary_key=True, index=True)
-    email = Column(String, unique=True, index=True, nullable=False)
-    nombre = Column(String, nullable=False)
-    apellido = Column(String, nullable=False)
-    provider = Column(String, nullable=False)
-    provider_id = Column(String, nullable=False)
-    is_active = Column(Boolean, default=True)
-    is_admin = Column(Boolean, default=False)
-
-class Departamento(Base):
-    __tablename__ = "departamentos"
-    id = Column(Integer, primary_key=True, index=True)
-    numero = Column(String, index=True, unique=True)
-    usuario_id = Column(Integer, ForeignKey("usuarios.id"), nullable=True)
+"""Carga datos de ejemplo en la base de DATABASE_URL.
 
-class AreaComun(Base):
-    __tablename__ = "areas_comunes"
-    id = Column(Integer, primary_key=True, index=True)
-    nombre = Column(String, index=True)
-    descripcion = Column(String)
-    ubicacion = Column(String)
-    capacidad = Column(Integer, default=1)
-
-class LugarVisita(Base):
-    __tablename__ = "lugares_visita"
-    id = Column(Integer, primary_key=True, index=True)
-    numero = Column(String, unique=True)
-    descripcion = Column(String)
-    capacidad = Column(Integer, default=1)
-
-class Estacionamiento(Base):
-    __tablename__ = "estacionamientos"
-    id = Column(Integer, primary_key=True, index=True)
-    numero = Column(String, unique=True)
-    placa = Column(String)
-    modelo_auto = Column(String)
-    color_auto = Column(String)
-    es_visita = Column(Boolean, default=False)
-    departamento_id = Column(Integer, ForeignKey("departamentos.id"))
+El esquema (tablas, triggers y saldos) lo crea antes `python bootstrap_db.py`;
+aquí solo se insertan filas con los modelos de la aplicación, de modo que los
+saldos por departamento y las versiones se mantienen igual que en las rutas.
+"""
+from datetime import datetime, timedelta
 
-class Adeudo(Base):
-    __tablename__ = "adeudos"
-    id = Column(Integer, primary_key=True, index=True)
-    departamento_id = Column(Integer, ForeignKey("departamentos.id"))
-    monto = Column(Float)
-    descripcion = Column(String)
-    fecha_vencimiento = Column(DateTime)
-    fecha_creacion = Column(DateTime, default=datetime.utcnow)
-    pagado = Column(Boolean, default=False)
+from core.database import SessionLocal
+from models.database import AreaComun, LugarVisita, Departamento, Estacionamiento, Adeudo
 
 def poblar_base_datos():
-    # Crear todas las tablas
-    Base.metadata.create_all(bind=engine)
-    
     db = SessionLocal()
     
     try:
@@ -152,7 +97,7 @@ def poblar_base_datos():
                 modelo_auto="Toyota Corolla",
                 color_auto="Blanco",
                 es_visita=False,
-                departamento_id=1
+                departamento=departamentos[0]
             ),
             Estacionamiento(
                 numero="E02",
@@ -160,7 +105,7 @@ def poblar_base_datos():
                 modelo_auto="Honda Civic",
                 color_auto="Negro",
                 es_visita=False,
-                departamento_id=2
+                departamento=departamentos[1]
             ),
             Estacionamiento(
                 numero="E03",
@@ -168,7 +113,7 @@ def poblar_base_datos():
                 modelo_auto="Nissan Sentra",
                 color_auto="Gris",
                 es_visita=False,
-                departamento_id=3
+                departamento=departamentos[2]
             ),
             # Estacionamientos de visita
             Estacionamiento(
@@ -194,22 +139,22 @@ def poblar_base_datos():
         # Crear algunos adeudos de ejemplo
         adeudos = [
             Adeudo(
-                departamento_id=1,
-                monto=1500.00,
+                departamento=departamentos[0],
+                monto_centavos=150000,
                 descripcion="Mantenimiento mensual",
                 fecha_vencimiento=datetime.now() + timedelta(days=15),
                 pagado=False
             ),
             Adeudo(
-                departamento_id=5,
-                monto=2300.00,
+                departamento=departamentos[4],
+                monto_centavos=230000,
                 descripcion="Mantenimiento mensual",
                 fecha_vencimiento=datetime.now() + timedelta(days=5),
                 pagado=False
             ),
             Adeudo(
-                departamento_id=10,
-                monto=800.00,
+                departamento=departamentos[9],
+                monto_centavos=80000,
                 descripcion="Mantenimiento mensual",
                 fecha_vencimiento=datetime.now() - timedelta(days=10),
                 pagado=False
@@ -0,0 +1,15 @@
+from core.database import SessionLocal
+from services.mantenimiento_service import MantenimientoService
+
+# Recalcular los saldos materializados si se desajustaron (cargas masivas, ediciones manuales)
+def reconstruir_saldos():
+    print("Reconstruyendo saldos por departamento...")
+    db = SessionLocal()
+    try:
+        departamentos = MantenimientoService().rebuild_saldos(db)
+    finally:
+        db.close()
+    print(f"Saldos reconstruidos: {departamentos} departamentos con adeudos pendientes")
+
+if __name__ == "__main__":
+    reconstruir_saldos()
@@ -1,4 +1,5 @@
 from .base_repository import BaseRepository
+from .async_base_repository import AsyncBaseRepository
 from .departamento_repository import DepartamentoRepository
 from .estacionamiento_repository import EstacionamientoRepository
 from .area_comun_repository import AreaComunRepository
@@ -6,14 +7,22 @@ from .lugar_visita_repository import LugarVisitaRepository
 from .reserva_area_comun_repository import ReservaAreaComunRepository
 from .reserva_visita_repository import ReservaVisitaRepository
 from .adeudo_repository import AdeudoRepository
+from .saldo_departamento_repository import SaldoDepartamentoRepository
+from .reserva_archivo_repository import ReservaAreaComunArchivoRepository, ReservaVisitaArchivoRepository
+from .version_recurso_repository import VersionRecursoRepository
 
 __all__ = [
     'BaseRepository',
+    'AsyncBaseRepository',
     'DepartamentoRepository',
     'EstacionamientoRepository',
     'AreaComunRepository',
     'LugarVisitaRepository',
     'ReservaAreaComunRepository',
     'ReservaVisitaRepository',
-    'AdeudoRepository'
+    'AdeudoRepository',
+    'SaldoDepartamentoRepository',
+    'ReservaAreaComunArchivoRepository',
+    'ReservaVisitaArchivoRepository',
+    'VersionRecursoRepository'
 ]
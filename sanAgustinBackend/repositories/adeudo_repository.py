@@ -1,5 +1,6 @@
 from typing import List
 from sqlalchemy.orm import Session
+from sqlalchemy import func
 from .base_repository import BaseRepository
 from models.database.adeudo import Adeudo
 
@@ -14,11 +15,11 @@ class AdeudoRepository(BaseRepository[Adeudo]):
         ).all()
 
     def get_total_adeudos_by_departamento_id(self, db: Session, departamento_id: int) -> float:
-        result = db.query(Adeudo).filter(
+        total_centavos = db.query(func.coalesce(func.sum(Adeudo.monto_centavos), 0)).filter(
             Adeudo.departamento_id == departamento_id,
             Adeudo.pagado == False
-        ).with_entities(Adeudo.monto).all()
-        return sum(row[0] for row in result) if result else 0.0
+        ).scalar()
+        return total_centavos / 100
 
     def get_all_pendientes(self, db: Session) -> List[Adeudo]:
         return db.query(Adeudo).filter(Adeudo.pagado == False).all()
@@ -12,3 +12,6 @@ class AreaComunRepository(BaseRepository[AreaComun]):
 
     def get_all_active(self, db: Session) -> List[AreaComun]:
         return db.query(AreaComun).all()
+
+    def get_by_ids(self, db: Session, ids: List[int]) -> List[AreaComun]:
+        return db.query(AreaComun).filter(AreaComun.id.in_(ids)).all()
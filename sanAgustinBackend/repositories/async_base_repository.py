@@ -0,0 +1,49 @@
+from typing import Generic, TypeVar, Type, Optional, List, Any, Dict
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from models.database.base import Base
+
+ModelType = TypeVar("ModelType", bound=Base)
+
+class AsyncBaseRepository(Generic[ModelType]):
+    """Versión asíncrona de BaseRepository para los handlers `async def`"""
+
+    def __init__(self, model: Type[ModelType]):
+        self.model = model
+
+    async def get(self, db: AsyncSession, id: Any) -> Optional[ModelType]:
+        return await db.get(self.model, id)
+
+    async def get_multi(self, db: AsyncSession, *, skip: int = 0, limit: int = 100) -> List[ModelType]:
+        resultado = await db.scalars(select(self.model).offset(skip).limit(limit))
+        return resultado.all()
+
+    async def create(self, db: AsyncSession, *, obj_in: Dict[str, Any]) -> ModelType:
+        db_obj = self.model(**obj_in)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def update(self, db: AsyncSession, *, db_obj: ModelType, obj_in: Dict[str, Any]) -> ModelType:
+        for field, value in obj_in.items():
+            if hasattr(db_obj, field):
+                setattr(db_obj, field, value)
+        db.add(db_obj)
+        await db.commit()
+        await db.refresh(db_obj)
+        return db_obj
+
+    async def remove(self, db: AsyncSession, *, id: int) -> Optional[ModelType]:
+        obj = await db.get(self.model, id)
+        await db.delete(obj)
+        await db.commit()
+        return obj
+
+    async def get_by_field(self, db: AsyncSession, field: str, value: Any) -> Optional[ModelType]:
+        return await db.scalar(select(self.model).filter(getattr(self.model, field) == value).limit(1))
+
+    async def get_by_fields(self, db: AsyncSession, filters: Dict[str, Any]) -> List[ModelType]:
+        conditions = [getattr(self.model, field) == value for field, value in filters.items()]
+        resultado = await db.scalars(select(self.model).filter(and_(*conditions)))
+        return resultado.all()
@@ -1,7 +1,10 @@
 from typing import Generic, TypeVar, Type, Optional, List, Any, Dict
 from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from sqlalchemy.engine import Row
+from sqlalchemy import and_, insert
+from sqlalchemy.exc import IntegrityError
 from models.database.base import Base
+from models.database.version_recurso import mark_rows_changed
 
 ModelType = TypeVar("ModelType", bound=Base)
 
@@ -22,6 +25,35 @@ class BaseRepository(Generic[ModelType]):
         db.refresh(db_obj)
         return db_obj
 
+    def create_row(self, db: Session, *, obj_in: Dict[str, Any]) -> Row:
+        """Inserta un registro con INSERT ... RETURNING y hace commit sin refresh posterior"""
+        columnas = self.model.__table__.columns
+        try:
+            fila = db.execute(insert(self.model).values(**obj_in).returning(*columnas)).one()
+            self._mark_changed(db, [fila])
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise
+        return fila
+
+    def create_many(self, db: Session, *, objs_in: List[Dict[str, Any]]) -> List[Row]:
+        """Inserta varios registros con un solo INSERT ... RETURNING y un commit.
+
+        Regresa filas (no instancias ORM) para que el commit no obligue a recargarlas.
+        """
+        if not objs_in:
+            return []
+        columnas = self.model.__table__.columns
+        try:
+            filas = db.execute(insert(self.model).returning(*columnas), objs_in).all()
+            self._mark_changed(db, filas)
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            raise
+        return filas
+
     def update(self, db: Session, *, db_obj: ModelType, obj_in: Dict[str, Any]) -> ModelType:
         for field, value in obj_in.items():
             if hasattr(db_obj, field):
@@ -43,3 +75,7 @@ class BaseRepository(Generic[ModelType]):
     def get_by_fields(self, db: Session, filters: Dict[str, Any]) -> List[ModelType]:
         conditions = [getattr(self.model, field) == value for field, value in filters.items()]
         return db.query(self.model).filter(and_(*conditions)).all()
+
+    def _mark_changed(self, db: Session, filas: List[Row]) -> None:
+        """Las escrituras sin ORM no pasan por el flush: se registran a mano para versionar (ETag)"""
+        mark_rows_changed(db, self.model, (getattr(fila, "departamento_id", None) for fila in filas))
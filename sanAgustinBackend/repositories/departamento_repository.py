@@ -1,7 +1,12 @@
 from typing import Optional, List
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy.engine import Row
+from sqlalchemy import and_, func, select
 from .base_repository import BaseRepository
 from models.database.departamento import Departamento
+from models.database.estacionamiento import Estacionamiento
+from models.database.adeudo import Adeudo
+from models.database.saldo_departamento import SaldoDepartamento
 
 class DepartamentoRepository(BaseRepository[Departamento]):
     def __init__(self):
@@ -15,3 +20,24 @@ class DepartamentoRepository(BaseRepository[Departamento]):
 
     def get_all_with_adeudos(self, db: Session) -> List[Departamento]:
         return db.query(Departamento).join(Departamento.adeudos).all()
+
+    def get_panel_by_usuario_id(self, db: Session, usuario_id: int) -> List[Row]:
+        """En una sola consulta: departamento, su saldo, su estacionamiento (no de visita) y sus adeudos pendientes.
+
+        Regresa una fila (Departamento, SaldoDepartamento, Estacionamiento, Adeudo) por adeudo pendiente,
+        o una sola fila con Adeudo None si no tiene; lista vacía si el usuario no tiene departamento.
+        """
+        propio = aliased(Estacionamiento)
+        primer_estacionamiento = select(func.min(propio.id)).where(
+            propio.departamento_id == Departamento.id,
+            propio.es_visita == False
+        ).correlate(Departamento).scalar_subquery()
+        return db.query(Departamento, SaldoDepartamento, Estacionamiento, Adeudo).select_from(Departamento).outerjoin(
+            SaldoDepartamento, SaldoDepartamento.departamento_id == Departamento.id
+        ).outerjoin(
+            Estacionamiento, Estacionamiento.id == primer_estacionamiento
+        ).outerjoin(
+            Adeudo, and_(Adeudo.departamento_id == Departamento.id, Adeudo.pagado == False)
+        ).filter(
+            Departamento.usuario_id == usuario_id
+        ).order_by(Adeudo.id).all()
@@ -12,3 +12,6 @@ class LugarVisitaRepository(BaseRepository[LugarVisita]):
 
     def get_all_active(self, db: Session) -> List[LugarVisita]:
         return db.query(LugarVisita).all()
+
+    def get_by_ids(self, db: Session, ids: List[int]) -> List[LugarVisita]:
+        return db.query(LugarVisita).filter(LugarVisita.id.in_(ids)).all()
@@ -0,0 +1,71 @@
+from typing import List, Type
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import insert, delete, select
+from datetime import datetime
+from .base_repository import BaseRepository
+from models.database.base import Base
+from models.database.reserva_area_comun import ReservaAreaComun
+from models.database.reserva_visita import ReservaVisita
+from models.database.version_recurso import mark_rows_changed
+from models.database.reserva_archivo import ReservaAreaComunArchivo, ReservaVisitaArchivo
+
+# Solo se archivan reservas que ya no pueden cambiar
+ESTADOS_ARCHIVABLES = ("completada", "cancelada")
+
+class ReservaArchivoRepository(BaseRepository):
+    """Tabla de archivo de reservas; `origen` es la tabla viva de donde se mueven y `recurso` la relación que se serializa"""
+
+    def __init__(self, origen: Type[Base], archivo: Type[Base], recurso):
+        super().__init__(archivo)
+        self.origen = origen
+        self.recurso = recurso
+
+    def get_by_departamento_id(self, db: Session, departamento_id: int) -> List[Base]:
+        # El área o lugar se serializa en cada elemento: se carga en la misma consulta
+        return db.query(self.model).options(joinedload(self.recurso)).filter(self.model.departamento_id == departamento_id).all()
+
+    def archive_older_than(self, db: Session, antes_de: datetime, lote: int = 500) -> int:
+        """Mueve al archivo, en lotes con su propio commit, las reservas terminadas antes de `antes_de`.
+
+        Varios workers pueden correr el archivo a la vez: en PostgreSQL cada uno
+        toma un lote distinto (FOR UPDATE SKIP LOCKED; SQLite lo ignora porque ya
+        serializa las escrituras) y solo se archivan las filas que el propio
+        DELETE ... RETURNING alcanzó a borrar, así que ninguna se copia dos veces.
+        """
+        origen = self.origen.__table__
+        archivado_en = datetime.now()
+        total = 0
+        while True:
+            ids = db.execute(
+                select(origen.c.id)
+                .where(origen.c.estado.in_(ESTADOS_ARCHIVABLES), origen.c.periodo_fin < antes_de)
+                .order_by(origen.c.id)
+                .limit(lote)
+                .with_for_update(skip_locked=True)
+            ).scalars().all()
+            if not ids:
+                break
+            filas = db.execute(
+                delete(origen).where(origen.c.id.in_(ids)).returning(*origen.c)
+            ).mappings().all()
+            if filas:
+                # El id de la tabla viva se guarda en reserva_id; archivo_id lo asigna la base
+                db.execute(insert(self.model.__table__), [
+                    {**{("reserva_id" if nombre == "id" else nombre): valor for nombre, valor in fila.items()}, "archivado_en": archivado_en}
+                    for fila in filas
+                ])
+                # Sin include_archived, el listado del departamento cambia
+                mark_rows_changed(db, self.origen, (fila["departamento_id"] for fila in filas))
+            db.commit()
+            total += len(filas)
+            if len(ids) < lote:
+                break
+        return total
+
+class ReservaAreaComunArchivoRepository(ReservaArchivoRepository):
+    def __init__(self):
+        super().__init__(ReservaAreaComun, ReservaAreaComunArchivo, ReservaAreaComunArchivo.area_comun)
+
+class ReservaVisitaArchivoRepository(ReservaArchivoRepository):
+    def __init__(self):
+        super().__init__(ReservaVisita, ReservaVisitaArchivo, ReservaVisitaArchivo.lugar_visita)
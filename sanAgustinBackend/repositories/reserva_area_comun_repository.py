@@ -1,25 +1,142 @@
-from typing import List
-from sqlalchemy.orm import Session
+from typing import List, Any, Dict, Optional, Tuple
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import func, update
+from sqlalchemy.engine import Row
+from sqlalchemy.exc import IntegrityError
 from datetime import datetime
 from .base_repository import BaseRepository
 from models.database.reserva_area_comun import ReservaAreaComun
+from models.database.area_comun import AreaComun
+from models.database.departamento import Departamento
+from models.database.saldo_departamento import SaldoDepartamento
+from scheduling.intervals import IntervalIndex, IntervalIndexRegistry, Intervalo
+
+# Índice compartido por todas las instancias del repositorio
+indice_reservas_area_comun = IntervalIndexRegistry()
 
 class ReservaAreaComunRepository(BaseRepository[ReservaAreaComun]):
     def __init__(self):
         super().__init__(ReservaAreaComun)
+        self.indice = indice_reservas_area_comun
 
     def get_by_departamento_id(self, db: Session, departamento_id: int) -> List[ReservaAreaComun]:
-        return db.query(ReservaAreaComun).filter(
+        # El área común se serializa en cada elemento: se carga en la misma consulta
+        return db.query(ReservaAreaComun).options(joinedload(ReservaAreaComun.area_comun)).filter(
             ReservaAreaComun.departamento_id == departamento_id
         ).all()
 
-    def check_availability(self, db: Session, area_comun_id: int, fecha_inicio: datetime, fecha_fin: datetime) -> List[ReservaAreaComun]:
-        return db.query(ReservaAreaComun).filter(
+    def get_active_intervals(self, db: Session, area_comun_id: int) -> List[Intervalo]:
+        return db.query(
+            ReservaAreaComun.periodo_inicio,
+            ReservaAreaComun.periodo_fin,
+            ReservaAreaComun.id
+        ).filter(
+            ReservaAreaComun.area_comun_id == area_comun_id,
+            ReservaAreaComun.estado == "activa"
+        ).all()
+
+    def get_overlapping_intervals(self, db: Session, area_comun_id: int, fecha_inicio: datetime, fecha_fin: datetime) -> List[Tuple[datetime, datetime]]:
+        return db.query(ReservaAreaComun.periodo_inicio, ReservaAreaComun.periodo_fin).filter(
             ReservaAreaComun.area_comun_id == area_comun_id,
             ReservaAreaComun.estado == "activa",
             ReservaAreaComun.periodo_inicio < fecha_fin,
             ReservaAreaComun.periodo_fin > fecha_inicio
         ).all()
 
+    def get_busy_in_range(self, db: Session, fecha_inicio: datetime, fecha_fin: datetime, area_comun_ids: Optional[List[int]] = None) -> List[Tuple[int, datetime, datetime]]:
+        """Periodos activos de todas las áreas (o de las indicadas) que tocan el rango, en una sola consulta"""
+        query = db.query(
+            ReservaAreaComun.area_comun_id,
+            ReservaAreaComun.periodo_inicio,
+            ReservaAreaComun.periodo_fin
+        ).filter(
+            ReservaAreaComun.estado == "activa",
+            ReservaAreaComun.periodo_inicio < fecha_fin,
+            ReservaAreaComun.periodo_fin > fecha_inicio
+        )
+        if area_comun_ids:
+            query = query.filter(ReservaAreaComun.area_comun_id.in_(area_comun_ids))
+        return query.order_by(ReservaAreaComun.area_comun_id, ReservaAreaComun.periodo_inicio).all()
+
+    def get_index(self, db: Session, area_comun_id: int) -> IntervalIndex:
+        """Índice en memoria de las reservas activas del área, con su capacidad"""
+        def cargar() -> IntervalIndex:
+            capacidad = db.query(AreaComun.capacidad).filter(AreaComun.id == area_comun_id).scalar()
+            return IntervalIndex(self.get_active_intervals(db, area_comun_id), capacidad=capacidad or 1)
+        return self.indice.get(area_comun_id, cargar)
+
+    def create(self, db: Session, *, obj_in: Dict[str, Any]) -> ReservaAreaComun:
+        db_obj = super().create(db, obj_in=obj_in)
+        self._sync_indice(db_obj)
+        return db_obj
+
+    def get_booking_context(self, db: Session, usuario_id: int, area_comun_id: int) -> Optional[Row]:
+        """En una sola consulta: departamento del usuario, si tiene adeudos pendientes y el área común.
+
+        Regresa None si el usuario no tiene departamento; `area_comun` es None si el área no existe.
+        """
+        # El saldo materializado evita recorrer los adeudos del departamento
+        return db.query(
+            Departamento.id.label("departamento_id"),
+            (func.coalesce(SaldoDepartamento.adeudos_pendientes, 0) > 0).label("tiene_adeudos"),
+            AreaComun
+        ).outerjoin(
+            SaldoDepartamento, SaldoDepartamento.departamento_id == Departamento.id
+        ).outerjoin(
+            AreaComun, AreaComun.id == area_comun_id
+        ).filter(
+            Departamento.usuario_id == usuario_id
+        ).first()
+
+    def create_row(self, db: Session, *, obj_in: Dict[str, Any]) -> Row:
+        try:
+            fila = super().create_row(db, obj_in=obj_in)
+        except IntegrityError:
+            # Otro proceso ganó el horario: el índice en memoria quedó desfasado
+            self.indice.invalidate(obj_in["area_comun_id"])
+            raise
+        self._sync_indice(fila)
+        return fila
+
+    def create_many(self, db: Session, *, objs_in: List[Dict[str, Any]]) -> List[Row]:
+        try:
+            filas = super().create_many(db, objs_in=objs_in)
+        except IntegrityError:
+            for area_comun_id in {obj["area_comun_id"] for obj in objs_in}:
+                self.indice.invalidate(area_comun_id)
+            raise
+        for fila in filas:
+            self._sync_indice(fila)
+        return filas
+
+    def update(self, db: Session, *, db_obj: ReservaAreaComun, obj_in: Dict[str, Any]) -> ReservaAreaComun:
+        db_obj = super().update(db, db_obj=db_obj, obj_in=obj_in)
+        self._sync_indice(db_obj)
+        return db_obj
+
+    def cancel(self, db: Session, reserva: ReservaAreaComun) -> ReservaAreaComun:
+        return self.update(db, db_obj=reserva, obj_in={"estado": "cancelada"})
+
+    def expire_finished(self, db: Session, ahora: datetime) -> List[Row]:
+        """Marca como completadas, en un solo UPDATE, las reservas activas que ya terminaron"""
+        filas = db.execute(
+            update(ReservaAreaComun)
+            .where(ReservaAreaComun.estado == "activa", ReservaAreaComun.periodo_fin <= ahora)
+            .values(estado="completada")
+            .returning(ReservaAreaComun.id, ReservaAreaComun.area_comun_id, ReservaAreaComun.departamento_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        self._mark_changed(db, filas)
+        db.commit()
+        for fila in filas:
+            self.indice.remove(fila.area_comun_id, fila.id)
+        return filas
+
     def get_active_reservas(self, db: Session) -> List[ReservaAreaComun]:
         return db.query(ReservaAreaComun).filter(ReservaAreaComun.estado == "activa").all()
+
+    def _sync_indice(self, reserva: ReservaAreaComun) -> None:
+        if reserva.estado == "activa":
+            self.indice.add(reserva.area_comun_id, reserva.periodo_inicio, reserva.periodo_fin, reserva.id)
+        else:
+            self.indice.remove(reserva.area_comun_id, reserva.id)
@@ -1,8 +1,12 @@
-from typing import List
+from typing import List, Optional, Tuple
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
+from sqlalchemy import update
 from datetime import datetime
 from .base_repository import BaseRepository
 from models.database.reserva_visita import ReservaVisita
+from models.database.lugar_visita import LugarVisita
+from models.database.departamento import Departamento
 
 class ReservaVisitaRepository(BaseRepository[ReservaVisita]):
     def __init__(self):
@@ -13,13 +17,52 @@ class ReservaVisitaRepository(BaseRepository[ReservaVisita]):
             ReservaVisita.departamento_id == departamento_id
         ).all()
 
-    def check_availability(self, db: Session, lugar_visita_id: int, fecha_inicio: datetime, fecha_fin: datetime) -> List[ReservaVisita]:
-        return db.query(ReservaVisita).filter(
+    def get_overlapping_intervals(self, db: Session, lugar_visita_id: int, fecha_inicio: datetime, fecha_fin: datetime) -> List[Tuple[datetime, datetime]]:
+        return db.query(ReservaVisita.periodo_inicio, ReservaVisita.periodo_fin).filter(
             ReservaVisita.lugar_visita_id == lugar_visita_id,
             ReservaVisita.estado == "activa",
             ReservaVisita.periodo_inicio < fecha_fin,
             ReservaVisita.periodo_fin > fecha_inicio
         ).all()
 
+    def get_busy_in_range(self, db: Session, fecha_inicio: datetime, fecha_fin: datetime, lugar_visita_ids: Optional[List[int]] = None) -> List[Tuple[int, datetime, datetime]]:
+        """Periodos activos de todos los lugares (o de los indicados) que tocan el rango, en una sola consulta"""
+        query = db.query(
+            ReservaVisita.lugar_visita_id,
+            ReservaVisita.periodo_inicio,
+            ReservaVisita.periodo_fin
+        ).filter(
+            ReservaVisita.estado == "activa",
+            ReservaVisita.periodo_inicio < fecha_fin,
+            ReservaVisita.periodo_fin > fecha_inicio
+        )
+        if lugar_visita_ids:
+            query = query.filter(ReservaVisita.lugar_visita_id.in_(lugar_visita_ids))
+        return query.order_by(ReservaVisita.lugar_visita_id, ReservaVisita.periodo_inicio).all()
+
+    def get_booking_context(self, db: Session, usuario_id: int, lugar_visita_id: int) -> Optional[Row]:
+        """En una sola consulta: departamento del usuario y el lugar de visita (None si no existe)"""
+        return db.query(
+            Departamento.id.label("departamento_id"),
+            LugarVisita
+        ).outerjoin(
+            LugarVisita, LugarVisita.id == lugar_visita_id
+        ).filter(
+            Departamento.usuario_id == usuario_id
+        ).first()
+
     def get_active_reservas(self, db: Session) -> List[ReservaVisita]:
         return db.query(ReservaVisita).filter(ReservaVisita.estado == "activa").all()
+
+    def expire_finished(self, db: Session, ahora: datetime) -> List[Row]:
+        """Marca como completadas, en un solo UPDATE, las reservas activas que ya terminaron"""
+        filas = db.execute(
+            update(ReservaVisita)
+            .where(ReservaVisita.estado == "activa", ReservaVisita.periodo_fin <= ahora)
+            .values(estado="completada")
+            .returning(ReservaVisita.id, ReservaVisita.lugar_visita_id, ReservaVisita.departamento_id)
+            .execution_options(synchronize_session=False)
+        ).all()
+        self._mark_changed(db, filas)
+        db.commit()
+        return filas
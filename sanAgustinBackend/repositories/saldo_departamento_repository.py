@@ -0,0 +1,24 @@
+from typing import Optional
+from sqlalchemy.orm import Session
+from .base_repository import BaseRepository
+from models.database import saldo_departamento
+from models.database.saldo_departamento import SaldoDepartamento
+
+class SaldoDepartamentoRepository(BaseRepository[SaldoDepartamento]):
+    def __init__(self):
+        super().__init__(SaldoDepartamento)
+
+    def get_by_departamento_id(self, db: Session, departamento_id: int) -> Optional[SaldoDepartamento]:
+        return db.get(SaldoDepartamento, departamento_id)
+
+    def tiene_adeudos(self, db: Session, departamento_id: int) -> bool:
+        pendientes = db.query(SaldoDepartamento.adeudos_pendientes).filter(
+            SaldoDepartamento.departamento_id == departamento_id
+        ).scalar()
+        return bool(pendientes)
+
+    def rebuild(self, db: Session) -> int:
+        """Recalcula todos los saldos desde la tabla de adeudos"""
+        departamentos = saldo_departamento.rebuild(db.connection())
+        db.commit()
+        return departamentos
@@ -0,0 +1,33 @@
+from typing import Optional, Sequence
+from sqlalchemy import func, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from .base_repository import BaseRepository
+from models.database.departamento import Departamento
+from models.database.version_recurso import VersionRecurso
+
+class VersionRecursoRepository(BaseRepository[VersionRecurso]):
+    def __init__(self):
+        super().__init__(VersionRecurso)
+
+    def _version(self, recurso: str, recurso_id):
+        return func.coalesce(
+            select(VersionRecurso.version).where(
+                VersionRecurso.recurso == recurso, VersionRecurso.recurso_id == recurso_id
+            ).scalar_subquery(),
+            0
+        )
+
+    def get_version(self, db: Session, recurso: str, recurso_id: int = 0) -> int:
+        return db.scalar(select(self._version(recurso, recurso_id)))
+
+    def get_departamento_versions(self, db: Session, usuario_id: int, recursos: Sequence[str], catalogos: Sequence[str] = ()) -> Optional[Row]:
+        """En una sola consulta: departamento del usuario, versión de cada recurso suyo y de cada catálogo.
+
+        Regresa None si el usuario no tiene departamento.
+        """
+        return db.query(
+            Departamento.id,
+            *[self._version(recurso, Departamento.id) for recurso in recursos],
+            *[self._version(catalogo, 0) for catalogo in catalogos]
+        ).filter(Departamento.usuario_id == usuario_id).first()
@@ -0,0 +1,230 @@
+import bisect
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# (inicio, fin, id) de una reserva
+Intervalo = Tuple[datetime, datetime, int]
+
+
+def _naive(valor: datetime) -> datetime:
+    """SQLite guarda las fechas sin zona horaria; se comparan igual en memoria"""
+    return valor.replace(tzinfo=None) if valor.tzinfo else valor
+
+
+class IntervalIndex:
+    """Lista ordenada de intervalos [inicio, fin) de un solo recurso.
+
+    Los traslapes se buscan con bisect sobre los inicios, acotando la ventana
+    con la duración máxima registrada, por lo que cada consulta cuesta
+    O(log n + k) sin ir a la base de datos. `capacidad` es el número de
+    reservas simultáneas que admite el recurso.
+    """
+
+    def __init__(self, intervalos: Iterable[Intervalo] = (), capacidad: int = 1):
+        self.capacidad = max(capacidad or 1, 1)
+        self._entradas: List[Intervalo] = []
+        self._por_id: Dict[int, Intervalo] = {}
+        self._max_duracion = timedelta(0)
+        self._lock = threading.Lock()
+        for inicio, fin, id in intervalos:
+            self.add(inicio, fin, id)
+
+    def __len__(self) -> int:
+        return len(self._entradas)
+
+    def add(self, inicio: datetime, fin: datetime, id: int) -> None:
+        entrada = (_naive(inicio), _naive(fin), id)
+        with self._lock:
+            if id in self._por_id:
+                self._discard(id)
+            bisect.insort(self._entradas, entrada)
+            self._por_id[id] = entrada
+            self._max_duracion = max(self._max_duracion, entrada[1] - entrada[0])
+
+    def remove(self, id: int) -> bool:
+        with self._lock:
+            return self._discard(id)
+
+    def _discard(self, id: int) -> bool:
+        entrada = self._por_id.pop(id, None)
+        if entrada is None:
+            return False
+        posicion = bisect.bisect_left(self._entradas, entrada)
+        del self._entradas[posicion]
+        return True
+
+    def overlapping(self, inicio: datetime, fin: datetime) -> List[Intervalo]:
+        """Intervalos que se traslapan con [inicio, fin), ordenados por inicio"""
+        inicio, fin = _naive(inicio), _naive(fin)
+        with self._lock:
+            desde = bisect.bisect_right(self._entradas, (inicio - self._max_duracion,))
+            hasta = bisect.bisect_left(self._entradas, (fin,))
+            return [entrada for entrada in self._entradas[desde:hasta] if entrada[1] > inicio]
+
+    def count_overlapping(self, inicio: datetime, fin: datetime) -> int:
+        return len(self.overlapping(inicio, fin))
+
+
+class IntervalIndexRegistry:
+    """Índices por recurso (p. ej. area_comun_id) cargados bajo demanda.
+
+    Cada proceso mantiene su propia copia; `ttl_segundos` acota cuánto tiempo
+    puede quedar desfasada respecto a escrituras hechas por otros workers.
+    """
+
+    def __init__(self, ttl_segundos: Optional[float] = 300):
+        self.ttl_segundos = ttl_segundos
+        self._indices: Dict[int, Tuple[IntervalIndex, float]] = {}
+        # Cambios por recurso; detectan escrituras ocurridas mientras se cargaba un índice
+        self._cambios: Dict[int, int] = {}
+        self._lock = threading.RLock()
+
+    def get(self, recurso_id: int, loader: Callable[[], IntervalIndex]) -> IntervalIndex:
+        with self._lock:
+            cargado = self._indices.get(recurso_id)
+            if cargado and not self._expired(cargado[1]):
+                return cargado[0]
+            cambios = self._cambios.get(recurso_id, 0)
+        # La consulta se hace sin el lock: cargar un recurso no bloquea a los demás
+        indice = loader()
+        with self._lock:
+            cargado = self._indices.get(recurso_id)
+            if cargado and not self._expired(cargado[1]):
+                # Otro hilo publicó su carga primero
+                return cargado[0]
+            # Si hubo altas o bajas durante la carga, esta copia puede no incluirlas: no se publica
+            if self._cambios.get(recurso_id, 0) == cambios:
+                self._indices[recurso_id] = (indice, time.monotonic())
+            return indice
+
+    def add(self, recurso_id: int, inicio: datetime, fin: datetime, id: int) -> None:
+        """Registra un intervalo solo si el índice del recurso ya está cargado"""
+        with self._lock:
+            self._registrar_cambio(recurso_id)
+            cargado = self._indices.get(recurso_id)
+            if cargado:
+                cargado[0].add(inicio, fin, id)
+
+    def remove(self, recurso_id: int, id: int) -> None:
+        with self._lock:
+            self._registrar_cambio(recurso_id)
+            cargado = self._indices.get(recurso_id)
+            if cargado:
+                cargado[0].remove(id)
+
+    def invalidate(self, recurso_id: Optional[int] = None) -> None:
+        with self._lock:
+            if recurso_id is None:
+                self._indices.clear()
+                for recurso in list(self._cambios):
+                    self._registrar_cambio(recurso)
+            else:
+                self._registrar_cambio(recurso_id)
+                self._indices.pop(recurso_id, None)
+
+    def _registrar_cambio(self, recurso_id: int) -> None:
+        self._cambios[recurso_id] = self._cambios.get(recurso_id, 0) + 1
+
+    def _expired(self, cargado_en: float) -> bool:
+        return self.ttl_segundos is not None and time.monotonic() - cargado_en > self.ttl_segundos
+
+
+def merge_intervals(intervalos: Iterable[Tuple[datetime, datetime]]) -> List[Tuple[datetime, datetime]]:
+    """Une intervalos traslapados o contiguos con un barrido sobre los inicios ordenados"""
+    unidos: List[Tuple[datetime, datetime]] = []
+    for inicio, fin in sorted((_naive(inicio), _naive(fin)) for inicio, fin in intervalos):
+        if unidos and inicio <= unidos[-1][1]:
+            if fin > unidos[-1][1]:
+                unidos[-1] = (unidos[-1][0], fin)
+        else:
+            unidos.append((inicio, fin))
+    return unidos
+
+
+def clip_intervals(intervalos: Iterable[Tuple[datetime, datetime]], desde: datetime, hasta: datetime) -> List[Tuple[datetime, datetime]]:
+    """Recorta los intervalos a la ventana [desde, hasta) descartando los que quedan fuera"""
+    desde, hasta = _naive(desde), _naive(hasta)
+    recortados = []
+    for inicio, fin in intervalos:
+        inicio, fin = max(_naive(inicio), desde), min(_naive(fin), hasta)
+        if inicio < fin:
+            recortados.append((inicio, fin))
+    return recortados
+
+
+def _events(intervalos: Iterable[Tuple], desde: Optional[datetime] = None, hasta: Optional[datetime] = None) -> List[Tuple[datetime, int]]:
+    """Eventos de inicio (+1) y fin (-1) ordenados; en empate los fines van primero"""
+    eventos = []
+    for intervalo in intervalos:
+        inicio, fin = _naive(intervalo[0]), _naive(intervalo[1])
+        if desde is not None:
+            inicio = max(inicio, desde)
+        if hasta is not None:
+            fin = min(fin, hasta)
+        if inicio < fin:
+            eventos.append((inicio, 1))
+            eventos.append((fin, -1))
+    eventos.sort()
+    return eventos
+
+
+def peak_occupancy(intervalos: Iterable[Tuple], inicio: datetime, fin: datetime) -> int:
+    """Máximo de intervalos simultáneos dentro de [inicio, fin)"""
+    ocupacion = pico = 0
+    for _, delta in _events(intervalos, _naive(inicio), _naive(fin)):
+        ocupacion += delta
+        pico = max(pico, ocupacion)
+    return pico
+
+
+def occupancy(traslapes: List[Tuple], inicio: datetime, fin: datetime, capacidad: int = 1) -> int:
+    """Ocupación de la ventana; con capacidad 1 basta saber si hay algún traslape"""
+    if capacidad <= 1:
+        return 1 if traslapes else 0
+    return peak_occupancy(traslapes, inicio, fin)
+
+
+def saturated_intervals(intervalos: Iterable[Tuple], capacidad: int = 1) -> List[Tuple[datetime, datetime]]:
+    """Periodos en los que la ocupación alcanza la capacidad; con capacidad 1 equivale a merge_intervals"""
+    saturados: List[Tuple[datetime, datetime]] = []
+    ocupacion = 0
+    abierto: Optional[datetime] = None
+    for momento, delta in _events(intervalos):
+        ocupacion += delta
+        if ocupacion >= capacidad and abierto is None:
+            abierto = momento
+        elif ocupacion < capacidad and abierto is not None:
+            if saturados and saturados[-1][1] == abierto:
+                saturados[-1] = (saturados[-1][0], momento)
+            elif momento > abierto:
+                saturados.append((abierto, momento))
+            abierto = None
+    return saturados
+
+
+def free_gaps(intervalos: Iterable[Tuple], desde: datetime, hasta: datetime, duracion: timedelta, capacidad: int = 1) -> List[Tuple[datetime, datetime]]:
+    """Huecos de al menos `duracion` dentro de [desde, hasta) en los que el recurso no está lleno"""
+    desde, hasta = _naive(desde), _naive(hasta)
+    huecos: List[Tuple[datetime, datetime]] = []
+    cursor = desde
+    for inicio, fin in saturated_intervals(clip_intervals(intervalos, desde, hasta), capacidad):
+        if inicio - cursor >= duracion:
+            huecos.append((cursor, inicio))
+        cursor = max(cursor, fin)
+    if hasta - cursor >= duracion:
+        huecos.append((cursor, hasta))
+    return huecos
+
+def fit_slack(intervalos: Iterable[Tuple], inicio: datetime, fin: datetime, desde: datetime, hasta: datetime, capacidad: int = 1) -> Optional[timedelta]:
+    """Tiempo libre que sobra alrededor de [inicio, fin) dentro del hueco que lo contiene.
+
+    Regresa None si el periodo no cabe. Para elegir recurso con best-fit se
+    prefiere el menor sobrante, así los huecos grandes quedan libres.
+    """
+    inicio, fin = _naive(inicio), _naive(fin)
+    for hueco_inicio, hueco_fin in free_gaps(intervalos, desde, hasta, fin - inicio, capacidad):
+        if hueco_inicio <= inicio and fin <= hueco_fin:
+            return (hueco_fin - hueco_inicio) - (fin - inicio)
+    return None
@@ -0,0 +1,41 @@
+import logging
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+class PeriodicTask:
+    """Ejecuta una función cada `intervalo_segundos` en un hilo de fondo"""
+
+    def __init__(self, nombre: str, intervalo_segundos: float, funcion: Callable[[], None]):
+        self.nombre = nombre
+        self.intervalo_segundos = intervalo_segundos
+        self.funcion = funcion
+        self._detener = threading.Event()
+        self._hilo: Optional[threading.Thread] = None
+
+    @property
+    def activa(self) -> bool:
+        return self._hilo is not None and self._hilo.is_alive()
+
+    def start(self) -> None:
+        if self.activa or self.intervalo_segundos <= 0:
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._run, name=self.nombre, daemon=True)
+        self._hilo.start()
+
+    def stop(self, timeout: Optional[float] = None) -> None:
+        self._detener.set()
+        if self._hilo is not None:
+            self._hilo.join(timeout)
+            self._hilo = None
+
+    def _run(self) -> None:
+        # Primera ejecución al arrancar; después espera el intervalo o la señal de detenerse
+        while not self._detener.is_set():
+            try:
+                self.funcion()
+            except Exception:
+                logger.exception("Falló la tarea periódica %s", self.nombre)
+            self._detener.wait(self.intervalo_segundos)
@@ -0,0 +1,16 @@
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+# Separación entre ocurrencias por frecuencia
+FRECUENCIAS = {
+    "diaria": timedelta(days=1),
+    "semanal": timedelta(weeks=1),
+}
+
+
+def expand_recurrence(inicio: datetime, fin: datetime, frecuencia: str, repeticiones: int) -> List[Tuple[datetime, datetime]]:
+    """Genera las ocurrencias [inicio, fin) de una regla de repetición, en orden"""
+    paso = FRECUENCIAS[frecuencia]
+    if fin - inicio > paso:
+        raise ValueError("La duración de cada ocurrencia no puede exceder la frecuencia")
+    return [(inicio + paso * i, fin + paso * i) for i in range(repeticiones)]
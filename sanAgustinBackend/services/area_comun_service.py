@@ -1,13 +1,21 @@
 from typing import List
 from sqlalchemy.orm import Session
 from repositories.area_comun_repository import AreaComunRepository
+from repositories.version_recurso_repository import VersionRecursoRepository
+from models.database.version_recurso import AREAS_COMUNES
+from caching.etag import make_etag
 from models.schemas.area_comun import AreaComunResponse
 
 class AreaComunService:
     def __init__(self):
         self.area_comun_repo = AreaComunRepository()
+        self.version_repo = VersionRecursoRepository()
 
     def get_all_areas_comunes(self, db: Session) -> List[AreaComunResponse]:
         """Obtiene todas las áreas comunes disponibles"""
         areas_comunes = self.area_comun_repo.get_all_active(db)
         return [AreaComunResponse.from_orm(area) for area in areas_comunes]
+
+    def get_etag(self, db: Session) -> str:
+        """ETag del catálogo de áreas comunes; cambia con cualquier alta o modificación"""
+        return make_etag(AREAS_COMUNES, self.version_repo.get_version(db, AREAS_COMUNES))
@@ -0,0 +1,104 @@
+from datetime import datetime, timezone
+from typing import List, Optional
+from fastapi import HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from models.auth_models import Usuario, RegistroPendiente, Contacto
+from models.database.departamento import Departamento
+from models.auth_schemas import UserCreate, RegistroPendienteCreate, ContactoCreate
+from repositories.async_base_repository import AsyncBaseRepository
+from services.auth_service import create_access_token, user_claims
+
+class AsyncAuthService:
+    """Versión asíncrona de AuthService para los handlers `async def` de autenticación"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.usuario_repo = AsyncBaseRepository(Usuario)
+        self.registro_repo = AsyncBaseRepository(RegistroPendiente)
+
+    async def create_user_token(self, user: Usuario) -> str:
+        return create_access_token(user_claims(user, await self.get_departamento_id(user.id)))
+
+    async def get_user_by_email(self, email: str) -> Optional[Usuario]:
+        return await self.usuario_repo.get_by_field(self.db, "email", email)
+
+    async def get_departamento_id(self, usuario_id: int) -> Optional[int]:
+        return await self.db.scalar(select(Departamento.id).where(Departamento.usuario_id == usuario_id))
+
+    async def create_user(self, user_data: UserCreate) -> Usuario:
+        return await self.usuario_repo.create(self.db, obj_in=user_data.model_dump())
+
+    async def get_pending_registration(self, email: str) -> Optional[RegistroPendiente]:
+        return await self.registro_repo.get_by_field(self.db, "email", email)
+
+    async def create_pending_registration(self, reg_data: RegistroPendienteCreate) -> RegistroPendiente:
+        return await self.registro_repo.create(self.db, obj_in=reg_data.model_dump())
+
+    async def get_all_pending_registrations(self) -> List[RegistroPendiente]:
+        return await self.registro_repo.get_by_fields(self.db, {"is_approved": False})
+
+    async def approve_registration(self, reg_id: int, admin_user_id: int) -> Usuario:
+        pending_reg = await self.registro_repo.get(self.db, reg_id)
+        if not pending_reg:
+            raise HTTPException(status_code=404, detail="Registro pendiente no encontrado")
+
+        if pending_reg.is_approved:
+            raise HTTPException(status_code=400, detail="El registro ya fue aprobado")
+
+        user = await self.create_user(UserCreate(
+            email=pending_reg.email,
+            nombre=pending_reg.nombre,
+            apellido=pending_reg.apellido,
+            provider=pending_reg.provider,
+            provider_id=pending_reg.provider_id
+        ))
+
+        # Crear el contacto si hay datos
+        if pending_reg.telefono or pending_reg.direccion or pending_reg.departamento:
+            contacto_data = ContactoCreate(
+                telefono=pending_reg.telefono,
+                direccion=pending_reg.direccion,
+                departamento=pending_reg.departamento
+            )
+            self.db.add(Contacto(**contacto_data.model_dump(), usuario_id=user.id))
+
+        # Marcar como aprobado
+        pending_reg.is_approved = True
+        pending_reg.approved_by = admin_user_id
+        pending_reg.approved_at = datetime.now(timezone.utc)
+
+        await self.db.commit()
+        # User expone departamento_id: se carga aquí porque la sesión asíncrona no permite cargas perezosas
+        await self.db.refresh(user, attribute_names=["departamento"])
+        return user
+
+    async def authenticate_oauth_user(self, user_info: dict, provider: str) -> dict:
+        """Autentica un usuario OAuth y retorna información sobre si necesita registro"""
+        email = user_info.get('email')
+        if not email:
+            raise HTTPException(status_code=400, detail="Email no proporcionado por el proveedor OAuth")
+
+        existing_user = await self.get_user_by_email(email)
+        if existing_user:
+            return {
+                "needs_registration": False,
+                "token": await self.create_user_token(existing_user),
+                "user_id": existing_user.id,
+                "email": existing_user.email,
+                "is_admin": existing_user.is_admin
+            }
+
+        pending_reg = await self.get_pending_registration(email)
+        if pending_reg:
+            return {
+                "needs_registration": True,
+                "registration_id": pending_reg.id,
+                "message": "Registro pendiente de aprobación"
+            }
+
+        return {
+            "needs_registration": True,
+            "message": "Usuario nuevo, requiere registro"
+        }
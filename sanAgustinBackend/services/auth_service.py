@@ -1,4 +1,4 @@
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_
 from datetime import datetime, timedelta, timezone
 from jose import JWTError, jwt
@@ -7,44 +7,85 @@ from typing import Optional
 import httpx
 
 from models.auth_models import Usuario, RegistroPendiente, Contacto
+from models.database.departamento import Departamento
 from models.auth_schemas import UserCreate, RegistroPendienteCreate, ContactoCreate
 from core.oauth_config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
 
+def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
+    to_encode = data.copy()
+    if expires_delta:
+        expire = datetime.utcnow() + expires_delta
+    else:
+        expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"exp": expire})
+    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    return encoded_jwt
+
+def user_claims(user: Usuario, departamento_id: Optional[int]) -> dict:
+    """Claims que usan las rutas de lectura para no consultar la base"""
+    return {
+        "sub": user.email,
+        "uid": user.id,
+        "adm": bool(user.is_admin),
+        "dep": departamento_id,
+        "ver": user.token_version or 0
+    }
+
+def verify_token(token: str) -> dict:
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        email: str = payload.get("sub")
+        if email is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Could not validate credentials",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        return payload
+    except JWTError:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
 class AuthService:
     def __init__(self, db: Session):
         self.db = db
     
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None):
-        to_encode = data.copy()
-        if expires_delta:
-            expire = datetime.utcnow() + expires_delta
-        else:
-            expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        to_encode.update({"exp": expire})
-        encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
-        return encoded_jwt
+        return create_access_token(data, expires_delta)
+    
+    def create_user_token(self, user: Usuario) -> str:
+        return create_access_token(user_claims(user, self.get_departamento_id(user.id)))
     
     def verify_token(self, token: str):
-        try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            email: str = payload.get("sub")
-            if email is None:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Could not validate credentials",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-            return payload
-        except JWTError:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+        return verify_token(token)
     
     def get_user_by_email(self, email: str) -> Optional[Usuario]:
         return self.db.query(Usuario).filter(Usuario.email == email).first()
     
+    def get_user_with_departamento(self, email: str) -> Optional[Usuario]:
+        """Usuario y su departamento en una sola consulta (LEFT JOIN)"""
+        return self.db.query(Usuario).options(
+            joinedload(Usuario.departamento)
+        ).filter(Usuario.email == email).first()
+    
+    def get_user_by_id(self, usuario_id: int) -> Optional[Usuario]:
+        return self.db.query(Usuario).filter(Usuario.id == usuario_id).first()
+    
+    def get_token_version(self, usuario_id: int) -> Optional[int]:
+        return self.db.query(Usuario.token_version).filter(Usuario.id == usuario_id).scalar()
+    
+    def get_departamento_id(self, usuario_id: int) -> Optional[int]:
+        return self.db.query(Departamento.id).filter(Departamento.usuario_id == usuario_id).scalar()
+    
+    def revoke_tokens(self, user: Usuario) -> Usuario:
+        """Invalida todos los tokens emitidos al usuario"""
+        user.token_version = (user.token_version or 0) + 1
+        self.db.commit()
+        return user
+    
     def get_user_by_provider_id(self, provider: str, provider_id: str) -> Optional[Usuario]:
         return self.db.query(Usuario).filter(
             and_(Usuario.provider == provider, Usuario.provider_id == provider_id)
@@ -119,7 +160,7 @@ class AuthService:
         existing_user = self.get_user_by_email(email)
         if existing_user:
             # Usuario existe, generar token
-            token = self.create_access_token(data={"sub": existing_user.email})
+            token = self.create_user_token(existing_user)
             return {
                 "needs_registration": False,
                 "token": token,
@@ -1,14 +1,19 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 from services.area_comun_service import AreaComunService
 from models.schemas.area_comun import AreaComunResponse
-from core.database import get_db
+from core.database import get_read_db
+from caching.etag import not_modified
 
 router = APIRouter(prefix="/areas-comunes", tags=["areas-comunes"])
 
 @router.get("/", response_model=List[AreaComunResponse])
-def obtener_areas_comunes(db: Session = Depends(get_db)):
+def obtener_areas_comunes(request: Request, response: Response, db: Session = Depends(get_read_db)):
     """Obtiene todas las áreas comunes disponibles"""
     service = AreaComunService()
+    # Respuesta condicional: si el catálogo no cambió no se consulta ni se serializa
+    no_modificado = not_modified(request, response, service.get_etag(db))
+    if no_modificado:
+        return no_modificado
     return service.get_all_areas_comunes(db)
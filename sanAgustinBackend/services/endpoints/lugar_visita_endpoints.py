@@ -1,14 +1,19 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 from services.lugar_visita_service import LugarVisitaService
 from models.schemas.lugar_visita import LugarVisitaResponse
-from core.database import get_db
+from core.database import get_read_db
+from caching.etag import not_modified
 
 router = APIRouter(prefix="/lugares-visita", tags=["lugares-visita"])
 
 @router.get("/", response_model=List[LugarVisitaResponse])
-def obtener_lugares_visita(db: Session = Depends(get_db)):
+def obtener_lugares_visita(request: Request, response: Response, db: Session = Depends(get_read_db)):
     """Obtiene todos los lugares de visita disponibles"""
     service = LugarVisitaService()
+    # Respuesta condicional: si el catálogo no cambió no se consulta ni se serializa
+    no_modificado = not_modified(request, response, service.get_etag(db))
+    if no_modificado:
+        return no_modificado
     return service.get_all_lugares_visita(db)
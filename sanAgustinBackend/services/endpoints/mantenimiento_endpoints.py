@@ -0,0 +1,63 @@
+from fastapi import APIRouter, Depends, Query
+from typing import Optional
+from sqlalchemy.orm import Session
+from services.mantenimiento_service import MantenimientoService
+from services.panel_residente_service import panel_cache
+from models.schemas.mantenimiento import BarridoReservasResponse, ArchivoReservasResponse, EstadoBarridoResponse, EstadoCacheResponse
+from config import settings
+from models.auth_models import Usuario
+from core.database import get_db
+from core.auth import token_cache
+from core.oauth_config import google_metadata
+from api.auth_routes import get_current_admin_user
+
+router = APIRouter(prefix="/mantenimiento", tags=["mantenimiento"])
+
+@router.get("/barrido-reservas", response_model=EstadoBarridoResponse)
+def obtener_estado_barrido(current_user: Usuario = Depends(get_current_admin_user)):
+    """Obtiene las estadísticas del barrido de reservas terminadas (solo administradores)"""
+    service = MantenimientoService()
+    return service.get_estado_barrido()
+
+@router.post("/barrido-reservas", response_model=BarridoReservasResponse)
+def ejecutar_barrido(db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_admin_user)):
+    """Ejecuta el barrido de reservas terminadas en este momento (solo administradores)"""
+    service = MantenimientoService()
+    return service.expire_reservas(db)
+
+@router.post("/archivo-reservas", response_model=ArchivoReservasResponse)
+def archivar_reservas(
+    dias: Optional[int] = Query(None, ge=1, description="Antigüedad mínima en días; por defecto la configurada"),
+    db: Session = Depends(get_db),
+    current_user: Usuario = Depends(get_current_admin_user)
+):
+    """Mueve al archivo las reservas terminadas antiguas (solo administradores)"""
+    service = MantenimientoService()
+    return service.archive_reservas(db, dias or settings.ARCHIVO_RESERVAS_DIAS, settings.ARCHIVO_RESERVAS_LOTE)
+
+@router.get("/cache-panel", response_model=EstadoCacheResponse)
+def obtener_estado_cache_panel(current_user: Usuario = Depends(get_current_admin_user)):
+    """Obtiene los contadores de la caché del panel de residente (solo administradores)"""
+    return panel_cache.stats()
+
+@router.get("/cache-auth", response_model=EstadoCacheResponse)
+def obtener_estado_cache_auth(current_user: Usuario = Depends(get_current_admin_user)):
+    """Obtiene los contadores de la caché de tokens verificados (solo administradores)"""
+    return token_cache.stats()
+
+@router.get("/oidc-google")
+def obtener_estado_oidc_google(current_user: Usuario = Depends(get_current_admin_user)):
+    """Obtiene el estado de la caché del descubrimiento OpenID y JWKS de Google (solo administradores)"""
+    return google_metadata.estado()
+
+@router.post("/oidc-google/refrescar")
+def refrescar_oidc_google(current_user: Usuario = Depends(get_current_admin_user)):
+    """Refresca en este momento el descubrimiento y JWKS de Google; si falla se conserva la copia anterior (solo administradores)"""
+    google_metadata.refresh()
+    return google_metadata.estado()
+
+@router.post("/saldos/reconstruir")
+def reconstruir_saldos(db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_admin_user)):
+    """Recalcula los saldos pendientes por departamento desde los adeudos (solo administradores)"""
+    service = MantenimientoService()
+    return {"departamentos_con_saldo": service.rebuild_saldos(db)}
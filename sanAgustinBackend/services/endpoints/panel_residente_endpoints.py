@@ -1,19 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 from services.panel_residente_service import PanelResidenteService
 from models.schemas.panel_residente import PanelResidenteResponse
-from core.database import get_db
-from core.auth import get_current_user
-from models.auth_models import Usuario
+from core.database import get_read_db
+from core.auth import get_current_principal
+from caching.etag import not_modified
+from models.auth_schemas import Principal
 
 router = APIRouter(prefix="/panel-residente", tags=["panel-residente"])
 
 @router.get("/", response_model=PanelResidenteResponse)
 def obtener_panel_residente(
-    current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_read_db)
 ):
     """Obtiene toda la información del panel de residente"""
     service = PanelResidenteService()
-    return service.get_panel_residente(db, current_user.id)
+    etag = service.get_etag(db, current_user.id)
+    if etag:
+        no_modificado = not_modified(request, response, etag, privado=True)
+        if no_modificado:
+            return no_modificado
+    return service.get_panel_residente(db, current_user.id, etag)
@@ -1,12 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
+from typing import List, Optional
+from datetime import datetime, timedelta
 from services.reserva_area_comun_service import ReservaAreaComunService
-from models.schemas.reserva_area_comun import ReservaAreaComunCreate, ReservaAreaComunResponse
-from core.database import get_db
-from core.auth import get_current_user
+from models.schemas.reserva_area_comun import (
+    ReservaAreaComunCreate, ReservaAreaComunResponse, CalendarioAreaComunResponse, HuecoAreaComun,
+    ReservaAreaComunRecurrenteCreate, ReservaAreaComunRecurrenteResponse
+)
+from core.database import get_db, get_read_db
+from core.auth import get_current_user, get_current_principal
+from caching.etag import not_modified
 from models.auth_models import Usuario
+from models.auth_schemas import Principal
 
 router = APIRouter(prefix="/reservas-area-comun", tags=["reservas-area-comun"])
 
@@ -21,6 +26,30 @@ def verificar_disponibilidad_area_comun(
     service = ReservaAreaComunService()
     return service.check_availability(db, area_comun_id, fecha_inicio, fecha_fin)
 
+@router.get("/calendario", response_model=List[CalendarioAreaComunResponse])
+def obtener_calendario_areas_comunes(
+    desde: datetime,
+    hasta: datetime,
+    area_comun_ids: Optional[List[int]] = Query(None),
+    db: Session = Depends(get_db)
+):
+    """Obtiene los periodos ocupados de todas las áreas comunes (o de las indicadas) en un rango"""
+    service = ReservaAreaComunService()
+    return service.get_calendario(db, desde, hasta, area_comun_ids)
+
+@router.get("/proximos-disponibles", response_model=List[HuecoAreaComun])
+def buscar_proximos_disponibles_area_comun(
+    duracion_minutos: int = Query(..., gt=0),
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+    area_comun_ids: Optional[List[int]] = Query(None),
+    limite: int = Query(5, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """Busca los próximos horarios libres de la duración indicada en las áreas comunes"""
+    service = ReservaAreaComunService()
+    return service.find_next_available(db, timedelta(minutes=duracion_minutos), desde, area_comun_ids, limite, hasta)
+
 @router.post("/", response_model=ReservaAreaComunResponse)
 def crear_reserva_area_comun(
     reserva: ReservaAreaComunCreate,
@@ -31,11 +60,39 @@ def crear_reserva_area_comun(
     service = ReservaAreaComunService()
     return service.create_reserva(db, current_user.id, reserva)
 
+@router.post("/recurrentes", response_model=ReservaAreaComunRecurrenteResponse)
+def crear_reservas_recurrentes_area_comun(
+    reserva: ReservaAreaComunRecurrenteCreate,
+    current_user: Usuario = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """Crea una reserva periódica de área común (p. ej. cada sábado durante 12 semanas)"""
+    service = ReservaAreaComunService()
+    return service.create_reservas_recurrentes(db, current_user.id, reserva)
+
 @router.get("/usuario", response_model=List[ReservaAreaComunResponse])
 def obtener_reservas_area_comun_usuario(
+    request: Request,
+    response: Response,
+    include_archived: bool = Query(False, description="Incluye las reservas históricas archivadas"),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_read_db)
+):
+    """Obtiene las reservas de área común del usuario"""
+    service = ReservaAreaComunService()
+    etag = service.get_user_reservas_etag(db, current_user.id, include_archived)
+    if etag:
+        no_modificado = not_modified(request, response, etag, privado=True)
+        if no_modificado:
+            return no_modificado
+    return service.get_user_reservas(db, current_user.id, include_archived)
+
+@router.patch("/{reserva_id}/cancelar", response_model=ReservaAreaComunResponse)
+def cancelar_reserva_area_comun(
+    reserva_id: int,
     current_user: Usuario = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """Obtiene las reservas de área común del usuario"""
+    """Cancela una reserva de área común del usuario"""
     service = ReservaAreaComunService()
-    return service.get_user_reservas(db, current_user.id)
+    return service.cancel_reserva(db, current_user.id, reserva_id)
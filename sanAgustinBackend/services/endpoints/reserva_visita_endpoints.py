@@ -1,12 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from sqlalchemy.orm import Session
-from typing import List
-from datetime import datetime
+from typing import List, Optional
+from datetime import datetime, timedelta
 from services.reserva_visita_service import ReservaVisitaService
-from models.schemas.reserva_visita import ReservaVisitaCreate, ReservaVisitaResponse
-from core.database import get_db
-from core.auth import get_current_user
+from models.schemas.reserva_visita import ReservaVisitaCreate, ReservaVisitaResponse, HuecoLugarVisita
+from core.database import get_db, get_read_db
+from core.auth import get_current_user, get_current_principal
+from caching.etag import not_modified
 from models.auth_models import Usuario
+from models.auth_schemas import Principal
 
 router = APIRouter(prefix="/reservas-visita", tags=["reservas-visita"])
 
@@ -21,6 +23,19 @@ def verificar_disponibilidad_lugar_visita(
     service = ReservaVisitaService()
     return service.check_availability(db, lugar_visita_id, fecha_inicio, fecha_fin)
 
+@router.get("/proximos-disponibles", response_model=List[HuecoLugarVisita])
+def buscar_proximos_disponibles_lugar_visita(
+    duracion_minutos: int = Query(..., gt=0),
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+    lugar_visita_ids: Optional[List[int]] = Query(None),
+    limite: int = Query(5, ge=1, le=50),
+    db: Session = Depends(get_db)
+):
+    """Busca los próximos horarios libres de la duración indicada en los lugares de visita"""
+    service = ReservaVisitaService()
+    return service.find_next_available(db, timedelta(minutes=duracion_minutos), desde, lugar_visita_ids, limite, hasta)
+
 @router.post("/", response_model=ReservaVisitaResponse)
 def crear_reserva_visita(
     reserva: ReservaVisitaCreate,
@@ -33,9 +48,17 @@ def crear_reserva_visita(
 
 @router.get("/usuario", response_model=List[ReservaVisitaResponse])
 def obtener_reservas_visita_usuario(
-    current_user: Usuario = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    include_archived: bool = Query(False, description="Incluye las reservas históricas archivadas"),
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_read_db)
 ):
     """Obtiene las reservas de visita del usuario"""
     service = ReservaVisitaService()
-    return service.get_user_reservas(db, current_user.id)
+    etag = service.get_user_reservas_etag(db, current_user.id, include_archived)
+    if etag:
+        no_modificado = not_modified(request, response, etag, privado=True)
+        if no_modificado:
+            return no_modificado
+    return service.get_user_reservas(db, current_user.id, include_archived)
@@ -1,13 +1,21 @@
 from typing import List
 from sqlalchemy.orm import Session
 from repositories.lugar_visita_repository import LugarVisitaRepository
+from repositories.version_recurso_repository import VersionRecursoRepository
+from models.database.version_recurso import LUGARES_VISITA
+from caching.etag import make_etag
 from models.schemas.lugar_visita import LugarVisitaResponse
 
 class LugarVisitaService:
     def __init__(self):
         self.lugar_visita_repo = LugarVisitaRepository()
+        self.version_repo = VersionRecursoRepository()
 
     def get_all_lugares_visita(self, db: Session) -> List[LugarVisitaResponse]:
         """Obtiene todos los lugares de visita disponibles"""
         lugares_visita = self.lugar_visita_repo.get_all_active(db)
         return [LugarVisitaResponse.from_orm(lugar) for lugar in lugares_visita]
+
+    def get_etag(self, db: Session) -> str:
+        """ETag del catálogo de lugares de visita; cambia con cualquier alta o modificación"""
+        return make_etag(LUGARES_VISITA, self.version_repo.get_version(db, LUGARES_VISITA))
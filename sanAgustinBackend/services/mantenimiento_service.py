@@ -0,0 +1,122 @@
+import threading
+import time
+from typing import Optional
+from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
+from repositories.reserva_area_comun_repository import ReservaAreaComunRepository
+from repositories.reserva_visita_repository import ReservaVisitaRepository
+from repositories.saldo_departamento_repository import SaldoDepartamentoRepository
+from repositories.reserva_archivo_repository import ReservaAreaComunArchivoRepository, ReservaVisitaArchivoRepository
+from models.schemas.mantenimiento import BarridoReservasResponse, ArchivoReservasResponse, EstadoBarridoResponse
+
+class EstadoBarrido:
+    """Contadores del barrido de reservas, compartidos entre el hilo de fondo y los endpoints"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.ejecuciones = 0
+            self.total_reservas_area_comun = 0
+            self.total_reservas_visita = 0
+            self.total_archivadas_area_comun = 0
+            self.total_archivadas_visita = 0
+            self.ultimo: Optional[BarridoReservasResponse] = None
+            self.ultimo_archivo: Optional[ArchivoReservasResponse] = None
+            self.ultimo_error: Optional[str] = None
+
+    def registrar(self, barrido: BarridoReservasResponse) -> None:
+        with self._lock:
+            self.ejecuciones += 1
+            self.total_reservas_area_comun += barrido.reservas_area_comun
+            self.total_reservas_visita += barrido.reservas_visita
+            self.ultimo = barrido
+            self.ultimo_error = None
+
+    def registrar_archivo(self, archivo: ArchivoReservasResponse) -> None:
+        with self._lock:
+            self.total_archivadas_area_comun += archivo.reservas_area_comun
+            self.total_archivadas_visita += archivo.reservas_visita
+            self.ultimo_archivo = archivo
+            self.ultimo_error = None
+
+    def registrar_error(self, error: Exception) -> None:
+        with self._lock:
+            self.ultimo_error = repr(error)
+
+    def snapshot(self) -> EstadoBarridoResponse:
+        with self._lock:
+            return EstadoBarridoResponse(
+                ejecuciones=self.ejecuciones,
+                total_reservas_area_comun=self.total_reservas_area_comun,
+                total_reservas_visita=self.total_reservas_visita,
+                total_archivadas_area_comun=self.total_archivadas_area_comun,
+                total_archivadas_visita=self.total_archivadas_visita,
+                ultimo=self.ultimo,
+                ultimo_archivo=self.ultimo_archivo,
+                ultimo_error=self.ultimo_error
+            )
+
+estado_barrido = EstadoBarrido()
+
+class MantenimientoService:
+    def __init__(self):
+        self.reserva_area_comun_repo = ReservaAreaComunRepository()
+        self.reserva_visita_repo = ReservaVisitaRepository()
+        self.archivo_area_comun_repo = ReservaAreaComunArchivoRepository()
+        self.archivo_visita_repo = ReservaVisitaArchivoRepository()
+        self.saldo_repo = SaldoDepartamentoRepository()
+        self.estado = estado_barrido
+
+    def expire_reservas(self, db: Session, ahora: Optional[datetime] = None) -> BarridoReservasResponse:
+        """Marca como completadas las reservas activas cuyo periodo ya terminó (un UPDATE por tabla)"""
+        ahora = ahora or datetime.now()
+        inicio = time.perf_counter()
+        try:
+            areas = self.reserva_area_comun_repo.expire_finished(db, ahora)
+            visitas = self.reserva_visita_repo.expire_finished(db, ahora)
+        except Exception as e:
+            db.rollback()
+            self.estado.registrar_error(e)
+            raise
+        
+        barrido = BarridoReservasResponse(
+            ejecutado_en=ahora,
+            duracion_ms=round((time.perf_counter() - inicio) * 1000, 3),
+            reservas_area_comun=len(areas),
+            reservas_visita=len(visitas)
+        )
+        self.estado.registrar(barrido)
+        return barrido
+
+    def archive_reservas(self, db: Session, dias: int, lote: int = 500, ahora: Optional[datetime] = None) -> ArchivoReservasResponse:
+        """Mueve al archivo, en lotes, las reservas completadas o canceladas con más de `dias` de antigüedad"""
+        ahora = ahora or datetime.now()
+        antes_de = ahora - timedelta(days=dias)
+        inicio = time.perf_counter()
+        try:
+            areas = self.archivo_area_comun_repo.archive_older_than(db, antes_de, lote)
+            visitas = self.archivo_visita_repo.archive_older_than(db, antes_de, lote)
+        except Exception as e:
+            db.rollback()
+            self.estado.registrar_error(e)
+            raise
+        
+        archivo = ArchivoReservasResponse(
+            ejecutado_en=ahora,
+            antes_de=antes_de,
+            duracion_ms=round((time.perf_counter() - inicio) * 1000, 3),
+            reservas_area_comun=areas,
+            reservas_visita=visitas
+        )
+        self.estado.registrar_archivo(archivo)
+        return archivo
+
+    def rebuild_saldos(self, db: Session) -> int:
+        """Recalcula los saldos materializados de todos los departamentos; regresa cuántos tienen saldo"""
+        return self.saldo_repo.rebuild(db)
+
+    def get_estado_barrido(self) -> EstadoBarridoResponse:
+        return self.estado.snapshot()
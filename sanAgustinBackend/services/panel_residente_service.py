@@ -1,41 +1,140 @@
-from typing import Optional
+from itertools import chain
+from typing import Dict, Iterable, Optional, Set
+from sqlalchemy import event, inspect
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
+from config import settings
+from caching.ttl_cache import TTLCache
 from repositories.departamento_repository import DepartamentoRepository
-from repositories.estacionamiento_repository import EstacionamientoRepository
-from repositories.adeudo_repository import AdeudoRepository
+from repositories.version_recurso_repository import VersionRecursoRepository
 from models.schemas.panel_residente import PanelResidenteResponse
 from models.database.departamento import Departamento
 from models.database.estacionamiento import Estacionamiento
 from models.database.adeudo import Adeudo
+from models.database.version_recurso import PANEL
+from caching.etag import make_etag
+
+class PanelCache(TTLCache):
+    """Paneles por usuario_id junto con el ETag con el que se generaron.
+
+    Solo se sirve un panel si su ETag coincide con la versión actual: la
+    invalidación por departamento solo alcanza a este proceso, y la versión
+    es lo que detecta escrituras de otros workers.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl_segundos: float = 60.0):
+        super().__init__(maxsize, ttl_segundos)
+        self._usuario_por_departamento: Dict[int, int] = {}
+
+    def set(self, usuario_id: int, panel: PanelResidenteResponse, etag: str) -> None:
+        # El índice por departamento se actualiza bajo el mismo lock que las entradas
+        with self._lock:
+            super().set(usuario_id, (etag, panel))
+            self._usuario_por_departamento[panel.departamento.id] = usuario_id
+
+    def get_vigente(self, usuario_id: int, etag: str) -> Optional[PanelResidenteResponse]:
+        """Panel cacheado si corresponde a `etag`; uno de otra versión se descarta"""
+        entrada = self.get(usuario_id)
+        if entrada is None:
+            return None
+        etag_cacheado, panel = entrada
+        if etag_cacheado != etag:
+            self.invalidate(usuario_id)
+            return None
+        return panel
+
+    def invalidate_departamentos(self, departamento_ids: Iterable[int]) -> None:
+        with self._lock:
+            for departamento_id in departamento_ids:
+                usuario_id = self._usuario_por_departamento.get(departamento_id)
+                if usuario_id is not None:
+                    self.invalidate(usuario_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            super().clear()
+            self._usuario_por_departamento.clear()
+
+    def _descartada(self, usuario_id: int, valor) -> None:
+        # Expiración, desalojo LRU o invalidación: el índice no crece más que la caché
+        _, panel = valor
+        if self._usuario_por_departamento.get(panel.departamento.id) == usuario_id:
+            del self._usuario_por_departamento[panel.departamento.id]
+
+panel_cache = PanelCache(settings.PANEL_CACHE_MAX, settings.PANEL_CACHE_TTL_SEGUNDOS)
 
 class PanelResidenteService:
     def __init__(self):
         self.departamento_repo = DepartamentoRepository()
-        self.estacionamiento_repo = EstacionamientoRepository()
-        self.adeudo_repo = AdeudoRepository()
-
-    def get_panel_residente(self, db: Session, usuario_id: int) -> PanelResidenteResponse:
-        """Obtiene toda la información del panel de residente"""
-        # Buscar el departamento del usuario
-        departamento = self.departamento_repo.get_by_usuario_id(db, usuario_id)
-        if not departamento:
-            raise HTTPException(status_code=404, detail="No se encontró departamento asociado al usuario")
+        self.version_repo = VersionRecursoRepository()
+        self.cache = panel_cache
+
+    def get_etag(self, db: Session, usuario_id: int) -> Optional[str]:
+        """ETag del panel; None si el usuario no tiene departamento"""
+        versiones = self.version_repo.get_departamento_versions(db, usuario_id, [PANEL])
+        return make_etag(PANEL, *versiones) if versiones else None
+
+    def get_panel_residente(self, db: Session, usuario_id: int, etag: Optional[str] = None) -> PanelResidenteResponse:
+        """Obtiene toda la información del panel de residente.
+
+        `etag` es el de get_etag en la misma petición; sin él no se usa la caché.
+        """
+        if etag is not None:
+            panel = self.cache.get_vigente(usuario_id, etag)
+            if panel is not None:
+                return panel
         
-        # Buscar estacionamiento del departamento
-        estacionamiento = self.estacionamiento_repo.get_by_departamento_id(db, departamento.id, es_visita=False)
+        # Departamento, estacionamiento y adeudos pendientes en una sola consulta
+        filas = self.departamento_repo.get_panel_by_usuario_id(db, usuario_id)
+        if not filas:
+            raise HTTPException(status_code=404, detail="No se encontró departamento asociado al usuario")
         
-        # Buscar adeudos pendientes
-        adeudos_pendientes = self.adeudo_repo.get_pendientes_by_departamento_id(db, departamento.id)
+        departamento, saldo, estacionamiento, _ = filas[0]
+        adeudos_pendientes = [adeudo for _, _, _, adeudo in filas if adeudo is not None]
         
-        # Calcular total de adeudos
-        total_adeudos = self.adeudo_repo.get_total_adeudos_by_departamento_id(db, departamento.id)
-        puede_reservar = total_adeudos == 0
+        # Total y permiso de reservar salen del saldo materializado, igual que en la reserva
+        total_adeudos = float(saldo.saldo_pendiente) if saldo else 0.0
+        puede_reservar = not (saldo and saldo.adeudos_pendientes)
         
-        return PanelResidenteResponse(
+        panel = PanelResidenteResponse(
             departamento=departamento,
             estacionamiento=estacionamiento,
             adeudos_pendientes=adeudos_pendientes,
             total_adeudos=total_adeudos,
             puede_reservar=puede_reservar
         )
+        if etag is not None:
+            # El panel se leyó después que la versión: es igual o más nuevo que el ETag
+            self.cache.set(usuario_id, panel, etag)
+        return panel
+
+def _departamentos_afectados(session: Session) -> Set[int]:
+    """Departamentos cuyo panel cambia con lo que se está escribiendo en la sesión"""
+    departamento_ids: Set[int] = set()
+    for obj in chain(session.new, session.dirty, session.deleted):
+        if isinstance(obj, Departamento):
+            departamento_ids.add(obj.id)
+        elif isinstance(obj, (Adeudo, Estacionamiento)):
+            departamento_ids.add(obj.departamento_id)
+            # Si el registro cambió de departamento, el anterior también se invalida
+            departamento_ids.update(inspect(obj).attrs.departamento_id.history.deleted)
+    departamento_ids.discard(None)
+    return departamento_ids
+
+@event.listens_for(Session, "after_flush")
+def _invalidar_panel_after_flush(session: Session, flush_context) -> None:
+    departamento_ids = _departamentos_afectados(session)
+    if departamento_ids:
+        panel_cache.invalidate_departamentos(departamento_ids)
+        session.info.setdefault("panel_departamentos", set()).update(departamento_ids)
+
+@event.listens_for(Session, "after_commit")
+def _invalidar_panel_after_commit(session: Session) -> None:
+    # Otra lectura pudo llenar la caché entre el flush y el commit con datos anteriores
+    departamento_ids = session.info.pop("panel_departamentos", None)
+    if departamento_ids:
+        panel_cache.invalidate_departamentos(departamento_ids)
+
+@event.listens_for(Session, "after_rollback")
+def _descartar_panel_pendiente(session: Session) -> None:
+    session.info.pop("panel_departamentos", None)
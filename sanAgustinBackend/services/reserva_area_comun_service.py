@@ -1,68 +1,266 @@
-from typing import List, Dict, Any
+from itertools import groupby
+from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
-from datetime import datetime
+from datetime import datetime, timedelta
 from repositories.departamento_repository import DepartamentoRepository
+from repositories.reserva_archivo_repository import ReservaAreaComunArchivoRepository
 from repositories.area_comun_repository import AreaComunRepository
 from repositories.reserva_area_comun_repository import ReservaAreaComunRepository
-from repositories.adeudo_repository import AdeudoRepository
-from models.schemas.reserva_area_comun import ReservaAreaComunCreate, ReservaAreaComunResponse
+from repositories.version_recurso_repository import VersionRecursoRepository
+from repositories.saldo_departamento_repository import SaldoDepartamentoRepository
+from models.schemas.reserva_area_comun import (
+    ReservaAreaComunCreate, ReservaAreaComunResponse, CalendarioAreaComunResponse, IntervaloOcupado, HuecoAreaComun,
+    ReservaAreaComunRecurrenteCreate, ReservaAreaComunRecurrenteResponse
+)
+from models.schemas.area_comun import AreaComunResponse
+from models.database.reserva_area_comun import ReservaAreaComun
+from models.database.area_comun import AreaComun
+from models.database.restricciones import is_overlap_violation
+from models.database.version_recurso import RESERVAS_AREA_COMUN, AREAS_COMUNES
+from caching.etag import make_etag
+from scheduling.intervals import IntervalIndex, clip_intervals, free_gaps, occupancy, saturated_intervals
+from scheduling.recurrence import expand_recurrence
+
+# Rango máximo que puede pedirse al calendario
+MAX_DIAS_CALENDARIO = 93
+# Horizonte por defecto al buscar huecos libres
+DIAS_BUSQUEDA_HUECOS = 30
 
 class ReservaAreaComunService:
     def __init__(self):
         self.departamento_repo = DepartamentoRepository()
+        self.archivo_repo = ReservaAreaComunArchivoRepository()
         self.area_comun_repo = AreaComunRepository()
         self.reserva_repo = ReservaAreaComunRepository()
-        self.adeudo_repo = AdeudoRepository()
+        self.version_repo = VersionRecursoRepository()
+        self.saldo_repo = SaldoDepartamentoRepository()
 
     def check_availability(self, db: Session, area_comun_id: int, fecha_inicio: datetime, fecha_fin: datetime) -> Dict[str, Any]:
-        """Verifica la disponibilidad de un área común en un periodo específico"""
-        reservas_existentes = self.reserva_repo.check_availability(db, area_comun_id, fecha_inicio, fecha_fin)
+        """Verifica la disponibilidad de un área común en un periodo específico.
+
+        Consulta el IntervalIndexRegistry del proceso, no la base: cada worker
+        tiene su copia y hasta que el índice expira (300 s) o se invalida puede
+        no ver reservas creadas en otro worker, o seguir contando reservas que
+        otro worker canceló, completó o archivó. Es una respuesta aproximada;
+        create_reserva confirma en la base un periodo ocupado antes de
+        rechazarlo, y lo que garantiza la capacidad es el trigger de
+        models.database.restricciones, que se traduce a 409.
+        """
+        indice = self.reserva_repo.get_index(db, area_comun_id)
+        traslapes = indice.overlapping(fecha_inicio, fecha_fin)
+        
+        ocupacion = occupancy(traslapes, fecha_inicio, fecha_fin, indice.capacidad)
         
         return {
-            "disponible": len(reservas_existentes) == 0,
-            "reservas_existentes": len(reservas_existentes)
+            "disponible": ocupacion < indice.capacidad,
+            "reservas_existentes": len(traslapes),
+            "capacidad": indice.capacidad,
+            "lugares_disponibles": max(indice.capacidad - ocupacion, 0)
+        }
+
+    def get_calendario(self, db: Session, desde: datetime, hasta: datetime, area_comun_ids: Optional[List[int]] = None) -> List[CalendarioAreaComunResponse]:
+        """Obtiene los periodos ocupados de cada área común entre dos fechas"""
+        self._validate_range(desde, hasta)
+        areas_comunes = self._get_areas(db, area_comun_ids)
+        
+        # Una sola consulta de rango, ya ordenada por área e inicio
+        ocupados = self.reserva_repo.get_busy_in_range(db, desde, hasta, area_comun_ids)
+        por_area = {
+            area_comun_id: clip_intervals(((inicio, fin) for _, inicio, fin in filas), desde, hasta)
+            for area_comun_id, filas in groupby(ocupados, key=lambda fila: fila[0])
         }
+        
+        # Un área con capacidad mayor a 1 solo está ocupada cuando se llena
+        return [
+            CalendarioAreaComunResponse(
+                area_comun_id=area.id,
+                nombre=area.nombre,
+                ocupado=[
+                    IntervaloOcupado(inicio=inicio, fin=fin)
+                    for inicio, fin in saturated_intervals(por_area.get(area.id, []), area.capacidad or 1)
+                ]
+            )
+            for area in areas_comunes
+        ]
+
+    def find_next_available(self, db: Session, duracion: timedelta, desde: Optional[datetime] = None, area_comun_ids: Optional[List[int]] = None, limite: int = 5, hasta: Optional[datetime] = None) -> List[HuecoAreaComun]:
+        """Busca los primeros huecos libres de la duración indicada en las áreas comunes"""
+        desde = desde or datetime.now()
+        hasta = hasta or desde + timedelta(days=DIAS_BUSQUEDA_HUECOS)
+        if duracion <= timedelta(0):
+            raise HTTPException(status_code=400, detail="La duración debe ser mayor a cero")
+        self._validate_range(desde, hasta)
+        areas_comunes = self._get_areas(db, area_comun_ids)
+        
+        # Una sola consulta; cada área se recorre una vez sobre sus reservas ordenadas
+        ocupados = self.reserva_repo.get_busy_in_range(db, desde, hasta, area_comun_ids)
+        por_area = {
+            area_comun_id: [(inicio, fin) for _, inicio, fin in filas]
+            for area_comun_id, filas in groupby(ocupados, key=lambda fila: fila[0])
+        }
+        
+        huecos = [
+            HuecoAreaComun(area_comun_id=area.id, nombre=area.nombre, inicio=inicio, fin=fin)
+            for area in areas_comunes
+            for inicio, fin in free_gaps(por_area.get(area.id, []), desde, hasta, duracion, area.capacidad or 1)[:limite]
+        ]
+        huecos.sort(key=lambda hueco: (hueco.inicio, hueco.area_comun_id))
+        return huecos[:limite]
 
     def create_reserva(self, db: Session, usuario_id: int, reserva: ReservaAreaComunCreate) -> ReservaAreaComunResponse:
         """Crea una reserva de área común"""
-        # Verificar que el usuario puede reservar (sin adeudos)
-        departamento = self.departamento_repo.get_by_usuario_id(db, usuario_id)
-        if not departamento:
+        # Departamento, adeudos pendientes y área común en una sola consulta
+        contexto = self.reserva_repo.get_booking_context(db, usuario_id, reserva.area_comun_id)
+        if not contexto:
             raise HTTPException(status_code=404, detail="No se encontró departamento asociado al usuario")
         
-        adeudos_pendientes = self.adeudo_repo.get_pendientes_by_departamento_id(db, departamento.id)
-        if adeudos_pendientes:
+        # Verificar que el usuario puede reservar (sin adeudos)
+        if contexto.tiene_adeudos:
             raise HTTPException(status_code=400, detail="No puede realizar reservas mientras tenga adeudos pendientes")
         
-        # Verificar disponibilidad
+        if contexto.AreaComun is None:
+            raise HTTPException(status_code=404, detail="Área común no encontrada")
+        area_comun = AreaComunResponse.from_orm(contexto.AreaComun).dict()
+        
+        # Verificar disponibilidad (índice en memoria, sin ida a la base de datos)
         disponibilidad = self.check_availability(db, reserva.area_comun_id, reserva.periodo_inicio, reserva.periodo_fin)
         if not disponibilidad["disponible"]:
-            raise HTTPException(status_code=400, detail="El área común no está disponible en el periodo solicitado")
+            # El índice puede conservar reservas que otro worker canceló, completó o archivó: se confirma en la base
+            traslapes = self.reserva_repo.get_overlapping_intervals(db, reserva.area_comun_id, reserva.periodo_inicio, reserva.periodo_fin)
+            if occupancy(traslapes, reserva.periodo_inicio, reserva.periodo_fin, disponibilidad["capacidad"]) >= disponibilidad["capacidad"]:
+                raise HTTPException(status_code=400, detail="El área común no está disponible en el periodo solicitado")
+            self.reserva_repo.indice.invalidate(reserva.area_comun_id)
         
-        # Crear la reserva
+        # Crear la reserva con INSERT ... RETURNING y commit, sin refresh
         reserva_data = {
             "area_comun_id": reserva.area_comun_id,
-            "departamento_id": departamento.id,
+            "departamento_id": contexto.departamento_id,
             "periodo_inicio": reserva.periodo_inicio,
             "periodo_fin": reserva.periodo_fin
         }
         
-        nueva_reserva = self.reserva_repo.create(db, obj_in=reserva_data)
+        try:
+            nueva_reserva = self.reserva_repo.create_row(db, obj_in=reserva_data)
+        except IntegrityError as e:
+            # La base de datos rechaza el traslape aunque dos solicitudes pasen la verificación a la vez
+            if is_overlap_violation(e):
+                raise HTTPException(status_code=409, detail="El área común acaba de ser reservada en el periodo solicitado")
+            raise
+        return self._to_response(nueva_reserva, area_comun)
+
+    def create_reservas_recurrentes(self, db: Session, usuario_id: int, reserva: ReservaAreaComunRecurrenteCreate) -> ReservaAreaComunRecurrenteResponse:
+        """Crea en una sola transacción todas las ocurrencias disponibles de una reserva periódica"""
+        departamento = self.departamento_repo.get_by_usuario_id(db, usuario_id)
+        if not departamento:
+            raise HTTPException(status_code=404, detail="No se encontró departamento asociado al usuario")
+        
+        if self.saldo_repo.tiene_adeudos(db, departamento.id):
+            raise HTTPException(status_code=400, detail="No puede realizar reservas mientras tenga adeudos pendientes")
         
-        # Obtener información del área común
         area_comun = self.area_comun_repo.get(db, reserva.area_comun_id)
+        if not area_comun:
+            raise HTTPException(status_code=404, detail="Área común no encontrada")
         
-        return ReservaAreaComunResponse(
-            **nueva_reserva.__dict__,
-            area_comun=area_comun.__dict__
+        if reserva.periodo_fin <= reserva.periodo_inicio:
+            raise HTTPException(status_code=400, detail="La fecha final debe ser posterior a la inicial")
+        try:
+            ocurrencias = expand_recurrence(reserva.periodo_inicio, reserva.periodo_fin, reserva.frecuencia, reserva.repeticiones)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        
+        # Una sola consulta con las reservas activas que tocan la serie completa
+        existentes = self.reserva_repo.get_busy_in_range(db, ocurrencias[0][0], ocurrencias[-1][1], [reserva.area_comun_id])
+        indice = IntervalIndex(
+            ((inicio, fin, posicion) for posicion, (_, inicio, fin) in enumerate(existentes)),
+            capacidad=area_comun.capacidad
+        )
+        
+        aceptadas, conflictos = [], []
+        for inicio, fin in ocurrencias:
+            ocupacion = occupancy(indice.overlapping(inicio, fin), inicio, fin, indice.capacidad)
+            (aceptadas if ocupacion < indice.capacidad else conflictos).append((inicio, fin))
+        
+        if conflictos and not reserva.omitir_conflictos:
+            raise HTTPException(
+                status_code=400,
+                detail=f"{len(conflictos)} de {len(ocurrencias)} ocurrencias no están disponibles"
+            )
+        
+        area_comun_data = AreaComunResponse.from_orm(area_comun).dict()
+        try:
+            creadas = self.reserva_repo.create_many(db, objs_in=[
+                {
+                    "area_comun_id": reserva.area_comun_id,
+                    "departamento_id": departamento.id,
+                    "periodo_inicio": inicio,
+                    "periodo_fin": fin
+                }
+                for inicio, fin in aceptadas
+            ])
+        except IntegrityError as e:
+            if is_overlap_violation(e):
+                raise HTTPException(status_code=409, detail="Alguna de las ocurrencias acaba de ser reservada; intente de nuevo")
+            raise
+        
+        return ReservaAreaComunRecurrenteResponse(
+            creadas=[self._to_response(fila, area_comun_data) for fila in sorted(creadas, key=lambda fila: fila.periodo_inicio)],
+            conflictos=[IntervaloOcupado(inicio=inicio, fin=fin) for inicio, fin in conflictos]
         )
 
-    def get_user_reservas(self, db: Session, usuario_id: int) -> List[ReservaAreaComunResponse]:
+    def cancel_reserva(self, db: Session, usuario_id: int, reserva_id: int) -> ReservaAreaComunResponse:
+        """Cancela una reserva activa del usuario y libera el horario"""
+        departamento = self.departamento_repo.get_by_usuario_id(db, usuario_id)
+        if not departamento:
+            raise HTTPException(status_code=404, detail="No se encontró departamento asociado al usuario")
+        
+        reserva = self.reserva_repo.get(db, reserva_id)
+        if not reserva or reserva.departamento_id != departamento.id:
+            raise HTTPException(status_code=404, detail="Reserva no encontrada")
+        if reserva.estado != "activa":
+            raise HTTPException(status_code=400, detail="La reserva no está activa")
+        
+        reserva = self.reserva_repo.cancel(db, reserva)
+        return self._to_response(reserva, AreaComunResponse.from_orm(reserva.area_comun).dict())
+
+    def get_user_reservas_etag(self, db: Session, usuario_id: int, include_archived: bool = False) -> Optional[str]:
+        """ETag del listado del usuario: versión de sus reservas y del catálogo; None si no tiene departamento"""
+        versiones = self.version_repo.get_departamento_versions(db, usuario_id, [RESERVAS_AREA_COMUN], [AREAS_COMUNES])
+        if not versiones:
+            return None
+        return make_etag(RESERVAS_AREA_COMUN, *versiones, "archivo" if include_archived else "vigentes")
+
+    def get_user_reservas(self, db: Session, usuario_id: int, include_archived: bool = False) -> List[ReservaAreaComunResponse]:
         """Obtiene las reservas de área común del usuario"""
         departamento = self.departamento_repo.get_by_usuario_id(db, usuario_id)
         if not departamento:
             return []
         
         reservas = self.reserva_repo.get_by_departamento_id(db, departamento.id)
-        return [ReservaAreaComunResponse.from_orm(reserva) for reserva in reservas]
+        # El archivo solo se consulta cuando se pide explícitamente
+        if include_archived:
+            reservas = reservas + self.archivo_repo.get_by_departamento_id(db, departamento.id)
+        return [self._to_response(reserva, AreaComunResponse.from_orm(reserva.area_comun).dict()) for reserva in reservas]
+
+    def _to_response(self, reserva: ReservaAreaComun, area_comun: Dict[str, Any]) -> ReservaAreaComunResponse:
+        return ReservaAreaComunResponse(
+            id=reserva.id,
+            area_comun_id=reserva.area_comun_id,
+            departamento_id=reserva.departamento_id,
+            periodo_inicio=reserva.periodo_inicio,
+            periodo_fin=reserva.periodo_fin,
+            estado=reserva.estado,
+            area_comun=area_comun
+        )
+
+    def _get_areas(self, db: Session, area_comun_ids: Optional[List[int]]) -> List[AreaComun]:
+        if area_comun_ids:
+            return self.area_comun_repo.get_by_ids(db, area_comun_ids)
+        return self.area_comun_repo.get_all_active(db)
+
+    def _validate_range(self, desde: datetime, hasta: datetime) -> None:
+        if hasta <= desde:
+            raise HTTPException(status_code=400, detail="La fecha final debe ser posterior a la inicial")
+        if (hasta - desde).days > MAX_DIAS_CALENDARIO:
+            raise HTTPException(status_code=400, detail=f"El rango no puede exceder {MAX_DIAS_CALENDARIO} días")
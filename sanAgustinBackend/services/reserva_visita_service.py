@@ -1,68 +1,194 @@
-from typing import List, Dict, Any
+from itertools import groupby
+from typing import List, Dict, Any, Optional
 from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
-from datetime import datetime
+from datetime import datetime, timedelta
 from repositories.departamento_repository import DepartamentoRepository
+from repositories.reserva_archivo_repository import ReservaVisitaArchivoRepository
 from repositories.lugar_visita_repository import LugarVisitaRepository
 from repositories.reserva_visita_repository import ReservaVisitaRepository
-from models.schemas.reserva_visita import ReservaVisitaCreate, ReservaVisitaResponse
+from repositories.version_recurso_repository import VersionRecursoRepository
+from models.schemas.reserva_visita import ReservaVisitaCreate, ReservaVisitaResponse, HuecoLugarVisita
+from models.schemas.lugar_visita import LugarVisitaResponse
+from models.database.restricciones import is_overlap_violation
+from models.database.version_recurso import RESERVAS_VISITA, LUGARES_VISITA
+from caching.etag import make_etag
+from scheduling.intervals import fit_slack, free_gaps, occupancy
+
+# Duración máxima de una visita
+MAX_HORAS_VISITA = 24
+# Horizonte por defecto y máximo al buscar huecos libres
+DIAS_BUSQUEDA_HUECOS = 7
+MAX_DIAS_BUSQUEDA = 31
 
 class ReservaVisitaService:
     def __init__(self):
         self.departamento_repo = DepartamentoRepository()
+        self.archivo_repo = ReservaVisitaArchivoRepository()
         self.lugar_visita_repo = LugarVisitaRepository()
         self.reserva_repo = ReservaVisitaRepository()
+        self.version_repo = VersionRecursoRepository()
 
     def check_availability(self, db: Session, lugar_visita_id: int, fecha_inicio: datetime, fecha_fin: datetime) -> Dict[str, Any]:
         """Verifica la disponibilidad de un lugar de visita en un periodo específico"""
-        reservas_existentes = self.reserva_repo.check_availability(db, lugar_visita_id, fecha_inicio, fecha_fin)
+        lugar_visita = self.lugar_visita_repo.get(db, lugar_visita_id)
+        capacidad = max(lugar_visita.capacidad or 1, 1) if lugar_visita else 1
+        return self._availability(db, lugar_visita_id, fecha_inicio, fecha_fin, capacidad)
+
+    def _availability(self, db: Session, lugar_visita_id: int, fecha_inicio: datetime, fecha_fin: datetime, capacidad: int) -> Dict[str, Any]:
+        traslapes = self.reserva_repo.get_overlapping_intervals(db, lugar_visita_id, fecha_inicio, fecha_fin)
+        ocupacion = occupancy(traslapes, fecha_inicio, fecha_fin, capacidad)
         
         return {
-            "disponible": len(reservas_existentes) == 0,
-            "reservas_existentes": len(reservas_existentes)
+            "disponible": ocupacion < capacidad,
+            "reservas_existentes": len(traslapes),
+            "capacidad": capacidad,
+            "lugares_disponibles": max(capacidad - ocupacion, 0)
+        }
+
+    def find_next_available(self, db: Session, duracion: timedelta, desde: Optional[datetime] = None, lugar_visita_ids: Optional[List[int]] = None, limite: int = 5, hasta: Optional[datetime] = None) -> List[HuecoLugarVisita]:
+        """Busca los primeros huecos libres de la duración indicada en los lugares de visita"""
+        desde = desde or datetime.now()
+        hasta = hasta or desde + timedelta(days=DIAS_BUSQUEDA_HUECOS)
+        if duracion <= timedelta(0):
+            raise HTTPException(status_code=400, detail="La duración debe ser mayor a cero")
+        if duracion > timedelta(hours=MAX_HORAS_VISITA):
+            raise HTTPException(status_code=400, detail="La reserva no puede exceder 24 horas")
+        if hasta <= desde:
+            raise HTTPException(status_code=400, detail="La fecha final debe ser posterior a la inicial")
+        if (hasta - desde).days > MAX_DIAS_BUSQUEDA:
+            raise HTTPException(status_code=400, detail=f"El rango no puede exceder {MAX_DIAS_BUSQUEDA} días")
+        
+        if lugar_visita_ids:
+            lugares_visita = self.lugar_visita_repo.get_by_ids(db, lugar_visita_ids)
+        else:
+            lugares_visita = self.lugar_visita_repo.get_all_active(db)
+        
+        # Una sola consulta; cada lugar se recorre una vez sobre sus reservas ordenadas
+        ocupados = self.reserva_repo.get_busy_in_range(db, desde, hasta, lugar_visita_ids)
+        por_lugar = {
+            lugar_visita_id: [(inicio, fin) for _, inicio, fin in filas]
+            for lugar_visita_id, filas in groupby(ocupados, key=lambda fila: fila[0])
         }
+        
+        huecos = [
+            HuecoLugarVisita(lugar_visita_id=lugar.id, numero=lugar.numero, inicio=inicio, fin=fin)
+            for lugar in lugares_visita
+            for inicio, fin in free_gaps(por_lugar.get(lugar.id, []), desde, hasta, duracion, lugar.capacidad or 1)[:limite]
+        ]
+        huecos.sort(key=lambda hueco: (hueco.inicio, hueco.lugar_visita_id))
+        return huecos[:limite]
 
     def create_reserva(self, db: Session, usuario_id: int, reserva: ReservaVisitaCreate) -> ReservaVisitaResponse:
         """Crea una reserva de lugar de visita"""
-        # Verificar que el usuario tiene departamento
-        departamento = self.departamento_repo.get_by_usuario_id(db, usuario_id)
-        if not departamento:
+        if reserva.lugar_visita_id is None:
+            return self.create_reserva_cualquier_lugar(db, usuario_id, reserva)
+        
+        # Departamento del usuario y lugar de visita en una sola consulta
+        contexto = self.reserva_repo.get_booking_context(db, usuario_id, reserva.lugar_visita_id)
+        if not contexto:
             raise HTTPException(status_code=404, detail="No se encontró departamento asociado al usuario")
         
         # Verificar que la reserva no exceda 24 horas
         duracion = reserva.periodo_fin - reserva.periodo_inicio
-        if duracion.total_seconds() > 24 * 3600:
+        if duracion.total_seconds() > MAX_HORAS_VISITA * 3600:
             raise HTTPException(status_code=400, detail="La reserva no puede exceder 24 horas")
         
+        if contexto.LugarVisita is None:
+            raise HTTPException(status_code=404, detail="Lugar de visita no encontrado")
+        lugar_visita = LugarVisitaResponse.from_orm(contexto.LugarVisita)
+        
         # Verificar disponibilidad
-        disponibilidad = self.check_availability(db, reserva.lugar_visita_id, reserva.periodo_inicio, reserva.periodo_fin)
+        disponibilidad = self._availability(db, reserva.lugar_visita_id, reserva.periodo_inicio, reserva.periodo_fin, max(lugar_visita.capacidad or 1, 1))
         if not disponibilidad["disponible"]:
             raise HTTPException(status_code=400, detail="El lugar de visita no está disponible en el periodo solicitado")
         
-        # Crear la reserva
+        # Crear la reserva con INSERT ... RETURNING y commit, sin refresh
         reserva_data = {
             "lugar_visita_id": reserva.lugar_visita_id,
-            "departamento_id": departamento.id,
+            "departamento_id": contexto.departamento_id,
             "placa_visita": reserva.placa_visita,
             "periodo_inicio": reserva.periodo_inicio,
             "periodo_fin": reserva.periodo_fin
         }
         
-        nueva_reserva = self.reserva_repo.create(db, obj_in=reserva_data)
+        try:
+            nueva_reserva = self.reserva_repo.create_row(db, obj_in=reserva_data)
+        except IntegrityError as e:
+            # La base de datos rechaza el traslape aunque dos solicitudes pasen la verificación a la vez
+            if is_overlap_violation(e):
+                raise HTTPException(status_code=409, detail="El lugar de visita acaba de ser reservado en el periodo solicitado")
+            raise
+        return ReservaVisitaResponse(**nueva_reserva._asdict(), lugar_visita=lugar_visita)
+
+    def create_reserva_cualquier_lugar(self, db: Session, usuario_id: int, reserva: ReservaVisitaCreate) -> ReservaVisitaResponse:
+        """Reserva el lugar de visita libre que mejor se ajusta al periodo (best-fit)"""
+        departamento = self.departamento_repo.get_by_usuario_id(db, usuario_id)
+        if not departamento:
+            raise HTTPException(status_code=404, detail="No se encontró departamento asociado al usuario")
         
-        # Obtener información del lugar de visita
-        lugar_visita = self.lugar_visita_repo.get(db, reserva.lugar_visita_id)
+        duracion = reserva.periodo_fin - reserva.periodo_inicio
+        if duracion.total_seconds() > MAX_HORAS_VISITA * 3600:
+            raise HTTPException(status_code=400, detail="La reserva no puede exceder 24 horas")
+        if duracion <= timedelta(0):
+            raise HTTPException(status_code=400, detail="La fecha final debe ser posterior a la inicial")
         
-        return ReservaVisitaResponse(
-            **nueva_reserva.__dict__,
-            lugar_visita=lugar_visita
-        )
+        # Una sola consulta con las reservas de todos los lugares alrededor del periodo;
+        # el margen permite medir el hueco que deja cada lugar
+        margen = timedelta(hours=MAX_HORAS_VISITA)
+        desde, hasta = reserva.periodo_inicio - margen, reserva.periodo_fin + margen
+        lugares_visita = self.lugar_visita_repo.get_all_active(db)
+        ocupados = self.reserva_repo.get_busy_in_range(db, desde, hasta)
+        por_lugar = {
+            lugar_visita_id: [(inicio, fin) for _, inicio, fin in filas]
+            for lugar_visita_id, filas in groupby(ocupados, key=lambda fila: fila[0])
+        }
+        
+        candidatos = []
+        for lugar in lugares_visita:
+            sobrante = fit_slack(
+                por_lugar.get(lugar.id, []), reserva.periodo_inicio, reserva.periodo_fin,
+                desde, hasta, max(lugar.capacidad or 1, 1)
+            )
+            if sobrante is not None:
+                candidatos.append((sobrante, lugar.id, lugar))
+        candidatos.sort(key=lambda candidato: (candidato[0], candidato[1]))
+        
+        # Si otra solicitud gana el lugar elegido, la base de datos lo rechaza y se intenta el siguiente
+        for _, _, lugar in candidatos:
+            reserva_data = {
+                "lugar_visita_id": lugar.id,
+                "departamento_id": departamento.id,
+                "placa_visita": reserva.placa_visita,
+                "periodo_inicio": reserva.periodo_inicio,
+                "periodo_fin": reserva.periodo_fin
+            }
+            try:
+                nueva_reserva = self.reserva_repo.create_row(db, obj_in=reserva_data)
+            except IntegrityError as e:
+                if is_overlap_violation(e):
+                    continue
+                raise
+            return ReservaVisitaResponse(**nueva_reserva._asdict(), lugar_visita=LugarVisitaResponse.from_orm(lugar))
+        
+        raise HTTPException(status_code=400, detail="No hay lugares de visita disponibles en el periodo solicitado")
+
+    def get_user_reservas_etag(self, db: Session, usuario_id: int, include_archived: bool = False) -> Optional[str]:
+        """ETag del listado del usuario: versión de sus reservas y del catálogo; None si no tiene departamento"""
+        versiones = self.version_repo.get_departamento_versions(db, usuario_id, [RESERVAS_VISITA], [LUGARES_VISITA])
+        if not versiones:
+            return None
+        return make_etag(RESERVAS_VISITA, *versiones, "archivo" if include_archived else "vigentes")
 
-    def get_user_reservas(self, db: Session, usuario_id: int) -> List[ReservaVisitaResponse]:
+    def get_user_reservas(self, db: Session, usuario_id: int, include_archived: bool = False) -> List[ReservaVisitaResponse]:
         """Obtiene las reservas de visita del usuario"""
         departamento = self.departamento_repo.get_by_usuario_id(db, usuario_id)
         if not departamento:
             return []
         
         reservas = self.reserva_repo.get_by_departamento_id(db, departamento.id)
+        # El archivo solo se consulta cuando se pide explícitamente
+        if include_archived:
+            reservas = reservas + self.archivo_repo.get_by_departamento_id(db, departamento.id)
         return [ReservaVisitaResponse.from_orm(reserva) for reserva in reservas]
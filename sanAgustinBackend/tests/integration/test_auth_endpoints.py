@@ -0,0 +1,179 @@
+import asyncio
+import httpx
+from datetime import datetime
+from unittest.mock import AsyncMock, Mock, patch
+from fastapi.responses import RedirectResponse
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from main import app
+from api.auth_routes import get_current_admin_user
+from core.auth import token_cache
+from core.database import get_db, get_async_db
+from models.auth_schemas import User
+from models.database import Base, RegistroPendiente, Usuario
+
+class TestAuthEndpoints:
+    """Tests de integración de las rutas de auth sobre una sesión asíncrona real (aiosqlite)"""
+
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        self.engine = create_async_engine(
+            "sqlite+aiosqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        # Mismas opciones que AsyncSessionLocal
+        self.Session = async_sessionmaker(self.engine, autoflush=False, expire_on_commit=False)
+        self.admin = User(
+            id=1,
+            email="admin@sanagustin.com",
+            nombre="Admin",
+            apellido="San Agustín",
+            provider="manual",
+            is_active=True,
+            is_admin=True,
+            created_at=datetime(2024, 1, 1)
+        )
+
+        async def get_db_prueba():
+            async with self.Session() as db:
+                yield db
+
+        app.dependency_overrides[get_async_db] = get_db_prueba
+        app.dependency_overrides[get_current_admin_user] = lambda: self.admin
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+        asyncio.run(self.engine.dispose())
+
+    async def _crear_esquema(self) -> int:
+        async with self.engine.begin() as connection:
+            await connection.run_sync(Base.metadata.create_all)
+        async with self.Session() as db:
+            registro = RegistroPendiente(
+                email="residente@example.com",
+                nombre="Residente",
+                apellido="Prueba",
+                provider="google",
+                provider_id="g-1",
+                telefono="5555555555",
+                departamento="01"
+            )
+            db.add(registro)
+            await db.commit()
+            return registro.id
+
+    async def _post(self, url: str) -> httpx.Response:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(url)
+
+    def test_approve_registration(self):
+        """Test que aprobar un registro serializa el usuario sin cargas perezosas en la sesión asíncrona"""
+        async def escenario():
+            reg_id = await self._crear_esquema()
+            return await self._post(f"/auth/approve-registration/{reg_id}")
+
+        response = asyncio.run(escenario())
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["email"] == "residente@example.com"
+        assert data["departamento_id"] is None
+        assert data["is_admin"] is False
+
+    def test_approve_registration_ya_aprobado(self):
+        """Test que un registro no se aprueba dos veces"""
+        async def escenario():
+            reg_id = await self._crear_esquema()
+            await self._post(f"/auth/approve-registration/{reg_id}")
+            return await self._post(f"/auth/approve-registration/{reg_id}")
+
+        response = asyncio.run(escenario())
+
+        assert response.status_code == 400
+        assert response.json()["detail"] == "El registro ya fue aprobado"
+
+    def test_approve_registration_no_encontrado(self):
+        """Test con un registro inexistente"""
+        async def escenario():
+            await self._crear_esquema()
+            return await self._post("/auth/approve-registration/999")
+
+        response = asyncio.run(escenario())
+
+        assert response.status_code == 404
+
+class TestRevokeTokensEndpoint:
+    """Tests de integración de la revocación de tokens sobre una base SQLite en memoria"""
+
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.Session = sessionmaker(bind=self.engine, autoflush=False)
+
+        with self.Session() as db:
+            usuario = Usuario(email="residente@example.com", nombre="Residente", apellido="Prueba", provider="google", provider_id="g-1")
+            db.add(usuario)
+            db.commit()
+            self.usuario_id = usuario.id
+
+        def get_db_prueba():
+            with self.Session() as db:
+                yield db
+
+        token_cache.clear()
+        app.dependency_overrides[get_db] = get_db_prueba
+        app.dependency_overrides[get_current_admin_user] = lambda: Mock(id=99, is_admin=True)
+        self.client = TestClient(app)
+
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+        token_cache.clear()
+        self.engine.dispose()
+
+    def test_revoke_tokens(self):
+        """Test que revocar incrementa token_version y descarta los tokens cacheados del usuario"""
+        token_cache.set(b"token", Mock(id=self.usuario_id))
+
+        response = self.client.post(f"/auth/users/{self.usuario_id}/revoke-tokens")
+
+        assert response.status_code == 200
+        assert response.json()["id"] == self.usuario_id
+        assert token_cache.get(b"token") is None
+        with self.Session() as db:
+            assert db.get(Usuario, self.usuario_id).token_version == 1
+
+    def test_revoke_tokens_usuario_no_encontrado(self):
+        """Test que revocar los tokens de un usuario inexistente regresa 404"""
+        response = self.client.post("/auth/users/999/revoke-tokens")
+
+        assert response.status_code == 404
+
+class TestGoogleLoginEndpoint:
+    """Tests de integración del inicio de sesión con Google"""
+
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        self.client = TestClient(app)
+
+    @patch('api.auth_routes.google_metadata')
+    @patch('api.auth_routes.oauth')
+    def test_login_refresca_metadata_caducada(self, mock_oauth, mock_google_metadata):
+        """Test que el login revisa la copia del descubrimiento de Google antes de redirigir"""
+        mock_oauth.google.authorize_redirect = AsyncMock(return_value=RedirectResponse("https://accounts.google.com/o/oauth2/v2/auth"))
+
+        response = self.client.get("/auth/google/login", follow_redirects=False)
+
+        assert response.status_code == 307
+        mock_google_metadata.refresh_if_stale.assert_called_once_with()
+        mock_oauth.google.authorize_redirect.assert_awaited_once()
@@ -4,6 +4,8 @@ from unittest.mock import patch, Mock
 from datetime import datetime, timedelta
 
 from main import app
+from core.auth import get_current_principal
+from core.database import get_read_db
 from models.schemas.panel_residente import PanelResidenteResponse
 from models.database.departamento import Departamento
 from models.database.estacionamiento import Estacionamiento
@@ -16,24 +18,23 @@ class TestPanelResidenteEndpoints:
         """Configuración inicial para cada test"""
         self.client = TestClient(app)
         self.base_url = "/panel-residente"
+        # Depends guarda la función original: se sustituyen con dependency_overrides, no con patch
+        self.mock_user = Mock()
+        self.mock_user.id = 1
+        self.mock_db = Mock()
+        app.dependency_overrides[get_current_principal] = lambda: self.mock_user
+        app.dependency_overrides[get_read_db] = lambda: self.mock_db
     
-    @patch('services.endpoints.panel_residente_endpoints.get_current_user')
-    @patch('services.endpoints.panel_residente_endpoints.get_db')
-    def test_get_panel_residente_success(self, mock_get_db, mock_get_current_user, 
-                                        sample_departamento, sample_estacionamiento, sample_adeudo):
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+    
+    def test_get_panel_residente_success(self, sample_departamento, sample_estacionamiento, sample_adeudo):
         """Test exitoso para obtener panel de residente"""
-        # Configurar mocks
-        mock_user = Mock()
-        mock_user.id = 1
-        mock_get_current_user.return_value = mock_user
-        
-        mock_db = Mock()
-        mock_get_db.return_value = mock_db
-        
         # Mock del servicio
         with patch('services.endpoints.panel_residente_endpoints.PanelResidenteService') as mock_service_class:
             mock_service = Mock()
             mock_service_class.return_value = mock_service
+            mock_service.get_etag.return_value = None
             
             # Crear respuesta esperada
             expected_response = PanelResidenteResponse(
@@ -57,24 +58,15 @@ class TestPanelResidenteEndpoints:
             assert data["puede_reservar"] == False
             
             # Verificar que se llamó el servicio
-            mock_service.get_panel_residente.assert_called_once_with(mock_db, mock_user.id)
+            mock_service.get_panel_residente.assert_called_once_with(self.mock_db, self.mock_user.id, None)
     
-    @patch('services.endpoints.panel_residente_endpoints.get_current_user')
-    @patch('services.endpoints.panel_residente_endpoints.get_db')
-    def test_get_panel_residente_no_departamento(self, mock_get_db, mock_get_current_user):
+    def test_get_panel_residente_no_departamento(self):
         """Test cuando el usuario no tiene departamento asociado"""
-        # Configurar mocks
-        mock_user = Mock()
-        mock_user.id = 1
-        mock_get_current_user.return_value = mock_user
-        
-        mock_db = Mock()
-        mock_get_db.return_value = mock_db
-        
         # Mock del servicio que lanza excepción
         with patch('services.endpoints.panel_residente_endpoints.PanelResidenteService') as mock_service_class:
             mock_service = Mock()
             mock_service_class.return_value = mock_service
+            mock_service.get_etag.return_value = None
             
             from fastapi import HTTPException
             mock_service.get_panel_residente.side_effect = HTTPException(
@@ -90,23 +82,13 @@ class TestPanelResidenteEndpoints:
             data = response.json()
             assert "No se encontró departamento asociado al usuario" in data["detail"]
     
-    @patch('services.endpoints.panel_residente_endpoints.get_current_user')
-    @patch('services.endpoints.panel_residente_endpoints.get_db')
-    def test_get_panel_residente_no_estacionamiento(self, mock_get_db, mock_get_current_user, 
-                                                   sample_departamento):
+    def test_get_panel_residente_no_estacionamiento(self, sample_departamento):
         """Test cuando el departamento no tiene estacionamiento"""
-        # Configurar mocks
-        mock_user = Mock()
-        mock_user.id = 1
-        mock_get_current_user.return_value = mock_user
-        
-        mock_db = Mock()
-        mock_get_db.return_value = mock_db
-        
         # Mock del servicio
         with patch('services.endpoints.panel_residente_endpoints.PanelResidenteService') as mock_service_class:
             mock_service = Mock()
             mock_service_class.return_value = mock_service
+            mock_service.get_etag.return_value = None
             
             # Crear respuesta esperada sin estacionamiento
             expected_response = PanelResidenteResponse(
@@ -129,19 +111,8 @@ class TestPanelResidenteEndpoints:
             assert data["total_adeudos"] == 0.0
             assert data["puede_reservar"] == True
     
-    @patch('services.endpoints.panel_residente_endpoints.get_current_user')
-    @patch('services.endpoints.panel_residente_endpoints.get_db')
-    def test_get_panel_residente_multiple_adeudos(self, mock_get_db, mock_get_current_user,
-                                                 sample_departamento, sample_estacionamiento):
+    def test_get_panel_residente_multiple_adeudos(self, sample_departamento, sample_estacionamiento):
         """Test cuando el departamento tiene múltiples adeudos"""
-        # Configurar mocks
-        mock_user = Mock()
-        mock_user.id = 1
-        mock_get_current_user.return_value = mock_user
-        
-        mock_db = Mock()
-        mock_get_db.return_value = mock_db
-        
         # Crear múltiples adeudos
         adeudo1 = Adeudo(
             id=1,
@@ -166,6 +137,7 @@ class TestPanelResidenteEndpoints:
         with patch('services.endpoints.panel_residente_endpoints.PanelResidenteService') as mock_service_class:
             mock_service = Mock()
             mock_service_class.return_value = mock_service
+            mock_service.get_etag.return_value = None
             
             # Crear respuesta esperada con múltiples adeudos
             expected_response = PanelResidenteResponse(
@@ -189,8 +161,11 @@ class TestPanelResidenteEndpoints:
     
     def test_get_panel_residente_unauthorized(self):
         """Test cuando el usuario no está autenticado"""
+        app.dependency_overrides.pop(get_current_principal)
+        
         # Realizar petición sin autenticación
         response = self.client.get(self.base_url)
         
         # Verificar respuesta
-        assert response.status_code == 422  # FastAPI validation error for missing dependency
+        assert response.status_code == 401
+        assert response.json()["detail"] == "Token de autorización requerido"
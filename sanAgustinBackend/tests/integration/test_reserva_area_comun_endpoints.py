@@ -2,12 +2,20 @@ import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, Mock
 from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
 
 from main import app
+from core.auth import get_current_user, get_current_principal
+from core.database import get_db, get_read_db
 from models.schemas.reserva_area_comun import ReservaAreaComunCreate, ReservaAreaComunResponse
 from models.database.departamento import Departamento
 from models.database.area_comun import AreaComun
 from models.database.reserva_area_comun import ReservaAreaComun
+from models.database import Base, Usuario
+from models.auth_schemas import Principal
+from repositories.reserva_archivo_repository import ReservaAreaComunArchivoRepository
 
 class TestReservaAreaComunEndpoints:
     """Tests de integración para endpoints de reservas de área común"""
@@ -18,18 +26,25 @@ class TestReservaAreaComunEndpoints:
         self.base_url = "/reservas-area-comun"
         self.fecha_inicio = datetime.now() + timedelta(days=1)
         self.fecha_fin = datetime.now() + timedelta(days=1, hours=2)
+        # Depends guarda la función original: se sustituyen con dependency_overrides, no con patch
+        self.mock_user = Mock()
+        self.mock_user.id = 1
+        self.mock_db = Mock()
+        app.dependency_overrides[get_current_user] = lambda: self.mock_user
+        app.dependency_overrides[get_current_principal] = lambda: self.mock_user
+        app.dependency_overrides[get_db] = lambda: self.mock_db
+        app.dependency_overrides[get_read_db] = lambda: self.mock_db
     
-    @patch('services.endpoints.reserva_area_comun_endpoints.get_db')
-    def test_get_areas_comunes_success(self, mock_get_db, sample_area_comun):
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+    
+    def test_get_areas_comunes_success(self, sample_area_comun):
         """Test exitoso para obtener áreas comunes"""
-        # Configurar mocks
-        mock_db = Mock()
-        mock_get_db.return_value = mock_db
-        
         # Mock del servicio
-        with patch('services.endpoints.reserva_area_comun_endpoints.AreaComunService') as mock_service_class:
+        with patch('services.endpoints.area_comun_endpoints.AreaComunService') as mock_service_class:
             mock_service = Mock()
             mock_service_class.return_value = mock_service
+            mock_service.get_etag.return_value = 'W/"areas-comunes-1"'
             
             # Crear respuesta esperada
             expected_response = [sample_area_comun]
@@ -46,15 +61,10 @@ class TestReservaAreaComunEndpoints:
             assert data[0]["nombre"] == sample_area_comun.nombre
             
             # Verificar que se llamó el servicio
-            mock_service.get_all_areas_comunes.assert_called_once_with(mock_db)
+            mock_service.get_all_areas_comunes.assert_called_once_with(self.mock_db)
     
-    @patch('services.endpoints.reserva_area_comun_endpoints.get_db')
-    def test_check_availability_success(self, mock_get_db, sample_area_comun):
+    def test_check_availability_success(self, sample_area_comun):
         """Test exitoso para verificar disponibilidad"""
-        # Configurar mocks
-        mock_db = Mock()
-        mock_get_db.return_value = mock_db
-        
         # Mock del servicio
         with patch('services.endpoints.reserva_area_comun_endpoints.ReservaAreaComunService') as mock_service_class:
             mock_service = Mock()
@@ -85,22 +95,11 @@ class TestReservaAreaComunEndpoints:
             
             # Verificar que se llamó el servicio
             mock_service.check_availability.assert_called_once_with(
-                mock_db, sample_area_comun.id, self.fecha_inicio, self.fecha_fin
+                self.mock_db, sample_area_comun.id, self.fecha_inicio, self.fecha_fin
             )
     
-    @patch('services.endpoints.reserva_area_comun_endpoints.get_current_user')
-    @patch('services.endpoints.reserva_area_comun_endpoints.get_db')
-    def test_create_reserva_success(self, mock_get_db, mock_get_current_user,
-                                  sample_departamento, sample_area_comun):
+    def test_create_reserva_success(self, sample_departamento, sample_area_comun):
         """Test exitoso para crear reserva de área común"""
-        # Configurar mocks
-        mock_user = Mock()
-        mock_user.id = 1
-        mock_get_current_user.return_value = mock_user
-        
-        mock_db = Mock()
-        mock_get_db.return_value = mock_db
-        
         # Mock del servicio
         with patch('services.endpoints.reserva_area_comun_endpoints.ReservaAreaComunService') as mock_service_class:
             mock_service = Mock()
@@ -114,7 +113,7 @@ class TestReservaAreaComunEndpoints:
                 periodo_inicio=self.fecha_inicio,
                 periodo_fin=self.fecha_fin,
                 estado="activa",
-                area_comun=sample_area_comun.__dict__
+                area_comun={"id": sample_area_comun.id, "nombre": sample_area_comun.nombre}
             )
             mock_service.create_reserva.return_value = expected_reserva
             
@@ -139,19 +138,8 @@ class TestReservaAreaComunEndpoints:
             # Verificar que se llamó el servicio
             mock_service.create_reserva.assert_called_once()
     
-    @patch('services.endpoints.reserva_area_comun_endpoints.get_current_user')
-    @patch('services.endpoints.reserva_area_comun_endpoints.get_db')
-    def test_create_reserva_with_adeudos(self, mock_get_db, mock_get_current_user,
-                                       sample_departamento):
+    def test_create_reserva_with_adeudos(self, sample_departamento):
         """Test cuando el usuario tiene adeudos pendientes"""
-        # Configurar mocks
-        mock_user = Mock()
-        mock_user.id = 1
-        mock_get_current_user.return_value = mock_user
-        
-        mock_db = Mock()
-        mock_get_db.return_value = mock_db
-        
         # Mock del servicio que lanza excepción
         with patch('services.endpoints.reserva_area_comun_endpoints.ReservaAreaComunService') as mock_service_class:
             mock_service = Mock()
@@ -178,19 +166,8 @@ class TestReservaAreaComunEndpoints:
             data = response.json()
             assert "No puede realizar reservas mientras tenga adeudos pendientes" in data["detail"]
     
-    @patch('services.endpoints.reserva_area_comun_endpoints.get_current_user')
-    @patch('services.endpoints.reserva_area_comun_endpoints.get_db')
-    def test_create_reserva_not_available(self, mock_get_db, mock_get_current_user,
-                                        sample_departamento):
+    def test_create_reserva_not_available(self, sample_departamento):
         """Test cuando el área común no está disponible"""
-        # Configurar mocks
-        mock_user = Mock()
-        mock_user.id = 1
-        mock_get_current_user.return_value = mock_user
-        
-        mock_db = Mock()
-        mock_get_db.return_value = mock_db
-        
         # Mock del servicio que lanza excepción
         with patch('services.endpoints.reserva_area_comun_endpoints.ReservaAreaComunService') as mock_service_class:
             mock_service = Mock()
@@ -217,23 +194,13 @@ class TestReservaAreaComunEndpoints:
             data = response.json()
             assert "El área común no está disponible en el periodo solicitado" in data["detail"]
     
-    @patch('services.endpoints.reserva_area_comun_endpoints.get_current_user')
-    @patch('services.endpoints.reserva_area_comun_endpoints.get_db')
-    def test_get_user_reservas_success(self, mock_get_db, mock_get_current_user,
-                                     sample_departamento):
+    def test_get_user_reservas_success(self, sample_departamento):
         """Test exitoso para obtener reservas del usuario"""
-        # Configurar mocks
-        mock_user = Mock()
-        mock_user.id = 1
-        mock_get_current_user.return_value = mock_user
-        
-        mock_db = Mock()
-        mock_get_db.return_value = mock_db
-        
         # Mock del servicio
         with patch('services.endpoints.reserva_area_comun_endpoints.ReservaAreaComunService') as mock_service_class:
             mock_service = Mock()
             mock_service_class.return_value = mock_service
+            mock_service.get_user_reservas_etag.return_value = None
             
             # Crear reservas esperadas
             reserva1 = ReservaAreaComunResponse(
@@ -270,7 +237,7 @@ class TestReservaAreaComunEndpoints:
             assert data[1]["estado"] == "activa"
             
             # Verificar que se llamó el servicio
-            mock_service.get_user_reservas.assert_called_once_with(mock_db, mock_user.id)
+            mock_service.get_user_reservas.assert_called_once_with(self.mock_db, self.mock_user.id, False)
     
     def test_create_reserva_unauthorized(self):
         """Test cuando el usuario no está autenticado"""
@@ -281,16 +248,102 @@ class TestReservaAreaComunEndpoints:
             "periodo_fin": self.fecha_fin.isoformat()
         }
         
+        app.dependency_overrides.pop(get_current_user)
+        
         # Realizar petición sin autenticación
         response = self.client.post(f"{self.base_url}/", json=reserva_data)
         
         # Verificar respuesta
-        assert response.status_code == 422  # FastAPI validation error for missing dependency
+        assert response.status_code == 401
     
     def test_get_user_reservas_unauthorized(self):
         """Test cuando el usuario no está autenticado"""
+        app.dependency_overrides.pop(get_current_principal)
+        
         # Realizar petición sin autenticación
         response = self.client.get(f"{self.base_url}/usuario")
         
         # Verificar respuesta
-        assert response.status_code == 422  # FastAPI validation error for missing dependency
+        assert response.status_code == 401
+
+class TestReservasUsuarioEndpoint:
+    """Tests de integración del listado de reservas del usuario sobre una base SQLite en memoria"""
+    
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.Session = sessionmaker(bind=self.engine, autoflush=False)
+        self.client = TestClient(app)
+        self.url = "/reservas-area-comun/usuario"
+        inicio = datetime(2024, 3, 1, 10, 0)
+        
+        with self.Session() as db:
+            usuario = Usuario(email="residente@example.com", nombre="Residente", apellido="Prueba", provider="google", provider_id="g-1")
+            area = AreaComun(nombre="Palapa", descripcion="Asadores", ubicacion="Planta baja", capacidad=1)
+            db.add_all([usuario, area])
+            db.flush()
+            departamento = Departamento(numero="01", usuario_id=usuario.id)
+            db.add(departamento)
+            db.flush()
+            db.add_all([
+                ReservaAreaComun(area_comun_id=area.id, departamento_id=departamento.id, periodo_inicio=inicio, periodo_fin=inicio + timedelta(hours=2), estado="completada"),
+                ReservaAreaComun(area_comun_id=area.id, departamento_id=departamento.id, periodo_inicio=datetime(2030, 1, 1, 10), periodo_fin=datetime(2030, 1, 1, 12), estado="activa"),
+            ])
+            db.commit()
+            ReservaAreaComunArchivoRepository().archive_older_than(db, datetime(2025, 1, 1))
+            self.principal = Principal(id=usuario.id, email=usuario.email, is_admin=False, departamento_id=departamento.id)
+        
+        def get_db_prueba():
+            with self.Session() as db:
+                yield db
+        
+        app.dependency_overrides[get_read_db] = get_db_prueba
+        app.dependency_overrides[get_current_principal] = lambda: self.principal
+    
+    def teardown_method(self):
+        app.dependency_overrides.clear()
+        self.engine.dispose()
+    
+    def test_get_user_reservas_vigentes(self):
+        """Test que el listado serializa las reservas vivas con su área común"""
+        response = self.client.get(self.url)
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 1
+        assert data[0]["estado"] == "activa"
+        assert data[0]["area_comun"]["nombre"] == "Palapa"
+    
+    def test_get_user_reservas_include_archived(self):
+        """Test que con include_archived se agregan las reservas del archivo"""
+        response = self.client.get(self.url, params={"include_archived": True})
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert sorted(reserva["estado"] for reserva in data) == ["activa", "completada"]
+        assert all(reserva["area_comun"]["nombre"] == "Palapa" for reserva in data)
+    
+    def test_get_user_reservas_etag(self):
+        """Test que el listado responde 304 con el mismo ETag y uno nuevo cuando cambian las reservas"""
+        primera = self.client.get(self.url)
+        etag = primera.headers["ETag"]
+        
+        no_modificada = self.client.get(self.url, headers={"If-None-Match": etag})
+        assert no_modificada.status_code == 304
+        assert no_modificada.headers["ETag"] == etag
+        
+        # Cancelar una reserva cambia la versión del listado
+        with self.Session() as db:
+            reserva = db.query(ReservaAreaComun).filter(ReservaAreaComun.estado == "activa").one()
+            reserva.estado = "cancelada"
+            db.commit()
+        
+        modificada = self.client.get(self.url, headers={"If-None-Match": etag})
+        assert modificada.status_code == 200
+        assert modificada.headers["ETag"] != etag
+        assert modificada.json()[0]["estado"] == "cancelada"
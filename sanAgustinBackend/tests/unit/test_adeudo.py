@@ -0,0 +1,27 @@
+import pytest
+
+import models.database  # Registra todos los mappers: Adeudo -> Departamento -> Usuario
+from models.database.adeudo import Adeudo, to_centavos
+
+class TestMontoCentavos:
+    """Tests unitarios para el manejo de montos en centavos"""
+
+    def test_to_centavos_redondeo(self):
+        """Test que convierte a centavos sin errores de punto flotante"""
+        assert to_centavos(0.1) == 10
+        assert to_centavos(19.99) == 1999
+        assert to_centavos(1500.005) == 150001
+        assert to_centavos(0) == 0
+
+    def test_monto_en_pesos(self):
+        """Test que el monto en pesos se guarda y se lee en centavos"""
+        adeudo = Adeudo(monto=1500.5)
+
+        assert adeudo.monto_centavos == 150050
+        assert adeudo.monto == 1500.5
+
+    def test_suma_exacta(self):
+        """Test que sumar centavos no acumula error"""
+        adeudos = [Adeudo(monto=0.1), Adeudo(monto=0.2)]
+
+        assert sum(adeudo.monto_centavos for adeudo in adeudos) / 100 == 0.3
@@ -0,0 +1,154 @@
+import pytest
+import time
+from unittest.mock import Mock, patch
+from fastapi import HTTPException
+from datetime import datetime
+
+from api.auth_routes import get_current_admin_user
+from core.auth import get_current_user, token_cache
+from models.auth_schemas import User
+from models.database.usuario import Usuario
+from models.database.departamento import Departamento
+
+class TestGetCurrentUser:
+    """Tests unitarios para la dependency get_current_user"""
+
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        token_cache.clear()
+        self.mock_db = Mock()
+        self.usuario = Usuario(
+            id=1,
+            email="test@example.com",
+            nombre="Test",
+            apellido="User",
+            provider="google",
+            is_active=True,
+            is_admin=False,
+            token_version=0,
+            created_at=datetime(2024, 1, 1)
+        )
+        self.usuario.departamento = Departamento(id=7, numero="07")
+        self.payload = {"sub": "test@example.com", "uid": 1, "ver": 0, "exp": time.time() + 60}
+
+    def teardown_method(self):
+        token_cache.clear()
+
+    @patch('core.auth.AuthService')
+    def test_carga_usuario_con_departamento(self, mock_auth_service_class):
+        """Test que el usuario y su departamento salen de una sola consulta"""
+        auth_service = mock_auth_service_class.return_value
+        auth_service.verify_token.return_value = self.payload
+        auth_service.get_user_with_departamento.return_value = self.usuario
+
+        usuario = get_current_user("Bearer token", self.mock_db)
+
+        assert usuario.id == 1
+        assert usuario.departamento_id == 7
+        auth_service.get_user_with_departamento.assert_called_once_with("test@example.com")
+        auth_service.get_departamento_id.assert_not_called()
+
+    @patch('core.auth.AuthService')
+    def test_usa_cache_en_la_segunda_llamada(self, mock_auth_service_class):
+        """Test que el mismo token no vuelve a consultar la base"""
+        auth_service = mock_auth_service_class.return_value
+        auth_service.verify_token.return_value = self.payload
+        auth_service.get_user_with_departamento.return_value = self.usuario
+
+        primero = get_current_user("Bearer token", self.mock_db)
+        segundo = get_current_user("Bearer token", self.mock_db)
+
+        assert segundo == primero
+        assert auth_service.get_user_with_departamento.call_count == 1
+
+    @patch('core.auth.AuthService')
+    def test_token_revocado(self, mock_auth_service_class):
+        """Test que un token con versión anterior se rechaza"""
+        auth_service = mock_auth_service_class.return_value
+        auth_service.verify_token.return_value = self.payload
+        self.usuario.token_version = 1
+        auth_service.get_user_with_departamento.return_value = self.usuario
+
+        with pytest.raises(HTTPException) as exc_info:
+            get_current_user("Bearer token", self.mock_db)
+
+        assert exc_info.value.status_code == 401
+
+    @patch('core.auth.AuthService')
+    def test_usuario_no_encontrado(self, mock_auth_service_class):
+        """Test con usuario inexistente"""
+        auth_service = mock_auth_service_class.return_value
+        auth_service.verify_token.return_value = self.payload
+        auth_service.get_user_with_departamento.return_value = None
+
+        with pytest.raises(HTTPException) as exc_info:
+            get_current_user("Bearer token", self.mock_db)
+
+        assert exc_info.value.status_code == 404
+
+    def test_sin_token(self):
+        """Test sin encabezado de autorización"""
+        with pytest.raises(HTTPException) as exc_info:
+            get_current_user(None, self.mock_db)
+
+        assert exc_info.value.status_code == 401
+
+class TestGetCurrentAdminUser:
+    """Tests unitarios para la dependency get_current_admin_user"""
+
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        token_cache.clear()
+        self.mock_db = Mock()
+        self.admin = User(
+            id=1,
+            email="admin@example.com",
+            nombre="Admin",
+            apellido="User",
+            provider="manual",
+            is_active=True,
+            is_admin=True,
+            created_at=datetime(2024, 1, 1)
+        )
+        self.payload = {"sub": "admin@example.com", "uid": 1, "ver": 0, "exp": time.time() + 60}
+
+    def teardown_method(self):
+        token_cache.clear()
+
+    @patch('core.auth.AuthService')
+    def test_admin_con_token_vigente(self, mock_auth_service_class):
+        """Test que un admin con la versión de token actual pasa"""
+        auth_service = mock_auth_service_class.return_value
+        auth_service.verify_token.return_value = self.payload
+        auth_service.get_token_version.return_value = 0
+
+        assert get_current_admin_user("Bearer token", self.admin, self.mock_db) is self.admin
+        auth_service.get_token_version.assert_called_once_with(1)
+
+    @patch('core.auth.AuthService')
+    def test_admin_revocado_en_otro_worker(self, mock_auth_service_class):
+        """Test que un admin cacheado se rechaza si su token se revocó en otro proceso"""
+        auth_service = mock_auth_service_class.return_value
+        auth_service.verify_token.return_value = self.payload
+        auth_service.get_token_version.return_value = 1
+        token_cache.set(b"clave", self.admin)
+
+        with pytest.raises(HTTPException) as exc_info:
+            get_current_admin_user("Bearer token", self.admin, self.mock_db)
+
+        assert exc_info.value.status_code == 401
+        # La copia cacheada de este proceso también se descarta
+        assert token_cache.get(b"clave") is None
+
+    @patch('core.auth.AuthService')
+    def test_usuario_sin_permisos(self, mock_auth_service_class):
+        """Test que un usuario que no es admin recibe 403"""
+        auth_service = mock_auth_service_class.return_value
+        auth_service.verify_token.return_value = self.payload
+        auth_service.get_token_version.return_value = 0
+        usuario = self.admin.model_copy(update={"is_admin": False})
+
+        with pytest.raises(HTTPException) as exc_info:
+            get_current_admin_user("Bearer token", usuario, self.mock_db)
+
+        assert exc_info.value.status_code == 403
@@ -0,0 +1,40 @@
+import pytest
+
+from caching.etag import make_etag, etag_matches
+from models.database.version_recurso import resources_for_rows, PANEL, AREAS_COMUNES, RESERVAS_VISITA
+from models.database.adeudo import Adeudo
+from models.database.area_comun import AreaComun
+from models.database.reserva_visita import ReservaVisita
+from models.database.saldo_departamento import SaldoDepartamento
+
+class TestEtag:
+    """Tests unitarios para las respuestas condicionales"""
+
+    def test_make_etag_debil(self):
+        """Test que el ETag es débil y cambia con cualquier versión"""
+        assert make_etag("departamento", 1, 3) == 'W/"departamento-1-3"'
+        assert make_etag("departamento", 1, 3) != make_etag("departamento", 1, 4)
+
+    def test_etag_matches(self):
+        """Test de la comparación débil de If-None-Match"""
+        etag = make_etag("areas_comunes", 2)
+
+        assert etag_matches(etag, etag)
+        assert etag_matches('"areas_comunes-2"', etag)
+        assert etag_matches('W/"otro", W/"areas_comunes-2"', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches(None, etag)
+        assert not etag_matches('W/"areas_comunes-1"', etag)
+
+class TestResourcesForRows:
+    """Tests unitarios para el mapeo de tablas a recursos versionados"""
+
+    def test_por_departamento(self):
+        """Test que las tablas de un departamento versionan cada departamento afectado"""
+        assert resources_for_rows(Adeudo, [1, 2, None]) == {(PANEL, 1), (PANEL, 2)}
+        assert resources_for_rows(ReservaVisita, [5]) == {(RESERVAS_VISITA, 5)}
+
+    def test_catalogo_y_tablas_sin_version(self):
+        """Test que los catálogos tienen una sola versión y otras tablas no versionan"""
+        assert resources_for_rows(AreaComun, []) == {(AREAS_COMUNES, 0)}
+        assert resources_for_rows(SaldoDepartamento, [1]) == set()
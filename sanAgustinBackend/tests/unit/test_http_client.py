@@ -0,0 +1,69 @@
+import asyncio
+import httpx
+import pytest
+from authlib.integrations.httpx_client import AsyncOAuth2Client
+
+from networking import http_client
+from networking.http_client import SharedTransport, start_http_client, stop_http_client, get_http_client
+
+class StubProvider:
+    """Proveedor OAuth falso: responde en memoria y cuenta las peticiones"""
+
+    def __init__(self):
+        self.peticiones = []
+        self.transport = httpx.MockTransport(self.handler)
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.peticiones.append(request)
+        if request.url.path == "/oauth/access_token":
+            return httpx.Response(200, json={"access_token": "abc", "token_type": "bearer"})
+        if request.url.path == "/me":
+            return httpx.Response(200, json={"id": "10", "name": "Ana López", "email": "ana@test.com"})
+        return httpx.Response(404)
+
+class TestSharedHttpClient:
+    """Tests unitarios del cliente HTTP compartido contra un proveedor falso"""
+
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        self.proveedor = StubProvider()
+
+    def teardown_method(self):
+        asyncio.run(stop_http_client())
+
+    def test_cliente_de_la_app(self):
+        """Test que el cliente de la app usa el pool compartido y es siempre el mismo"""
+        async def llamar():
+            cliente = start_http_client(self.proveedor.transport)
+            resp = await cliente.get("https://graph.facebook.com/me", params={"fields": "id,name,email"})
+            return cliente, resp.json()
+
+        cliente, datos = asyncio.run(llamar())
+
+        assert datos["email"] == "ana@test.com"
+        assert get_http_client() is cliente
+        assert self.proveedor.peticiones[0].url.params["fields"] == "id,name,email"
+
+    def test_cliente_de_authlib_no_cierra_el_pool(self):
+        """Test que cerrar un cliente por login (como hace authlib) no cierra el pool compartido"""
+        async def login():
+            start_http_client(self.proveedor.transport)
+            async with AsyncOAuth2Client("id", "secreto", transport=http_client.shared_transport) as cliente:
+                token = await cliente.fetch_token("https://graph.facebook.com/oauth/access_token", code="xyz")
+            resp = await get_http_client().get("https://graph.facebook.com/me")
+            return token, resp.status_code
+
+        token, status = asyncio.run(login())
+
+        assert token["access_token"] == "abc"
+        assert status == 200
+        assert http_client.shared_transport.abierto
+        assert len(self.proveedor.peticiones) == 2
+
+    def test_stop_cierra_el_pool(self):
+        """Test que el lifespan cierra el pool y el cliente"""
+        start_http_client(self.proveedor.transport)
+        asyncio.run(stop_http_client())
+
+        assert not http_client.shared_transport.abierto
+        assert http_client._http_client is None
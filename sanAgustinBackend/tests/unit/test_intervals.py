@@ -0,0 +1,212 @@
+import pytest
+import threading
+from unittest.mock import Mock
+from datetime import datetime, timedelta
+
+from scheduling.intervals import (
+    IntervalIndex, IntervalIndexRegistry, merge_intervals, clip_intervals, peak_occupancy, saturated_intervals, free_gaps, fit_slack
+)
+
+BASE = datetime(2025, 1, 1, 8, 0)
+
+def h(horas):
+    return BASE + timedelta(hours=horas)
+
+class TestIntervalIndex:
+    """Tests unitarios para el índice de intervalos en memoria"""
+
+    def test_overlapping(self):
+        """Test que solo regresa los intervalos traslapados"""
+        indice = IntervalIndex([(h(0), h(2), 1), (h(3), h(4), 2), (h(6), h(8), 3)])
+
+        assert [i[2] for i in indice.overlapping(h(1), h(3.5))] == [1, 2]
+        assert indice.count_overlapping(h(4), h(6)) == 0
+        assert indice.count_overlapping(h(7), h(9)) == 1
+
+    def test_bordes_no_se_traslapan(self):
+        """Test que intervalos contiguos no cuentan como traslape"""
+        indice = IntervalIndex([(h(2), h(4), 1)])
+
+        assert indice.count_overlapping(h(0), h(2)) == 0
+        assert indice.count_overlapping(h(4), h(5)) == 0
+        assert indice.count_overlapping(h(3), h(3.5)) == 1
+
+    def test_intervalo_largo_antes_de_la_ventana(self):
+        """Test que un intervalo largo que inicia mucho antes se detecta"""
+        indice = IntervalIndex([(h(0), h(48), 1), (h(10), h(11), 2)])
+
+        assert [i[2] for i in indice.overlapping(h(30), h(31))] == [1]
+
+    def test_add_y_remove(self):
+        """Test de alta, reemplazo y baja de intervalos"""
+        indice = IntervalIndex()
+        indice.add(h(0), h(1), 1)
+        indice.add(h(0), h(2), 1)  # Mismo id reemplaza al anterior
+
+        assert len(indice) == 1
+        assert indice.count_overlapping(h(1.5), h(3)) == 1
+        assert indice.remove(1) is True
+        assert indice.remove(1) is False
+        assert len(indice) == 0
+
+class TestIntervalIndexRegistry:
+    """Tests unitarios para el registro de índices por recurso"""
+
+    def test_carga_perezosa_una_vez(self):
+        """Test que el loader solo se llama la primera vez"""
+        registry = IntervalIndexRegistry()
+        loader = Mock(return_value=IntervalIndex([(h(0), h(1), 1)]))
+
+        registry.get(1, loader)
+        indice = registry.get(1, loader)
+
+        loader.assert_called_once()
+        assert len(indice) == 1
+
+    def test_add_ignora_indices_no_cargados(self):
+        """Test que add no crea índices; se cargan desde la base de datos"""
+        registry = IntervalIndexRegistry()
+        registry.add(1, h(0), h(1), 1)
+
+        indice = registry.get(1, IntervalIndex)
+        assert len(indice) == 0
+
+        registry.add(1, h(0), h(1), 1)
+        registry.remove(1, 1)
+        registry.add(1, h(2), h(3), 2)
+        assert [i[2] for i in indice.overlapping(h(0), h(4))] == [2]
+
+    def test_carga_sin_bloquear_otros_recursos(self):
+        """Test que mientras se carga un recurso se puede obtener otro ya cargado"""
+        registry = IntervalIndexRegistry()
+        registry.get(2, IntervalIndex)
+        resultado = []
+
+        def loader():
+            # Se ejecuta sin el lock del registro: otro hilo no queda bloqueado
+            hilo = threading.Thread(target=lambda: resultado.append(registry.get(2, IntervalIndex)))
+            hilo.start()
+            hilo.join(timeout=1)
+            return IntervalIndex()
+
+        registry.get(1, loader)
+
+        assert len(resultado) == 1
+
+    def test_cambio_durante_carga_no_se_publica(self):
+        """Test que una carga que pudo perder un alta concurrente no queda en el registro"""
+        registry = IntervalIndexRegistry()
+
+        def loader():
+            registry.add(1, h(0), h(1), 1)
+            return IntervalIndex()
+
+        registry.get(1, loader)
+        indice = registry.get(1, lambda: IntervalIndex([(h(0), h(1), 1)]))
+
+        assert len(indice) == 1
+
+    def test_ttl_recarga(self):
+        """Test que un índice expirado se vuelve a cargar"""
+        registry = IntervalIndexRegistry(ttl_segundos=0)
+        loader = Mock(side_effect=IntervalIndex)
+
+        registry.get(1, loader)
+        registry.get(1, loader)
+
+        assert loader.call_count == 2
+
+    def test_invalidate(self):
+        """Test de invalidación de un recurso"""
+        registry = IntervalIndexRegistry()
+        loader = Mock(side_effect=IntervalIndex)
+
+        registry.get(1, loader)
+        registry.invalidate(1)
+        registry.get(1, loader)
+
+        assert loader.call_count == 2
+
+class TestMergeIntervals:
+    """Tests unitarios para la unión y recorte de intervalos"""
+
+    def test_merge_traslapados_y_contiguos(self):
+        """Test que une traslapes y contiguos pero respeta huecos"""
+        unidos = merge_intervals([(h(3), h(4)), (h(0), h(2)), (h(1), h(3)), (h(5), h(6))])
+
+        assert unidos == [(h(0), h(4)), (h(5), h(6))]
+
+    def test_merge_contenido(self):
+        """Test que un intervalo contenido en otro no lo recorta"""
+        assert merge_intervals([(h(0), h(10)), (h(2), h(3))]) == [(h(0), h(10))]
+
+    def test_clip(self):
+        """Test que recorta a la ventana y descarta lo que queda fuera"""
+        recortados = clip_intervals([(h(0), h(2)), (h(3), h(5)), (h(6), h(7))], h(1), h(4))
+
+        assert recortados == [(h(1), h(2)), (h(3), h(4))]
+
+class TestOccupancy:
+    """Tests unitarios para el barrido de ocupación"""
+
+    def test_peak_occupancy(self):
+        """Test del pico de reservas simultáneas dentro de la ventana"""
+        intervalos = [(h(0), h(4)), (h(1), h(2)), (h(2), h(3)), (h(1.5), h(5))]
+
+        assert peak_occupancy(intervalos, h(0), h(5)) == 3
+        assert peak_occupancy(intervalos, h(3), h(5)) == 2
+        assert peak_occupancy(intervalos, h(6), h(7)) == 0
+
+    def test_peak_fin_e_inicio_simultaneos(self):
+        """Test que un fin y un inicio en el mismo momento no se suman"""
+        assert peak_occupancy([(h(0), h(1)), (h(1), h(2))], h(0), h(2)) == 1
+
+    def test_saturated_capacidad_uno(self):
+        """Test que con capacidad 1 se comporta como la unión de intervalos"""
+        intervalos = [(h(0), h(1)), (h(1), h(2)), (h(3), h(4))]
+
+        assert saturated_intervals(intervalos) == merge_intervals(intervalos)
+
+    def test_saturated_con_capacidad(self):
+        """Test que solo marca los periodos llenos"""
+        intervalos = [(h(0), h(4)), (h(1), h(2)), (h(3), h(5))]
+
+        assert saturated_intervals(intervalos, capacidad=2) == [(h(1), h(2)), (h(3), h(4))]
+        assert saturated_intervals(intervalos, capacidad=3) == []
+
+class TestFreeGaps:
+    """Tests unitarios para la búsqueda de huecos libres"""
+
+    def test_huecos_entre_reservas(self):
+        """Test que regresa solo los huecos con la duración suficiente"""
+        intervalos = [(h(1), h(2)), (h(2.5), h(4)), (h(6), h(7))]
+
+        huecos = free_gaps(intervalos, h(0), h(8), timedelta(hours=1))
+
+        assert huecos == [(h(0), h(1)), (h(4), h(6)), (h(7), h(8))]
+
+    def test_huecos_con_capacidad(self):
+        """Test que un recurso con lugares libres no tiene huecos cortados"""
+        intervalos = [(h(1), h(3)), (h(2), h(4))]
+
+        assert free_gaps(intervalos, h(0), h(5), timedelta(hours=1), capacidad=2) == [(h(0), h(2)), (h(3), h(5))]
+        assert free_gaps(intervalos, h(0), h(5), timedelta(hours=1), capacidad=3) == [(h(0), h(5))]
+
+    def test_reserva_que_inicia_antes_de_la_ventana(self):
+        """Test que una reserva en curso retrasa el primer hueco"""
+        assert free_gaps([(h(-2), h(1))], h(0), h(3), timedelta(hours=2)) == [(h(1), h(3))]
+
+class TestFitSlack:
+    """Tests unitarios para el sobrante de best-fit"""
+
+    def test_sobrante_del_hueco(self):
+        """Test que regresa el tiempo libre que queda en el hueco que contiene el periodo"""
+        intervalos = [(h(0), h(2)), (h(5), h(6))]
+
+        assert fit_slack(intervalos, h(2), h(4), h(0), h(8)) == timedelta(hours=1)
+        assert fit_slack(intervalos, h(6), h(7), h(0), h(8)) == timedelta(hours=1)
+
+    def test_no_cabe(self):
+        """Test que regresa None si el periodo se traslapa con un lugar lleno"""
+        assert fit_slack([(h(0), h(2))], h(1), h(3), h(0), h(8)) is None
+        assert fit_slack([(h(0), h(2))], h(1), h(3), h(0), h(8), capacidad=2) == timedelta(hours=6)
@@ -0,0 +1,96 @@
+import pytest
+import threading
+from unittest.mock import Mock
+from datetime import datetime, timedelta
+
+from services.mantenimiento_service import MantenimientoService, EstadoBarrido
+from scheduling.periodic import PeriodicTask
+
+class TestMantenimientoService:
+    """Tests unitarios para MantenimientoService"""
+    
+    def setup_method(self):
+        """Configuración para cada test"""
+        self.service = MantenimientoService()
+        self.service.reserva_area_comun_repo = Mock()
+        self.service.reserva_visita_repo = Mock()
+        self.service.archivo_area_comun_repo = Mock()
+        self.service.archivo_visita_repo = Mock()
+        self.service.estado = EstadoBarrido()
+        self.mock_db = Mock()
+        self.ahora = datetime(2025, 1, 1, 12, 0)
+    
+    def test_expire_reservas(self):
+        """Test que el barrido cuenta las reservas completadas de ambas tablas"""
+        self.service.reserva_area_comun_repo.expire_finished.return_value = [Mock(id=1, area_comun_id=1), Mock(id=2, area_comun_id=1)]
+        self.service.reserva_visita_repo.expire_finished.return_value = [Mock(id=1, lugar_visita_id=1), Mock(id=2, lugar_visita_id=1), Mock(id=3, lugar_visita_id=2)]
+        
+        result = self.service.expire_reservas(self.mock_db, self.ahora)
+        
+        self.service.reserva_area_comun_repo.expire_finished.assert_called_once_with(self.mock_db, self.ahora)
+        self.service.reserva_visita_repo.expire_finished.assert_called_once_with(self.mock_db, self.ahora)
+        assert result.reservas_area_comun == 2
+        assert result.reservas_visita == 3
+        assert result.ejecutado_en == self.ahora
+    
+    def test_estado_acumula_ejecuciones(self):
+        """Test que las estadísticas acumulan los totales de cada barrido"""
+        self.service.reserva_area_comun_repo.expire_finished.return_value = [Mock(id=1, area_comun_id=1)]
+        self.service.reserva_visita_repo.expire_finished.return_value = [Mock(id=1, lugar_visita_id=1)]
+        
+        self.service.expire_reservas(self.mock_db, self.ahora)
+        self.service.expire_reservas(self.mock_db, self.ahora)
+        estado = self.service.get_estado_barrido()
+        
+        assert estado.ejecuciones == 2
+        assert estado.total_reservas_area_comun == 2
+        assert estado.total_reservas_visita == 2
+        assert estado.ultimo_error is None
+    
+    def test_expire_reservas_error(self):
+        """Test que un error hace rollback y queda registrado"""
+        self.service.reserva_area_comun_repo.expire_finished.side_effect = RuntimeError("database is locked")
+        
+        with pytest.raises(RuntimeError):
+            self.service.expire_reservas(self.mock_db, self.ahora)
+        
+        self.mock_db.rollback.assert_called_once()
+        estado = self.service.get_estado_barrido()
+        assert estado.ejecuciones == 0
+        assert "database is locked" in estado.ultimo_error
+
+    def test_archive_reservas(self):
+        """Test que el archivo mueve las reservas anteriores al corte en lotes"""
+        self.service.archivo_area_comun_repo.archive_older_than.return_value = 4
+        self.service.archivo_visita_repo.archive_older_than.return_value = 0
+        
+        result = self.service.archive_reservas(self.mock_db, 365, lote=100, ahora=self.ahora)
+        
+        corte = self.ahora - timedelta(days=365)
+        self.service.archivo_area_comun_repo.archive_older_than.assert_called_once_with(self.mock_db, corte, 100)
+        self.service.archivo_visita_repo.archive_older_than.assert_called_once_with(self.mock_db, corte, 100)
+        assert result.antes_de == corte
+        assert result.reservas_area_comun == 4
+        assert self.service.get_estado_barrido().total_archivadas_area_comun == 4
+
+class TestPeriodicTask:
+    """Tests unitarios para las tareas periódicas"""
+    
+    def test_ejecuta_y_se_detiene(self):
+        """Test que la tarea corre al arrancar y se detiene con stop"""
+        ejecutada = threading.Event()
+        tarea = PeriodicTask("prueba", 60, ejecutada.set)
+        
+        tarea.start()
+        assert ejecutada.wait(1)
+        tarea.stop(timeout=1)
+        
+        assert not tarea.activa
+    
+    def test_intervalo_cero_desactiva(self):
+        """Test que un intervalo de cero no arranca el hilo"""
+        tarea = PeriodicTask("prueba", 0, Mock())
+        tarea.start()
+        
+        assert not tarea.activa
+        tarea.funcion.assert_not_called()
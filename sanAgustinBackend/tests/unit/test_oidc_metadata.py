@@ -0,0 +1,89 @@
+import asyncio
+import time
+import httpx
+import pytest
+from authlib.integrations.starlette_client import OAuth
+from joserfc import jwt
+from joserfc.jwk import RSAKey
+
+from networking.oidc_metadata import OIDCMetadataCache
+
+METADATA_URL = "https://proveedor.test/.well-known/openid-configuration"
+
+class StubOIDCProvider:
+    """Proveedor OpenID falso con su documento de descubrimiento y JWKS"""
+
+    def __init__(self):
+        self.llave = RSAKey.generate_key(2048, parameters={"kid": "k1"})
+        self.peticiones = []
+        self.caido = False
+        self.transport = httpx.MockTransport(self.handler)
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.peticiones.append(request.url.path)
+        if self.caido:
+            return httpx.Response(503)
+        if request.url.path == "/.well-known/openid-configuration":
+            return httpx.Response(200, json={
+                "issuer": "https://proveedor.test",
+                "jwks_uri": "https://proveedor.test/jwks",
+                "authorization_endpoint": "https://proveedor.test/auth",
+                "token_endpoint": "https://proveedor.test/token",
+            })
+        if request.url.path == "/jwks":
+            return httpx.Response(200, json={"keys": [self.llave.as_dict(private=False)]})
+        return httpx.Response(404)
+
+    def id_token(self, nonce: str) -> str:
+        ahora = int(time.time())
+        claims = {
+            "iss": "https://proveedor.test", "aud": "cliente", "sub": "123", "email": "ana@test.com",
+            "nonce": nonce, "iat": ahora, "exp": ahora + 300,
+        }
+        return jwt.encode({"alg": "RS256", "kid": "k1"}, claims, self.llave)
+
+class TestOIDCMetadataCache:
+    """Tests unitarios para la precarga del descubrimiento OpenID y JWKS"""
+
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        self.proveedor = StubOIDCProvider()
+        oauth = OAuth()
+        self.app = oauth.register(
+            name="proveedor", client_id="cliente", client_secret="secreto", server_metadata_url=METADATA_URL
+        )
+        self.cache = OIDCMetadataCache(self.app, METADATA_URL, transport=self.proveedor.transport)
+
+    def test_verifica_id_token_sin_red(self):
+        """Test que tras la precarga authlib verifica el ID token sin peticiones adicionales"""
+        assert self.cache.refresh() is True
+        peticiones = len(self.proveedor.peticiones)
+
+        userinfo = asyncio.run(self.app.parse_id_token(
+            {"id_token": self.proveedor.id_token("n1"), "access_token": "abc"}, nonce="n1"
+        ))
+
+        assert userinfo["email"] == "ana@test.com"
+        assert len(self.proveedor.peticiones) == peticiones == 2
+        assert self.cache.vigente
+
+    def test_conserva_la_ultima_copia_si_falla(self):
+        """Test que un refresco fallido no borra el JWKS anterior"""
+        self.cache.refresh()
+        jwks = self.app.server_metadata["jwks"]
+        self.proveedor.caido = True
+
+        assert self.cache.refresh() is False
+        assert self.app.server_metadata["jwks"] == jwks
+        assert self.cache.estado()["fallos"] == 1
+        assert self.cache.estado()["ultimo_error"]
+
+    def test_refresh_if_stale(self):
+        """Test que solo se descarga de nuevo cuando la copia caducó"""
+        self.cache.refresh()
+        assert self.cache.refresh_if_stale() is True
+        assert len(self.proveedor.peticiones) == 2
+
+        self.cache.ttl_segundos = 0
+        self.cache.refresh_if_stale()
+        assert len(self.proveedor.peticiones) == 4
@@ -3,11 +3,12 @@ from unittest.mock import Mock, patch
 from fastapi import HTTPException
 from datetime import datetime, timedelta
 
-from services.panel_residente_service import PanelResidenteService
+from services.panel_residente_service import PanelResidenteService, PanelCache
 from models.schemas.panel_residente import PanelResidenteResponse
 from models.database.departamento import Departamento
 from models.database.estacionamiento import Estacionamiento
 from models.database.adeudo import Adeudo
+from models.database.saldo_departamento import SaldoDepartamento
 
 class TestPanelResidenteService:
     """Tests unitarios para PanelResidenteService"""
@@ -15,38 +16,52 @@ class TestPanelResidenteService:
     def setup_method(self):
         """Configuración inicial para cada test"""
         self.service = PanelResidenteService()
+        self.service.departamento_repo = Mock()
+        self.service.version_repo = Mock()
+        self.service.cache = PanelCache()
         self.mock_db = Mock()
         self.usuario_id = 1
     
+    def test_get_etag(self):
+        """Test que el ETag combina el departamento y su versión"""
+        self.service.version_repo.get_departamento_versions.return_value = (7, 3)
+
+        assert self.service.get_etag(self.mock_db, self.usuario_id) == 'W/"departamento-7-3"'
+
+        self.service.version_repo.get_departamento_versions.return_value = None
+        assert self.service.get_etag(self.mock_db, self.usuario_id) is None
+    
     def test_get_panel_residente_success(self, sample_departamento, sample_estacionamiento, sample_adeudo):
         """Test exitoso para obtener panel de residente"""
         # Configurar mocks
-        self.service.departamento_repo.get_by_usuario_id.return_value = sample_departamento
-        self.service.estacionamiento_repo.get_by_departamento_id.return_value = sample_estacionamiento
-        self.service.adeudo_repo.get_pendientes_by_departamento_id.return_value = [sample_adeudo]
-        self.service.adeudo_repo.get_total_adeudos_by_departamento_id.return_value = 1500.0
+        saldo = SaldoDepartamento(departamento_id=sample_departamento.id, saldo_pendiente=1500.0, adeudos_pendientes=1)
+        
+        # Departamento, saldo, estacionamiento y adeudos llegan en una sola consulta
+        self.service.departamento_repo.get_panel_by_usuario_id.return_value = [
+            (sample_departamento, saldo, sample_estacionamiento, sample_adeudo)
+        ]
         
         # Ejecutar método
         result = self.service.get_panel_residente(self.mock_db, self.usuario_id)
         
         # Verificar llamadas
-        self.service.departamento_repo.get_by_usuario_id.assert_called_once_with(self.mock_db, self.usuario_id)
-        self.service.estacionamiento_repo.get_by_departamento_id.assert_called_once_with(self.mock_db, sample_departamento.id, es_visita=False)
-        self.service.adeudo_repo.get_pendientes_by_departamento_id.assert_called_once_with(self.mock_db, sample_departamento.id)
-        self.service.adeudo_repo.get_total_adeudos_by_departamento_id.assert_called_once_with(self.mock_db, sample_departamento.id)
+        self.service.departamento_repo.get_panel_by_usuario_id.assert_called_once_with(self.mock_db, self.usuario_id)
         
         # Verificar resultado
         assert isinstance(result, PanelResidenteResponse)
-        assert result.departamento == sample_departamento
-        assert result.estacionamiento == sample_estacionamiento
-        assert result.adeudos_pendientes == [sample_adeudo]
+        assert result.departamento.id == sample_departamento.id
+        assert result.departamento.numero == sample_departamento.numero
+        assert result.estacionamiento.id == sample_estacionamiento.id
+        assert result.estacionamiento.placa == sample_estacionamiento.placa
+        assert [adeudo.id for adeudo in result.adeudos_pendientes] == [sample_adeudo.id]
+        assert result.adeudos_pendientes[0].monto == 1500.0
         assert result.total_adeudos == 1500.0
         assert result.puede_reservar == False  # Tiene adeudos
     
     def test_get_panel_residente_no_departamento(self):
         """Test cuando el usuario no tiene departamento asociado"""
         # Configurar mock para retornar None
-        self.service.departamento_repo.get_by_usuario_id.return_value = None
+        self.service.departamento_repo.get_panel_by_usuario_id.return_value = []
         
         # Verificar que se lanza la excepción correcta
         with pytest.raises(HTTPException) as exc_info:
@@ -58,10 +73,7 @@ class TestPanelResidenteService:
     def test_get_panel_residente_no_estacionamiento(self, sample_departamento):
         """Test cuando el departamento no tiene estacionamiento"""
         # Configurar mocks
-        self.service.departamento_repo.get_by_usuario_id.return_value = sample_departamento
-        self.service.estacionamiento_repo.get_by_departamento_id.return_value = None
-        self.service.adeudo_repo.get_pendientes_by_departamento_id.return_value = []
-        self.service.adeudo_repo.get_total_adeudos_by_departamento_id.return_value = 0.0
+        self.service.departamento_repo.get_panel_by_usuario_id.return_value = [(sample_departamento, None, None, None)]
         
         # Ejecutar método
         result = self.service.get_panel_residente(self.mock_db, self.usuario_id)
@@ -73,10 +85,7 @@ class TestPanelResidenteService:
     def test_get_panel_residente_no_adeudos(self, sample_departamento, sample_estacionamiento):
         """Test cuando el departamento no tiene adeudos pendientes"""
         # Configurar mocks
-        self.service.departamento_repo.get_by_usuario_id.return_value = sample_departamento
-        self.service.estacionamiento_repo.get_by_departamento_id.return_value = sample_estacionamiento
-        self.service.adeudo_repo.get_pendientes_by_departamento_id.return_value = []
-        self.service.adeudo_repo.get_total_adeudos_by_departamento_id.return_value = 0.0
+        self.service.departamento_repo.get_panel_by_usuario_id.return_value = [(sample_departamento, None, sample_estacionamiento, None)]
         
         # Ejecutar método
         result = self.service.get_panel_residente(self.mock_db, self.usuario_id)
@@ -94,11 +103,13 @@ class TestPanelResidenteService:
         adeudo2 = Adeudo(id=2, departamento_id=sample_departamento.id, monto=500.0, descripcion="Adeudo 2", 
                         fecha_vencimiento=datetime.now(), fecha_creacion=datetime.now(), pagado=False)
         
+        saldo = SaldoDepartamento(departamento_id=sample_departamento.id, saldo_pendiente=1500.0, adeudos_pendientes=2)
+        
         # Configurar mocks
-        self.service.departamento_repo.get_by_usuario_id.return_value = sample_departamento
-        self.service.estacionamiento_repo.get_by_departamento_id.return_value = sample_estacionamiento
-        self.service.adeudo_repo.get_pendientes_by_departamento_id.return_value = [adeudo1, adeudo2]
-        self.service.adeudo_repo.get_total_adeudos_by_departamento_id.return_value = 1500.0
+        self.service.departamento_repo.get_panel_by_usuario_id.return_value = [
+            (sample_departamento, saldo, sample_estacionamiento, adeudo1),
+            (sample_departamento, saldo, sample_estacionamiento, adeudo2)
+        ]
         
         # Ejecutar método
         result = self.service.get_panel_residente(self.mock_db, self.usuario_id)
@@ -107,3 +118,52 @@ class TestPanelResidenteService:
         assert len(result.adeudos_pendientes) == 2
         assert result.total_adeudos == 1500.0
         assert result.puede_reservar == False
+    
+    def test_get_panel_residente_cache(self, sample_departamento, sample_estacionamiento):
+        """Test que la segunda lectura sale de la caché hasta que cambia el departamento"""
+        self.service.departamento_repo.get_panel_by_usuario_id.return_value = [(sample_departamento, None, sample_estacionamiento, None)]
+        etag = 'W/"departamento-1-1"'
+        
+        primero = self.service.get_panel_residente(self.mock_db, self.usuario_id, etag)
+        segundo = self.service.get_panel_residente(self.mock_db, self.usuario_id, etag)
+        
+        assert segundo is primero
+        self.service.departamento_repo.get_panel_by_usuario_id.assert_called_once()
+        
+        # Un cambio en el departamento invalida el panel de su usuario
+        self.service.cache.invalidate_departamentos([sample_departamento.id])
+        self.service.get_panel_residente(self.mock_db, self.usuario_id, etag)
+        
+        assert self.service.departamento_repo.get_panel_by_usuario_id.call_count == 2
+        assert self.service.cache.stats()["hits"] == 1
+    
+    def test_get_panel_residente_cache_otra_version(self, sample_departamento, sample_estacionamiento):
+        """Test que un panel cacheado con otra versión no se sirve (escritura en otro worker)"""
+        self.service.departamento_repo.get_panel_by_usuario_id.return_value = [(sample_departamento, None, sample_estacionamiento, None)]
+        
+        self.service.get_panel_residente(self.mock_db, self.usuario_id, 'W/"departamento-1-1"')
+        self.service.get_panel_residente(self.mock_db, self.usuario_id, 'W/"departamento-1-2"')
+        
+        assert self.service.departamento_repo.get_panel_by_usuario_id.call_count == 2
+        # Sin ETag no se lee ni se llena la caché
+        self.service.get_panel_residente(self.mock_db, self.usuario_id)
+        assert self.service.departamento_repo.get_panel_by_usuario_id.call_count == 3
+        assert self.service.cache.get_vigente(self.usuario_id, 'W/"departamento-1-2"') is not None
+
+    def test_cache_indice_departamentos_acotado(self):
+        """Test que el índice por departamento se limpia cuando la entrada sale de la caché"""
+        cache = PanelCache(maxsize=2)
+        paneles = [Mock(departamento=Mock(id=departamento_id)) for departamento_id in (10, 20, 30)]
+        
+        for usuario_id, panel in enumerate(paneles, start=1):
+            cache.set(usuario_id, panel, f'W/"departamento-{usuario_id}-1"')
+        
+        # El usuario 1 se desalojó por LRU y su departamento ya no está indexado
+        assert cache._usuario_por_departamento == {20: 2, 30: 3}
+        
+        cache.invalidate(2)
+        assert cache._usuario_por_departamento == {30: 3}
+        
+        # Un panel de otra versión se descarta junto con su índice
+        assert cache.get_vigente(3, 'W/"departamento-3-2"') is None
+        assert cache._usuario_por_departamento == {}
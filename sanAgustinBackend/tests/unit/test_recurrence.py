@@ -0,0 +1,29 @@
+import pytest
+from datetime import datetime, timedelta
+
+from scheduling.recurrence import expand_recurrence
+
+class TestExpandRecurrence:
+    """Tests unitarios para la expansión de reservas periódicas"""
+
+    def test_semanal(self):
+        """Test de una serie semanal de sábados"""
+        inicio = datetime(2025, 1, 4, 10, 0)
+        ocurrencias = expand_recurrence(inicio, inicio + timedelta(hours=2), "semanal", 12)
+
+        assert len(ocurrencias) == 12
+        assert ocurrencias[1] == (datetime(2025, 1, 11, 10, 0), datetime(2025, 1, 11, 12, 0))
+        assert all(o[0].weekday() == 5 for o in ocurrencias)
+
+    def test_diaria(self):
+        """Test de una serie diaria"""
+        inicio = datetime(2025, 1, 1, 7, 0)
+        ocurrencias = expand_recurrence(inicio, inicio + timedelta(hours=1), "diaria", 3)
+
+        assert [o[0].day for o in ocurrencias] == [1, 2, 3]
+
+    def test_duracion_mayor_a_la_frecuencia(self):
+        """Test que las ocurrencias no pueden traslaparse entre sí"""
+        inicio = datetime(2025, 1, 1)
+        with pytest.raises(ValueError):
+            expand_recurrence(inicio, inicio + timedelta(days=2), "diaria", 3)
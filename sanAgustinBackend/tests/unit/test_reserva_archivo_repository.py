@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models.database import Base, Departamento, AreaComun, ReservaAreaComun, ReservaAreaComunArchivo
+from repositories.reserva_archivo_repository import ReservaAreaComunArchivoRepository
+
+class TestReservaArchivoRepository:
+    """Tests del archivo de reservas sobre una base SQLite en memoria"""
+
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        Base.metadata.create_all(bind=self.engine)
+        self.Session = sessionmaker(bind=self.engine, autoflush=False)
+        self.repo = ReservaAreaComunArchivoRepository()
+        self.inicio = datetime(2024, 1, 5, 10, 0)
+
+        with self.Session() as db:
+            area = AreaComun(nombre="Palapa", descripcion="", ubicacion="", capacidad=1)
+            departamento = Departamento(numero="01")
+            db.add_all([area, departamento])
+            db.commit()
+            self.area_comun_id = area.id
+            self.departamento_id = departamento.id
+
+    def teardown_method(self):
+        self.engine.dispose()
+
+    def _crear_reserva(self, db, dias: int = 0) -> int:
+        reserva = ReservaAreaComun(
+            area_comun_id=self.area_comun_id,
+            departamento_id=self.departamento_id,
+            periodo_inicio=self.inicio + timedelta(days=dias),
+            periodo_fin=self.inicio + timedelta(days=dias, hours=2),
+            estado="completada"
+        )
+        db.add(reserva)
+        db.commit()
+        return reserva.id
+
+    def test_archive_older_than_mueve_en_lotes(self):
+        """Test que las reservas terminadas pasan al archivo conservando su id"""
+        with self.Session() as db:
+            ids = [self._crear_reserva(db, dias) for dias in range(3)]
+
+            total = self.repo.archive_older_than(db, datetime(2025, 1, 1), lote=2)
+
+            assert total == 3
+            assert db.query(ReservaAreaComun).count() == 0
+            assert sorted(archivo.id for archivo in db.query(ReservaAreaComunArchivo)) == ids
+
+    def test_archive_older_than_id_reutilizado(self):
+        """Test que un id reutilizado por SQLite se archiva sin chocar con la llave del archivo"""
+        with self.Session() as db:
+            primer_id = self._crear_reserva(db)
+            self.repo.archive_older_than(db, datetime(2025, 1, 1))
+
+            # Sin AUTOINCREMENT, SQLite vuelve a asignar el id borrado
+            segundo_id = self._crear_reserva(db, dias=1)
+            total = self.repo.archive_older_than(db, datetime(2025, 1, 1))
+
+            archivadas = db.query(ReservaAreaComunArchivo).order_by(ReservaAreaComunArchivo.archivo_id).all()
+            assert total == 1
+            assert segundo_id == primer_id
+            assert [archivo.id for archivo in archivadas] == [primer_id, primer_id]
+            assert archivadas[0].archivo_id != archivadas[1].archivo_id
+            assert archivadas[1].periodo_inicio == self.inicio + timedelta(days=1)
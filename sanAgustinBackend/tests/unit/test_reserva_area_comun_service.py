@@ -2,6 +2,7 @@ import pytest
 from unittest.mock import Mock, patch
 from fastapi import HTTPException
 from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
 
 from services.reserva_area_comun_service import ReservaAreaComunService
 from models.schemas.reserva_area_comun import ReservaAreaComunCreate, ReservaAreaComunResponse
@@ -9,6 +10,7 @@ from models.database.departamento import Departamento
 from models.database.area_comun import AreaComun
 from models.database.adeudo import Adeudo
 from models.database.reserva_area_comun import ReservaAreaComun
+from scheduling.intervals import IntervalIndex
 
 class TestReservaAreaComunService:
     """Tests unitarios para ReservaAreaComunService"""
@@ -16,6 +18,10 @@ class TestReservaAreaComunService:
     def setup_method(self):
         """Configuración inicial para cada test"""
         self.service = ReservaAreaComunService()
+        self.service.departamento_repo = Mock()
+        self.service.area_comun_repo = Mock()
+        self.service.reserva_repo = Mock()
+        self.service.saldo_repo = Mock()
         self.mock_db = Mock()
         self.usuario_id = 1
         self.area_comun_id = 1
@@ -24,16 +30,14 @@ class TestReservaAreaComunService:
     
     def test_check_availability_available(self, sample_area_comun):
         """Test para verificar disponibilidad cuando está disponible"""
-        # Configurar mock para retornar lista vacía (sin reservas existentes)
-        self.service.reserva_repo.check_availability.return_value = []
+        # Configurar mock para retornar un índice vacío (sin reservas existentes)
+        self.service.reserva_repo.get_index.return_value = IntervalIndex()
         
         # Ejecutar método
         result = self.service.check_availability(self.mock_db, self.area_comun_id, self.fecha_inicio, self.fecha_fin)
         
         # Verificar llamadas
-        self.service.reserva_repo.check_availability.assert_called_once_with(
-            self.mock_db, self.area_comun_id, self.fecha_inicio, self.fecha_fin
-        )
+        self.service.reserva_repo.get_index.assert_called_once_with(self.mock_db, self.area_comun_id)
         
         # Verificar resultado
         assert result["disponible"] == True
@@ -41,18 +45,8 @@ class TestReservaAreaComunService:
     
     def test_check_availability_not_available(self, sample_area_comun):
         """Test para verificar disponibilidad cuando no está disponible"""
-        # Crear reserva existente
-        reserva_existente = ReservaAreaComun(
-            id=1,
-            area_comun_id=self.area_comun_id,
-            departamento_id=1,
-            periodo_inicio=self.fecha_inicio,
-            periodo_fin=self.fecha_fin,
-            estado="activa"
-        )
-        
-        # Configurar mock para retornar reserva existente
-        self.service.reserva_repo.check_availability.return_value = [reserva_existente]
+        # Configurar mock para retornar una reserva traslapada
+        self.service.reserva_repo.get_index.return_value = IntervalIndex([(self.fecha_inicio, self.fecha_fin, 1)])
         
         # Ejecutar método
         result = self.service.check_availability(self.mock_db, self.area_comun_id, self.fecha_inicio, self.fecha_fin)
@@ -61,12 +55,36 @@ class TestReservaAreaComunService:
         assert result["disponible"] == False
         assert result["reservas_existentes"] == 1
     
+    def test_check_availability_con_capacidad(self):
+        """Test que un área con capacidad admite reservas hasta llenarse"""
+        inicio = self.fecha_inicio
+        indice = IntervalIndex([
+            (inicio, inicio + timedelta(hours=1), 1),
+            (inicio + timedelta(hours=1), inicio + timedelta(hours=2), 2),
+        ], capacidad=2)
+        self.service.reserva_repo.get_index.return_value = indice
+        
+        # Las dos reservas existentes no coinciden entre sí: pico de 1
+        result = self.service.check_availability(self.mock_db, self.area_comun_id, inicio, inicio + timedelta(hours=2))
+        assert result["disponible"] == True
+        assert result["reservas_existentes"] == 2
+        assert result["lugares_disponibles"] == 1
+        
+        # Con una tercera reserva simultánea el área se llena
+        indice.add(inicio, inicio + timedelta(hours=2), 3)
+        result = self.service.check_availability(self.mock_db, self.area_comun_id, inicio, inicio + timedelta(hours=2))
+        assert result["disponible"] == False
+        assert result["lugares_disponibles"] == 0
+    
     def test_create_reserva_success(self, sample_departamento, sample_area_comun):
         """Test exitoso para crear reserva de área común"""
-        # Configurar mocks
-        self.service.departamento_repo.get_by_usuario_id.return_value = sample_departamento
-        self.service.adeudo_repo.get_pendientes_by_departamento_id.return_value = []
-        self.service.reserva_repo.check_availability.return_value = []
+        # Configurar mocks: departamento, adeudos y área común llegan en una sola consulta
+        self.service.reserva_repo.get_booking_context.return_value = Mock(
+            departamento_id=sample_departamento.id,
+            tiene_adeudos=False,
+            AreaComun=sample_area_comun
+        )
+        self.service.reserva_repo.get_index.return_value = IntervalIndex()
         
         # Crear datos de reserva
         reserva_data = ReservaAreaComunCreate(
@@ -75,8 +93,8 @@ class TestReservaAreaComunService:
             periodo_fin=self.fecha_fin
         )
         
-        # Mock de la nueva reserva
-        nueva_reserva = ReservaAreaComun(
+        # Mock de la fila insertada (INSERT ... RETURNING)
+        nueva_reserva = Mock(
             id=1,
             area_comun_id=self.area_comun_id,
             departamento_id=sample_departamento.id,
@@ -84,27 +102,27 @@ class TestReservaAreaComunService:
             periodo_fin=self.fecha_fin,
             estado="activa"
         )
-        self.service.reserva_repo.create.return_value = nueva_reserva
-        self.service.area_comun_repo.get.return_value = sample_area_comun
+        self.service.reserva_repo.create_row.return_value = nueva_reserva
         
         # Ejecutar método
         result = self.service.create_reserva(self.mock_db, self.usuario_id, reserva_data)
         
         # Verificar llamadas
-        self.service.departamento_repo.get_by_usuario_id.assert_called_once_with(self.mock_db, self.usuario_id)
-        self.service.adeudo_repo.get_pendientes_by_departamento_id.assert_called_once_with(self.mock_db, sample_departamento.id)
-        self.service.reserva_repo.check_availability.assert_called_once_with(self.mock_db, self.area_comun_id, self.fecha_inicio, self.fecha_fin)
-        self.service.reserva_repo.create.assert_called_once()
+        self.service.reserva_repo.get_booking_context.assert_called_once_with(self.mock_db, self.usuario_id, self.area_comun_id)
+        self.service.reserva_repo.get_index.assert_called_once_with(self.mock_db, self.area_comun_id)
+        self.service.reserva_repo.create_row.assert_called_once()
+        self.service.area_comun_repo.get.assert_not_called()
         
         # Verificar resultado
         assert isinstance(result, ReservaAreaComunResponse)
         assert result.area_comun_id == self.area_comun_id
         assert result.departamento_id == sample_departamento.id
+        assert result.area_comun["nombre"] == sample_area_comun.nombre
     
     def test_create_reserva_no_departamento(self):
         """Test cuando el usuario no tiene departamento asociado"""
         # Configurar mock para retornar None
-        self.service.departamento_repo.get_by_usuario_id.return_value = None
+        self.service.reserva_repo.get_booking_context.return_value = None
         
         reserva_data = ReservaAreaComunCreate(
             area_comun_id=self.area_comun_id,
@@ -121,20 +139,12 @@ class TestReservaAreaComunService:
     
     def test_create_reserva_with_adeudos(self, sample_departamento):
         """Test cuando el usuario tiene adeudos pendientes"""
-        # Configurar mocks
-        self.service.departamento_repo.get_by_usuario_id.return_value = sample_departamento
-        
-        # Crear adeudo pendiente
-        adeudo = Adeudo(
-            id=1,
+        # Configurar mocks: el departamento tiene adeudos pendientes
+        self.service.reserva_repo.get_booking_context.return_value = Mock(
             departamento_id=sample_departamento.id,
-            monto=1500.0,
-            descripcion="Mantenimiento",
-            fecha_vencimiento=datetime.now() + timedelta(days=30),
-            fecha_creacion=datetime.now(),
-            pagado=False
+            tiene_adeudos=True,
+            AreaComun=Mock()
         )
-        self.service.adeudo_repo.get_pendientes_by_departamento_id.return_value = [adeudo]
         
         reserva_data = ReservaAreaComunCreate(
             area_comun_id=self.area_comun_id,
@@ -149,22 +159,18 @@ class TestReservaAreaComunService:
         assert exc_info.value.status_code == 400
         assert "No puede realizar reservas mientras tenga adeudos pendientes" in str(exc_info.value.detail)
     
-    def test_create_reserva_not_available(self, sample_departamento):
+    def test_create_reserva_not_available(self, sample_departamento, sample_area_comun):
         """Test cuando el área común no está disponible"""
         # Configurar mocks
-        self.service.departamento_repo.get_by_usuario_id.return_value = sample_departamento
-        self.service.adeudo_repo.get_pendientes_by_departamento_id.return_value = []
-        
-        # Crear reserva existente
-        reserva_existente = ReservaAreaComun(
-            id=1,
-            area_comun_id=self.area_comun_id,
-            departamento_id=2,  # Otro departamento
-            periodo_inicio=self.fecha_inicio,
-            periodo_fin=self.fecha_fin,
-            estado="activa"
+        self.service.reserva_repo.get_booking_context.return_value = Mock(
+            departamento_id=sample_departamento.id,
+            tiene_adeudos=False,
+            AreaComun=sample_area_comun
         )
-        self.service.reserva_repo.check_availability.return_value = [reserva_existente]
+        
+        # Reserva existente de otro departamento en el mismo horario
+        self.service.reserva_repo.get_index.return_value = IntervalIndex([(self.fecha_inicio, self.fecha_fin, 1)])
+        self.service.reserva_repo.get_overlapping_intervals.return_value = [(self.fecha_inicio, self.fecha_fin)]
         
         reserva_data = ReservaAreaComunCreate(
             area_comun_id=self.area_comun_id,
@@ -179,6 +185,29 @@ class TestReservaAreaComunService:
         assert exc_info.value.status_code == 400
         assert "El área común no está disponible en el periodo solicitado" in str(exc_info.value.detail)
     
+    def test_create_reserva_traslape_concurrente(self, sample_departamento, sample_area_comun):
+        """Test cuando la base de datos rechaza una reserva ganada por otra solicitud simultánea"""
+        self.service.reserva_repo.get_booking_context.return_value = Mock(
+            departamento_id=sample_departamento.id,
+            tiene_adeudos=False,
+            AreaComun=sample_area_comun
+        )
+        self.service.reserva_repo.get_index.return_value = IntervalIndex()
+        self.service.reserva_repo.create_row.side_effect = IntegrityError(
+            "INSERT", {}, Exception("reserva_traslapada")
+        )
+        
+        reserva_data = ReservaAreaComunCreate(
+            area_comun_id=self.area_comun_id,
+            periodo_inicio=self.fecha_inicio,
+            periodo_fin=self.fecha_fin
+        )
+        
+        with pytest.raises(HTTPException) as exc_info:
+            self.service.create_reserva(self.mock_db, self.usuario_id, reserva_data)
+        
+        assert exc_info.value.status_code == 409
+    
     def test_get_user_reservas_success(self, sample_departamento):
         """Test exitoso para obtener reservas del usuario"""
         # Configurar mocks
@@ -201,6 +230,8 @@ class TestReservaAreaComunService:
             periodo_fin=self.fecha_fin + timedelta(days=2),
             estado="activa"
         )
+        reserva1.area_comun = AreaComun(id=1, nombre="Palapa", descripcion="", ubicacion="", capacidad=1)
+        reserva2.area_comun = AreaComun(id=2, nombre="Gimnasio", descripcion="", ubicacion="", capacidad=1)
         self.service.reserva_repo.get_by_departamento_id.return_value = [reserva1, reserva2]
         
         # Ejecutar método
@@ -213,6 +244,7 @@ class TestReservaAreaComunService:
         # Verificar resultado
         assert len(result) == 2
         assert all(isinstance(r, ReservaAreaComunResponse) for r in result)
+        assert [r.area_comun["nombre"] for r in result] == ["Palapa", "Gimnasio"]
     
     def test_get_user_reservas_no_departamento(self):
         """Test cuando el usuario no tiene departamento asociado"""
@@ -224,3 +256,33 @@ class TestReservaAreaComunService:
         
         # Verificar resultado
         assert result == []
+    
+    def test_get_calendario_success(self):
+        """Test del calendario con periodos unidos por área"""
+        area1 = Mock(id=1, nombre="Palapa", capacidad=1)
+        area2 = Mock(id=2, nombre="Gimnasio", capacidad=1)
+        self.service.area_comun_repo.get_all_active.return_value = [area1, area2]
+        desde = datetime(2025, 1, 1)
+        hasta = datetime(2025, 2, 1)
+        self.service.reserva_repo.get_busy_in_range.return_value = [
+            (1, datetime(2024, 12, 31, 22), datetime(2025, 1, 1, 2)),
+            (1, datetime(2025, 1, 1, 1), datetime(2025, 1, 1, 3)),
+            (1, datetime(2025, 1, 5, 10), datetime(2025, 1, 5, 12)),
+        ]
+        
+        result = self.service.get_calendario(self.mock_db, desde, hasta)
+        
+        self.service.reserva_repo.get_busy_in_range.assert_called_once_with(self.mock_db, desde, hasta, None)
+        assert [r.area_comun_id for r in result] == [1, 2]
+        assert [(o.inicio, o.fin) for o in result[0].ocupado] == [
+            (datetime(2025, 1, 1), datetime(2025, 1, 1, 3)),
+            (datetime(2025, 1, 5, 10), datetime(2025, 1, 5, 12)),
+        ]
+        assert result[1].ocupado == []
+    
+    def test_get_calendario_rango_invalido(self):
+        """Test cuando la fecha final no es posterior a la inicial"""
+        with pytest.raises(HTTPException) as exc_info:
+            self.service.get_calendario(self.mock_db, self.fecha_fin, self.fecha_inicio)
+        
+        assert exc_info.value.status_code == 400
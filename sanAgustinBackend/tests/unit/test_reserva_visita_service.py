@@ -0,0 +1,92 @@
+import pytest
+from unittest.mock import Mock
+from fastapi import HTTPException
+from datetime import datetime, timedelta
+from sqlalchemy.exc import IntegrityError
+
+from services.reserva_visita_service import ReservaVisitaService
+from models.schemas.reserva_visita import ReservaVisitaCreate, ReservaVisitaResponse
+
+class TestReservaVisitaService:
+    """Tests unitarios para ReservaVisitaService"""
+    
+    def setup_method(self):
+        """Configuración para cada test"""
+        self.service = ReservaVisitaService()
+        self.service.departamento_repo = Mock()
+        self.service.lugar_visita_repo = Mock()
+        self.service.reserva_repo = Mock()
+        self.mock_db = Mock()
+        self.usuario_id = 1
+        self.fecha_inicio = datetime(2025, 1, 1, 10, 0)
+        self.fecha_fin = datetime(2025, 1, 1, 12, 0)
+        self.service.departamento_repo.get_by_usuario_id.return_value = Mock(id=1)
+        self.service.lugar_visita_repo.get_all_active.return_value = [
+            Mock(id=1, numero="V1", descripcion="Lugar 1", capacidad=1),
+            Mock(id=2, numero="V2", descripcion="Lugar 2", capacidad=1)
+        ]
+        self.reserva_data = ReservaVisitaCreate(periodo_inicio=self.fecha_inicio, periodo_fin=self.fecha_fin, placa_visita="ABC123")
+    
+    def _fila(self, lugar_visita_id):
+        fila = Mock()
+        fila._asdict.return_value = {
+            "id": 10,
+            "lugar_visita_id": lugar_visita_id,
+            "departamento_id": 1,
+            "placa_visita": "ABC123",
+            "periodo_inicio": self.fecha_inicio,
+            "periodo_fin": self.fecha_fin,
+            "estado": "activa"
+        }
+        return fila
+    
+    def test_cualquier_lugar_best_fit(self):
+        """Test que elige el lugar cuyo hueco se ajusta mejor al periodo"""
+        # El lugar 2 tiene reservas justo antes y después: el hueco es exacto
+        self.service.reserva_repo.get_busy_in_range.return_value = [
+            (2, self.fecha_inicio - timedelta(hours=2), self.fecha_inicio),
+            (2, self.fecha_fin, self.fecha_fin + timedelta(hours=2))
+        ]
+        self.service.reserva_repo.create_row.return_value = self._fila(2)
+        
+        result = self.service.create_reserva(self.mock_db, self.usuario_id, self.reserva_data)
+        
+        self.service.reserva_repo.get_busy_in_range.assert_called_once()
+        assert self.service.reserva_repo.create_row.call_args.kwargs["obj_in"]["lugar_visita_id"] == 2
+        assert isinstance(result, ReservaVisitaResponse)
+        assert result.lugar_visita.id == 2
+    
+    def test_cualquier_lugar_omite_ocupados(self):
+        """Test que no elige un lugar lleno en el periodo"""
+        self.service.reserva_repo.get_busy_in_range.return_value = [(1, self.fecha_inicio, self.fecha_fin)]
+        self.service.reserva_repo.create_row.return_value = self._fila(2)
+        
+        self.service.create_reserva(self.mock_db, self.usuario_id, self.reserva_data)
+        
+        assert self.service.reserva_repo.create_row.call_args.kwargs["obj_in"]["lugar_visita_id"] == 2
+    
+    def test_cualquier_lugar_reintenta_si_se_gana_el_lugar(self):
+        """Test que si la base de datos rechaza el lugar elegido se intenta el siguiente"""
+        self.service.reserva_repo.get_busy_in_range.return_value = []
+        self.service.reserva_repo.create_row.side_effect = [
+            IntegrityError("INSERT", {}, Exception("reserva_traslapada")),
+            self._fila(2)
+        ]
+        
+        result = self.service.create_reserva(self.mock_db, self.usuario_id, self.reserva_data)
+        
+        assert self.service.reserva_repo.create_row.call_count == 2
+        assert result.lugar_visita.id == 2
+    
+    def test_cualquier_lugar_sin_disponibilidad(self):
+        """Test cuando todos los lugares están ocupados"""
+        self.service.reserva_repo.get_busy_in_range.return_value = [
+            (1, self.fecha_inicio, self.fecha_fin),
+            (2, self.fecha_inicio, self.fecha_fin)
+        ]
+        
+        with pytest.raises(HTTPException) as exc_info:
+            self.service.create_reserva(self.mock_db, self.usuario_id, self.reserva_data)
+        
+        assert exc_info.value.status_code == 400
+        self.service.reserva_repo.create_row.assert_not_called()
@@ -0,0 +1,125 @@
+import pytest
+from datetime import datetime, timedelta
+from fastapi import HTTPException
+from sqlalchemy import create_engine, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from models.database import Base, Usuario, Departamento, AreaComun, ReservaAreaComun
+from models.database.restricciones import is_overlap_violation
+from models.schemas.reserva_area_comun import ReservaAreaComunCreate
+from scheduling.intervals import IntervalIndexRegistry
+from services.reserva_area_comun_service import ReservaAreaComunService
+
+CAPACIDAD = 2
+
+class TestRestriccionesCapacidad:
+    """Tests de los triggers de capacidad sobre una base SQLite en memoria (sin mocks)"""
+
+    def setup_method(self):
+        """Configuración inicial para cada test"""
+        self.engine = create_engine(
+            "sqlite://",
+            connect_args={"check_same_thread": False},
+            poolclass=StaticPool
+        )
+        # create_all instala también los triggers (after_create de restricciones)
+        Base.metadata.create_all(bind=self.engine)
+        self.Session = sessionmaker(bind=self.engine, autoflush=False)
+        self.inicio = datetime(2030, 1, 5, 10, 0)
+        self.fin = self.inicio + timedelta(hours=2)
+
+        with self.Session() as db:
+            usuario = Usuario(email="residente@example.com", nombre="Residente", apellido="Prueba", provider="google", provider_id="g-1")
+            area = AreaComun(nombre="Palapa", descripcion="", ubicacion="", capacidad=CAPACIDAD)
+            db.add_all([usuario, area])
+            db.flush()
+            departamento = Departamento(numero="01", usuario_id=usuario.id)
+            db.add(departamento)
+            db.commit()
+            self.usuario_id = usuario.id
+            self.departamento_id = departamento.id
+            self.area_comun_id = area.id
+
+        self.service = ReservaAreaComunService()
+        # Índice propio para no compartir estado con otros tests
+        self.service.reserva_repo.indice = IntervalIndexRegistry()
+
+    def teardown_method(self):
+        self.engine.dispose()
+
+    def _reserva(self, desfase_minutos: int = 0) -> dict:
+        return {
+            "area_comun_id": self.area_comun_id,
+            "departamento_id": self.departamento_id,
+            "periodo_inicio": self.inicio + timedelta(minutes=desfase_minutos),
+            "periodo_fin": self.fin + timedelta(minutes=desfase_minutos),
+            "estado": "activa"
+        }
+
+    def _llenar_area(self) -> None:
+        """Inserta CAPACIDAD reservas traslapadas sin pasar por el repositorio (como otro worker)"""
+        with self.engine.begin() as connection:
+            for i in range(CAPACIDAD):
+                connection.execute(insert(ReservaAreaComun), self._reserva(desfase_minutos=30 * i))
+
+    def test_trigger_rechaza_reserva_sobre_capacidad(self):
+        """Test que la reserva N+1 traslapada se rechaza con reserva_traslapada"""
+        self._llenar_area()
+
+        with self.Session() as db:
+            db.add(ReservaAreaComun(**self._reserva(desfase_minutos=15)))
+            with pytest.raises(IntegrityError) as exc_info:
+                db.commit()
+
+        assert is_overlap_violation(exc_info.value)
+
+    def test_trigger_permite_reservas_sin_traslape(self):
+        """Test que una reserva fuera del periodo ocupado sí se guarda"""
+        self._llenar_area()
+
+        with self.Session() as db:
+            db.add(ReservaAreaComun(**self._reserva(desfase_minutos=24 * 60)))
+            db.commit()
+
+            assert db.query(ReservaAreaComun).count() == CAPACIDAD + 1
+
+    def test_create_reserva_traslape_regresa_409(self):
+        """Test que el servicio traduce el rechazo del trigger a 409 aunque el índice diga disponible"""
+        reserva = ReservaAreaComunCreate(
+            area_comun_id=self.area_comun_id,
+            periodo_inicio=self.inicio + timedelta(minutes=15),
+            periodo_fin=self.fin + timedelta(minutes=15)
+        )
+        with self.Session() as db:
+            # El índice en memoria se carga vacío y luego otro worker llena el área
+            assert self.service.check_availability(db, self.area_comun_id, reserva.periodo_inicio, reserva.periodo_fin)["disponible"]
+            self._llenar_area()
+
+            with pytest.raises(HTTPException) as exc_info:
+                self.service.create_reserva(db, self.usuario_id, reserva)
+            db.rollback()
+
+            assert exc_info.value.status_code == 409
+            # El índice desfasado se invalidó y la siguiente verificación ve la base
+            assert not self.service.check_availability(db, self.area_comun_id, reserva.periodo_inicio, reserva.periodo_fin)["disponible"]
+
+    def test_create_reserva_indice_desfasado_confirma_en_base(self):
+        """Test que un índice con reservas canceladas por otro worker no rechaza con 400"""
+        self._llenar_area()
+        reserva = ReservaAreaComunCreate(
+            area_comun_id=self.area_comun_id,
+            periodo_inicio=self.inicio + timedelta(minutes=15),
+            periodo_fin=self.fin + timedelta(minutes=15)
+        )
+        with self.Session() as db:
+            # El índice en memoria se carga lleno y luego otro worker cancela una reserva
+            assert not self.service.check_availability(db, self.area_comun_id, reserva.periodo_inicio, reserva.periodo_fin)["disponible"]
+            with self.engine.begin() as connection:
+                connection.execute(update(ReservaAreaComun).where(ReservaAreaComun.id == 1).values(estado="cancelada"))
+
+            creada = self.service.create_reserva(db, self.usuario_id, reserva)
+
+            assert creada.estado == "activa"
+            assert db.query(ReservaAreaComun).filter(ReservaAreaComun.estado == "activa").count() == CAPACIDAD
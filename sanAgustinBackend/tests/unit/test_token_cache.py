@@ -0,0 +1,59 @@
+import pytest
+from unittest.mock import Mock, patch
+
+from caching.token_cache import TokenCache
+
+class TestTokenCache:
+    """Tests unitarios para la caché de tokens verificados"""
+
+    def test_invalidacion_por_usuario(self):
+        """Test que invalidar un usuario elimina todos sus tokens y solo los suyos"""
+        cache = TokenCache()
+        cache.set(b"t1", Mock(id=1))
+        cache.set(b"t2", Mock(id=1))
+        cache.set(b"t3", Mock(id=2))
+
+        cache.invalidate_usuarios([1])
+
+        assert cache.get(b"t1") is None
+        assert cache.get(b"t2") is None
+        assert cache.get(b"t3").id == 2
+        assert cache.stats()["invalidaciones"] == 2
+
+    def test_descarta_tokens_que_salieron_de_la_cache(self):
+        """Test que el índice por usuario no crece con tokens expulsados"""
+        cache = TokenCache(maxsize=1)
+        cache.set(b"t1", Mock(id=1))
+        cache.set(b"t2", Mock(id=2))
+        cache.set(b"t3", Mock(id=1))
+
+        assert cache._tokens_por_usuario == {1: {b"t3"}}
+
+    def test_indice_se_limpia_al_expirar(self):
+        """Test que un token expirado sale también del índice por usuario"""
+        cache = TokenCache(ttl_segundos=60)
+        with patch("caching.ttl_cache.time.monotonic", return_value=100.0):
+            cache.set(b"t1", Mock(id=1), ttl_segundos=5)
+        with patch("caching.ttl_cache.time.monotonic", return_value=106.0):
+            cache.get(b"t1")
+
+        assert cache._tokens_por_usuario == {}
+
+    def test_sobrescribir_token_conserva_indice(self):
+        """Test que volver a cachear el mismo token no lo saca del índice"""
+        cache = TokenCache()
+        cache.set(b"t1", Mock(id=1))
+        cache.set(b"t1", Mock(id=1))
+
+        cache.invalidate_usuarios([1])
+
+        assert cache.get(b"t1") is None
+        assert cache._tokens_por_usuario == {}
+
+    def test_expira_con_el_token(self):
+        """Test que la entrada no vive más que la vigencia indicada"""
+        cache = TokenCache(ttl_segundos=60)
+        with patch("caching.ttl_cache.time.monotonic", return_value=100.0):
+            cache.set(b"t1", Mock(id=1), ttl_segundos=5)
+        with patch("caching.ttl_cache.time.monotonic", return_value=106.0):
+            assert cache.get(b"t1") is None
@@ -0,0 +1,63 @@
+import pytest
+from unittest.mock import patch
+
+from caching.ttl_cache import TTLCache
+
+class TestTTLCache:
+    """Tests unitarios para la caché LRU con expiración"""
+
+    def test_hit_y_miss(self):
+        """Test que los contadores registran aciertos y fallos"""
+        cache = TTLCache()
+        assert cache.get(1) is None
+        cache.set(1, "panel")
+
+        assert cache.get(1) == "panel"
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+    def test_expiracion(self):
+        """Test que una entrada vencida cuenta como fallo y se elimina"""
+        cache = TTLCache(ttl_segundos=10)
+        with patch("caching.ttl_cache.time.monotonic", return_value=100.0):
+            cache.set(1, "panel")
+        with patch("caching.ttl_cache.time.monotonic", return_value=111.0):
+            assert cache.get(1) is None
+
+        assert len(cache) == 0
+
+    def test_lru(self):
+        """Test que al llenarse se descarta la entrada menos usada"""
+        cache = TTLCache(maxsize=2)
+        cache.set(1, "a")
+        cache.set(2, "b")
+        cache.get(1)
+        cache.set(3, "c")
+
+        assert cache.get(2) is None
+        assert cache.get(1) == "a"
+        assert cache.get(3) == "c"
+
+    def test_invalidate(self):
+        """Test que invalidar elimina la entrada y se cuenta"""
+        cache = TTLCache()
+        cache.set(1, "a")
+
+        assert cache.invalidate(1) is True
+        assert cache.invalidate(1) is False
+        assert cache.get(1) is None
+        assert cache.stats()["invalidaciones"] == 1
+
+    def test_ttl_por_entrada(self):
+        """Test que una entrada puede expirar antes que el resto, nunca después"""
+        cache = TTLCache(ttl_segundos=60)
+        with patch("caching.ttl_cache.time.monotonic", return_value=100.0):
+            cache.set(1, "corta", ttl_segundos=5)
+            cache.set(2, "larga", ttl_segundos=600)
+        with patch("caching.ttl_cache.time.monotonic", return_value=110.0):
+            assert cache.get(1) is None
+            assert 2 in cache
+        with patch("caching.ttl_cache.time.monotonic", return_value=161.0):
+            assert cache.get(2) is None
@@ -13,8 +13,8 @@ echo "📦 Instalando dependencias del backend..."
 cd sanAgustinBackend
 pip install -r requirements.txt
 
-echo "🗄️ Creando tablas de autenticación..."
-python crear_tablas_auth.py
+echo "🗄️ Creando o actualizando el esquema de la base..."
+python bootstrap_db.py
 
 echo "👤 Creando usuario administrador..."
 python crear_admin.py
@@ -59,11 +59,14 @@ if [ ! -f "venv/lib/python*/site-packages/fastapi" ]; then
     pip install -r requirements.txt
 fi
 
-# Verificar si la base de datos existe
+# Crear o actualizar el esquema (alembic upgrade head); los datos de ejemplo solo en una base nueva
 if [ ! -f "comunidad.db" ]; then
     echo "🗄️ Creando base de datos..."
+    python bootstrap_db.py || exit 1
     python poblar_simple.py
     python asociar_usuario.py
+else
+    python bootstrap_db.py || exit 1
 fi
 
 echo "🚀 Iniciando servidor backend..."